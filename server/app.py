@@ -4,10 +4,13 @@ from flask_restful import Api
 from server.config import app, db
 from server.models import User, Transaction, Wallet, Category, WalletCollaborator, Budget  # Importing all models
 from server.routes import register_routes
+from server.commands import register_commands
+from server.utils.cache import entity_cache
 
 # Initialize Flask-RESTful API and register routes
 api = Api(app)
 register_routes(api)
+register_commands(app)
 
 # Serve React frontend or landing page
 @app.route("/", defaults={"path": ""})
@@ -25,6 +28,11 @@ def index(path):
 def health_check():
     return jsonify({"message": "API is running!"}), 200
 
+# Hit/miss counters for the single-entity read cache
+@app.route('/api/cache/stats')
+def cache_stats():
+    return jsonify(entity_cache.stats()), 200
+
 # Run the Flask app for development
 if __name__ == "__main__":
     is_local = os.getenv("FLASK_ENV", "development") == "development"
@@ -0,0 +1,67 @@
+"""
+Compares SerializerMixin.to_dict() with the compiled serializers in server/utils/serializers.py.
+
+Rows are transient model instances with every column populated, so the numbers measure
+serialization alone. On persisted rows to_dict() also lazy-loads relationships, which
+makes the real gap larger than the one reported here.
+
+Usage: python -m server.benchmarks.serializer_benchmark [--rows 5000] [--repeat 3]
+"""
+import argparse
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from server.utils.serializers import SERIALIZERS
+
+def sample_value(column, i):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if issubclass(python_type, datetime):
+        return datetime(2025, 3, 1, 12, 30, 15)
+    if issubclass(python_type, date):
+        return date(2025, 3, 1)
+    if issubclass(python_type, bool):
+        return i % 2 == 0
+    if issubclass(python_type, int):
+        return i
+    if issubclass(python_type, float):
+        return 0.5
+    if issubclass(python_type, Decimal):
+        return Decimal('1234.56')
+    if issubclass(python_type, str):
+        return f"user{i}@example.com"
+    if issubclass(python_type, dict):
+        return {"key": "value", "items": [1, 2, 3]}
+    return None
+
+def build_rows(model, count):
+    columns = model.__table__.columns
+    return [model(**{column.key: sample_value(column, i) for column in columns}) for i in range(count)]
+
+def best_time(func, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            func(row)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'model':<22}{'to_dict() ms':>14}{'compiled ms':>14}{'speedup':>10}")
+    for model, serializer in sorted(SERIALIZERS.items(), key=lambda item: item[0].__name__):
+        rows = build_rows(model, args.rows)
+        baseline = best_time(lambda row: row.to_dict(), rows, args.repeat)
+        compiled = best_time(serializer.dump, rows, args.repeat)
+        print(f"{model.__name__:<22}{baseline * 1000:>14.1f}{compiled * 1000:>14.1f}{baseline / compiled:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
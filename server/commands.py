@@ -0,0 +1,133 @@
+import sys
+from datetime import datetime, timedelta
+import click
+from server.utils.indexes import REQUIRED_INDEXES, model_index_columns, database_index_columns, missing_indexes
+from server.services.anomalies import ANOMALY_BATCH_SIZE, detect_anomalies
+from server.services.benchmarks import update_benchmarks
+from server.services.categorization import RECATEGORIZE_BATCH_SIZE, recategorize_transactions
+from server.services.events import prune_events
+from server.services.forecasting import FORECAST_BATCH_SIZE, refresh_forecasts
+from server.services.habits import HABIT_BATCH_SIZE, HABIT_HISTORY_DAYS, detect_habits
+from server.services.invitations import INVITATION_SWEEP_BATCH_SIZE, expire_invitations
+from server.services.recurring import RECURRING_BATCH_SIZE, materialize_recurring
+from server.services.rollups import backfill_rollups
+from server.services.wallet_balances import find_balance_drift, fix_balance_drift
+
+def register_commands(app):
+    @app.cli.command('check-indexes')
+    @click.option('--database', is_flag=True, help='Check the live database instead of the model definitions.')
+    def check_indexes(database):
+        """List the indexes each controller query relies on and fail if any is missing."""
+        index_columns = database_index_columns() if database else model_index_columns()
+        missing = missing_indexes(index_columns)
+        for query, requirements in REQUIRED_INDEXES.items():
+            click.echo(query)
+            for table, columns in requirements:
+                status = 'MISSING' if (query, table, columns) in missing else 'ok'
+                click.echo(f"  {status:<8}{table}({', '.join(columns)})")
+        if missing:
+            click.echo(f"{len(missing)} required index(es) missing", err=True)
+            sys.exit(1)
+        click.echo("All required indexes are present")
+
+    @app.cli.command('reconcile-balances')
+    @click.option('--fix', is_flag=True, help='Rewrite drifted balances from their transactions.')
+    def reconcile_balances(fix):
+        """Recompute wallet balances from transactions and report any drift."""
+        drift = find_balance_drift()
+        for wallet_id, stored, expected in drift:
+            click.echo(f"wallet {wallet_id}: stored {stored}, expected {expected}")
+        if not drift:
+            click.echo("All wallet balances match their transactions")
+            return
+        if fix:
+            fix_balance_drift([wallet_id for wallet_id, _, _ in drift])
+            click.echo(f"Fixed {len(drift)} wallet balance(s)")
+        else:
+            click.echo(f"{len(drift)} wallet balance(s) drifted; run with --fix to repair", err=True)
+            sys.exit(1)
+
+    @app.cli.command('backfill-rollups')
+    @click.option('--wallet-id', type=int, help='Only rebuild the rollups of this wallet.')
+    def backfill_rollups_command(wallet_id):
+        """Rebuild the monthly wallet rollups from the transactions table."""
+        rows = backfill_rollups(wallet_id)
+        click.echo(f"Wrote {rows} rollup row(s)")
+
+    @app.cli.command('materialize-recurring')
+    @click.option('--days', type=int, default=None, help='Generate occurrences up to this many days ahead.')
+    @click.option('--batch-size', type=int, default=RECURRING_BATCH_SIZE, show_default=True)
+    def materialize_recurring_command(days, batch_size):
+        """Create the due occurrences of recurring transactions."""
+        until = datetime.utcnow() + timedelta(days=days) if days is not None else None
+        stats = materialize_recurring(until=until, batch_size=batch_size)
+        click.echo(
+            f"Scanned {stats['templates']} template(s), created {stats['created']} transaction(s)"
+        )
+        if stats['unknown_interval']:
+            click.echo(f"{stats['unknown_interval']} template(s) have no usable recurring_interval", err=True)
+
+    @app.cli.command('refresh-forecasts')
+    @click.option('--batch-size', type=int, default=FORECAST_BATCH_SIZE, show_default=True)
+    def refresh_forecasts_command(batch_size):
+        """Recompute the spending, income and savings forecasts of every wallet."""
+        refreshed = refresh_forecasts(batch_size=batch_size)
+        click.echo(f"Refreshed forecasts for {refreshed} wallet(s)")
+
+    @app.cli.command('detect-anomalies')
+    @click.option('--batch-size', type=int, default=ANOMALY_BATCH_SIZE, show_default=True)
+    def detect_anomalies_command(batch_size):
+        """Score expenses added since the last run and record unusual ones as anomalies."""
+        stats = detect_anomalies(batch_size=batch_size)
+        click.echo(f"Scored {stats['transactions']} expense(s), found {stats['anomalies']} anomaly(ies)")
+
+    @app.cli.command('detect-habits')
+    @click.option('--days', type=int, default=HABIT_HISTORY_DAYS, show_default=True, help='History to analyse.')
+    @click.option('--batch-size', type=int, default=HABIT_BATCH_SIZE, show_default=True, help='Users per batch.')
+    def detect_habits_command(days, batch_size):
+        """Detect weekly, biweekly and monthly spending habits for every user."""
+        stats = detect_habits(days=days, batch_size=batch_size)
+        click.echo(
+            f"Analysed {stats['series']} series for {stats['users']} user(s): "
+            f"{stats['habits']} habit(s), {stats['removed']} no longer detected"
+        )
+
+    @app.cli.command('update-benchmarks')
+    @click.option('--through', default=None, help='Last month to fold in, as YYYY-MM. Defaults to the last complete month.')
+    def update_benchmarks_command(through):
+        """Fold new monthly spending into the peer group sketches and refresh comparisons."""
+        if through:
+            through = datetime.strptime(through, '%Y-%m').date()
+        stats = update_benchmarks(through=through)
+        click.echo(
+            f"Added {stats['values']} monthly total(s) to {stats['groups']} peer group(s), "
+            f"updated {stats['benchmarks']} benchmark(s)"
+        )
+
+    @app.cli.command('recategorize-transactions')
+    @click.option('--wallet-id', type=int, default=None, help='Only recategorize this wallet.')
+    @click.option('--batch-size', type=int, default=RECATEGORIZE_BATCH_SIZE, show_default=True)
+    @click.option('--dry-run', is_flag=True, help='Report what would change without writing.')
+    def recategorize_transactions_command(wallet_id, batch_size, dry_run):
+        """Apply the smart category rules to existing transactions."""
+        stats = recategorize_transactions(wallet_id=wallet_id, batch_size=batch_size, dry_run=dry_run)
+        verb = 'would move' if dry_run else 'moved'
+        click.echo(
+            f"Scanned {stats['scanned']} transaction(s), {stats['matched']} matched a rule, "
+            f"{verb} {stats['changed']}"
+        )
+
+    @app.cli.command('prune-events')
+    @click.option('--days', type=int, default=None, help='Keep this many days. Defaults to EVENT_RETENTION_DAYS.')
+    def prune_events_command(days):
+        """Delete activity events older than the retention period."""
+        days = app.config['EVENT_RETENTION_DAYS'] if days is None else days
+        deleted = prune_events(days)
+        click.echo(f"Deleted {deleted} activity event(s) older than {days} day(s)")
+
+    @app.cli.command('expire-invitations')
+    @click.option('--batch-size', type=int, default=INVITATION_SWEEP_BATCH_SIZE, show_default=True)
+    def expire_invitations_command(batch_size):
+        """Mark pending wallet invitations past their expires_at as expired."""
+        expired = expire_invitations(batch_size=batch_size)
+        click.echo(f"Expired {expired} wallet invitation(s)")
@@ -12,6 +12,57 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///spe
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'supersecretkey')
 
+# Read-through cache for single-entity GETs: 'memory' (in-process) or 'shared'
+app.config['ENTITY_CACHE_BACKEND'] = os.getenv('ENTITY_CACHE_BACKEND', 'memory')
+app.config['ENTITY_CACHE_MAX_ENTRIES'] = int(os.getenv('ENTITY_CACHE_MAX_ENTRIES', 10000))
+app.config['ENTITY_CACHE_TTL'] = int(os.getenv('ENTITY_CACHE_TTL', 60))
+# Rows that rarely change can live longer; per-table overrides in seconds
+app.config['ENTITY_CACHE_TTLS'] = {
+    'categories': 600,
+    'ai_advisor_profiles': 600,
+    'smart_categories': 600,
+    'wallets': 120,
+}
+
+# Percent-of-budget levels that send a budget_alert notification, once per budget period
+app.config['BUDGET_ALERT_THRESHOLDS'] = sorted(
+    int(value) for value in os.getenv('BUDGET_ALERT_THRESHOLDS', '80,100').split(',') if value.strip()
+)
+
+# How far ahead recurring transactions are materialized. Occurrences count towards
+# balances as soon as they exist, so by default only those already due are created.
+app.config['RECURRING_HORIZON_DAYS'] = int(os.getenv('RECURRING_HORIZON_DAYS', 0))
+
+# Generated forecasts are served until valid_until, this many hours after they were fitted
+app.config['FORECAST_TTL_HOURS'] = int(os.getenv('FORECAST_TTL_HOURS', 24))
+# At most this many wallets with expired forecasts are refitted during one read; the
+# rest are served as stored until the refresh-forecasts command or a later read
+app.config['FORECAST_READ_REFRESH_LIMIT'] = int(os.getenv('FORECAST_READ_REFRESH_LIMIT', 10))
+
+# Anomaly detection: smoothing factor of the running mean and variance, how many
+# standard deviations above the mean counts as an anomaly, and how many transactions
+# a user/category needs before it is scored at all
+app.config['ANOMALY_EWMA_ALPHA'] = float(os.getenv('ANOMALY_EWMA_ALPHA', 0.1))
+app.config['ANOMALY_Z_THRESHOLD'] = float(os.getenv('ANOMALY_Z_THRESHOLD', 3.0))
+app.config['ANOMALY_MIN_OBSERVATIONS'] = int(os.getenv('ANOMALY_MIN_OBSERVATIONS', 5))
+
+# Wallet authorization: when enforced, wallet-scoped endpoints require an X-User-Id
+# header naming the owner or a collaborator with enough permission. Each user's
+# permission map is cached this many seconds; changes made through this process
+# invalidate it at once.
+app.config['ENFORCE_WALLET_ACCESS'] = os.getenv('ENFORCE_WALLET_ACCESS', 'false').lower() in ('1', 'true', 'yes')
+app.config['WALLET_ACCESS_TTL'] = int(os.getenv('WALLET_ACCESS_TTL', 30))
+
+# Server-sent events: how often the publisher polls the activity log while streams are
+# open, how often an idle stream sends a keepalive, how many missed events a reconnect
+# may replay before the client is told to refetch, how many undelivered events a slow
+# client may have queued before it is dropped, and how long the log is kept
+app.config['EVENT_POLL_SECONDS'] = float(os.getenv('EVENT_POLL_SECONDS', 1.0))
+app.config['EVENT_KEEPALIVE_SECONDS'] = int(os.getenv('EVENT_KEEPALIVE_SECONDS', 15))
+app.config['EVENT_REPLAY_LIMIT'] = int(os.getenv('EVENT_REPLAY_LIMIT', 500))
+app.config['EVENT_QUEUE_SIZE'] = int(os.getenv('EVENT_QUEUE_SIZE', 1000))
+app.config['EVENT_RETENTION_DAYS'] = int(os.getenv('EVENT_RETENTION_DAYS', 7))
+
 # Ensure JSON responses are formatted nicely
 app.json.compact = False
 
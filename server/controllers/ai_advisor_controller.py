@@ -1,14 +1,33 @@
 from server.models import db, AIAdvisorProfile
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_ai_advisors():
-    profiles = [profile.serialize() for profile in AIAdvisorProfile.query.all()]
+def get_all_ai_advisors(fields=None):
+    try:
+        serializer = serializer_for(AIAdvisorProfile).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = AIAdvisorProfile.query.options(*serializer.load_options())
+    profiles = [serializer.dump(profile) for profile in query.all()]
     return profiles, 200
 
-def get_ai_advisor_by_id(profile_id):
-    profile = AIAdvisorProfile.query.get(profile_id)
+def stream_all_ai_advisors(fields=None):
+    try:
+        serializer = serializer_for(AIAdvisorProfile).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = AIAdvisorProfile.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_ai_advisor_by_id(profile_id, fields=None):
+    try:
+        profile = cached_row(AIAdvisorProfile, profile_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not profile:
         return {"error": "AI Advisor Profile not found"}, 404
-    return profile.serialize(), 200
+    return profile, 200
 
 def create_ai_advisor(data):
     required_fields = ['user_id', 'risk_tolerance']
@@ -24,7 +43,7 @@ def create_ai_advisor(data):
     )
     db.session.add(new_profile)
     db.session.commit()
-    return new_profile.serialize(), 201
+    return serialize(new_profile), 201
 
 def update_ai_advisor(profile_id, data):
     profile = AIAdvisorProfile.query.get(profile_id)
@@ -33,7 +52,8 @@ def update_ai_advisor(profile_id, data):
     for key, value in data.items():
         setattr(profile, key, value)
     db.session.commit()
-    return profile.serialize(), 200
+    entity_cache.invalidate(AIAdvisorProfile, profile_id)
+    return serialize(profile), 200
 
 def delete_ai_advisor(profile_id):
     profile = AIAdvisorProfile.query.get(profile_id)
@@ -41,4 +61,5 @@ def delete_ai_advisor(profile_id):
         return {"error": "AI Advisor Profile not found"}, 404
     db.session.delete(profile)
     db.session.commit()
+    entity_cache.invalidate(AIAdvisorProfile, profile_id)
     return {"message": "AI Advisor Profile deleted successfully"}, 200
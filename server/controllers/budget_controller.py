@@ -1,21 +1,76 @@
 from datetime import datetime
 from server.models import db, Budget
+from server.utils.serializers import serialize, serializer_for
+from server.utils.authorization import accessible_wallets_filter, require_wallet_access, require_wallets_access
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
+from server.services.budget_status import budget_statuses
 
-def get_all_budgets():
-    budgets = [budget.serialize() for budget in Budget.query.all()]
+def get_all_budgets(fields=None, include_status=False):
+    try:
+        serializer = serializer_for(Budget).only(fields)
+        criteria = accessible_wallets_filter(Budget.wallet_id)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = Budget.query.filter(*criteria).options(*serializer.load_options())
+    budgets = [serializer.dump(budget) for budget in query.all()]
+    if include_status:
+        # One grouped query for every budget rather than one per budget
+        statuses = budget_statuses(*criteria)
+        for budget in budgets:
+            budget["status"] = statuses.get(budget["id"])
     return budgets, 200
 
-def get_budget_by_id(budget_id):
-    budget = Budget.query.get(budget_id)
+def get_budget_statuses(filters=None):
+    filters = filters or {}
+    try:
+        criteria = accessible_wallets_filter(Budget.wallet_id)
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    try:
+        for key, column in (('user_id', Budget.user_id), ('wallet_id', Budget.wallet_id), ('category_id', Budget.category_id)):
+            if filters.get(key):
+                criteria.append(column == int(filters.get(key)))
+        if filters.get('ids'):
+            criteria.append(Budget.id.in_([int(value) for value in filters.get('ids').split(',') if value.strip()]))
+    except ValueError:
+        return {"error": "user_id, wallet_id, category_id and ids must be integers"}, 400
+    return list(budget_statuses(*criteria).values()), 200
+
+def stream_all_budgets(fields=None):
+    try:
+        serializer = serializer_for(Budget).only(fields)
+        criteria = accessible_wallets_filter(Budget.wallet_id)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = Budget.query.filter(*criteria).options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_budget_by_id(budget_id, fields=None):
+    try:
+        serializer = serializer_for(Budget).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    budget = cached_row(Budget, budget_id)
     if not budget:
         return {"error": "Budget not found"}, 404
-    return budget.serialize(), 200
+    denied = require_wallet_access(budget['wallet_id'])
+    if denied:
+        return denied
+    return {key: budget[key] for key in serializer.fields}, 200
 
 def create_budget(data):
     required_fields = ['user_id', 'category_id', 'wallet_id', 'amount', 'period', 'start_date']
     for field in required_fields:
         if not data.get(field):
             return {"error": f"{field} is required"}, 400
+    denied = require_wallet_access(data.get('wallet_id'), 'editor')
+    if denied:
+        return denied
 
     try:
         start_date = datetime.fromisoformat(data.get('start_date'))
@@ -41,12 +96,15 @@ def create_budget(data):
 
     db.session.add(new_budget)
     db.session.commit()
-    return new_budget.serialize(), 201
+    return serialize(new_budget), 201
 
 def update_budget(budget_id, data):
     budget = Budget.query.get(budget_id)
     if not budget:
         return {"error": "Budget not found"}, 404
+    denied = require_wallets_access({budget.wallet_id, data.get('wallet_id', budget.wallet_id)}, 'editor')
+    if denied:
+        return denied
 
     allowed_fields = {'user_id', 'category_id', 'wallet_id', 'amount', 'period', 'start_date', 'end_date'}
     for key, value in data.items():
@@ -58,12 +116,17 @@ def update_budget(budget_id, data):
                     return {"error": f"Invalid {key} format. Please use ISO format."}, 400
             setattr(budget, key, value)
     db.session.commit()
-    return budget.serialize(), 200
+    entity_cache.invalidate(Budget, budget_id)
+    return serialize(budget), 200
 
 def delete_budget(budget_id):
     budget = Budget.query.get(budget_id)
     if not budget:
         return {"error": "Budget not found"}, 404
+    denied = require_wallet_access(budget.wallet_id, 'editor')
+    if denied:
+        return denied
     db.session.delete(budget)
     db.session.commit()
+    entity_cache.invalidate(Budget, budget_id)
     return {"message": "Budget deleted successfully"}, 200
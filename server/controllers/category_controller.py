@@ -1,14 +1,33 @@
 from server.models import db, Category
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_categories():
-    categories = [category.serialize() for category in Category.query.all()]
+def get_all_categories(fields=None):
+    try:
+        serializer = serializer_for(Category).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = Category.query.options(*serializer.load_options())
+    categories = [serializer.dump(category) for category in query.all()]
     return categories, 200
 
-def get_category_by_id(category_id):
-    category = Category.query.get(category_id)
+def stream_all_categories(fields=None):
+    try:
+        serializer = serializer_for(Category).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = Category.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_category_by_id(category_id, fields=None):
+    try:
+        category = cached_row(Category, category_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not category:
         return {"error": "Category not found"}, 404
-    return category.serialize(), 200
+    return category, 200
 
 def create_category(data):
     required_fields = ['name', 'type']
@@ -27,7 +46,7 @@ def create_category(data):
 
     db.session.add(new_category)
     db.session.commit()
-    return new_category.serialize(), 201
+    return serialize(new_category), 201
 
 def update_category(category_id, data):
     category = Category.query.get(category_id)
@@ -39,7 +58,8 @@ def update_category(category_id, data):
         if key in allowed_fields:
             setattr(category, key, value)
     db.session.commit()
-    return category.serialize(), 200
+    entity_cache.invalidate(Category, category_id)
+    return serialize(category), 200
 
 def delete_category(category_id):
     category = Category.query.get(category_id)
@@ -47,4 +67,5 @@ def delete_category(category_id):
         return {"error": "Category not found"}, 404
     db.session.delete(category)
     db.session.commit()
+    entity_cache.invalidate(Category, category_id)
     return {"message": "Category deleted successfully"}, 200
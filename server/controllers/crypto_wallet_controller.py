@@ -1,14 +1,33 @@
 from server.models import db, CryptoWallet
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_crypto_wallets():
-    wallets = [cw.serialize() for cw in CryptoWallet.query.all()]
+def get_all_crypto_wallets(fields=None):
+    try:
+        serializer = serializer_for(CryptoWallet).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = CryptoWallet.query.options(*serializer.load_options())
+    wallets = [serializer.dump(cw) for cw in query.all()]
     return wallets, 200
 
-def get_crypto_wallet_by_id(wallet_id):
-    cw = CryptoWallet.query.get(wallet_id)
+def stream_all_crypto_wallets(fields=None):
+    try:
+        serializer = serializer_for(CryptoWallet).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = CryptoWallet.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_crypto_wallet_by_id(wallet_id, fields=None):
+    try:
+        cw = cached_row(CryptoWallet, wallet_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not cw:
         return {"error": "Crypto Wallet not found"}, 404
-    return cw.serialize(), 200
+    return cw, 200
 
 def create_crypto_wallet(data):
     required_fields = ['user_id', 'wallet_address']
@@ -25,7 +44,7 @@ def create_crypto_wallet(data):
     )
     db.session.add(new_cw)
     db.session.commit()
-    return new_cw.serialize(), 201
+    return serialize(new_cw), 201
 
 def update_crypto_wallet(wallet_id, data):
     cw = CryptoWallet.query.get(wallet_id)
@@ -34,7 +53,8 @@ def update_crypto_wallet(wallet_id, data):
     for key, value in data.items():
         setattr(cw, key, value)
     db.session.commit()
-    return cw.serialize(), 200
+    entity_cache.invalidate(CryptoWallet, wallet_id)
+    return serialize(cw), 200
 
 def delete_crypto_wallet(wallet_id):
     cw = CryptoWallet.query.get(wallet_id)
@@ -42,4 +62,5 @@ def delete_crypto_wallet(wallet_id):
         return {"error": "Crypto Wallet not found"}, 404
     db.session.delete(cw)
     db.session.commit()
+    entity_cache.invalidate(CryptoWallet, wallet_id)
     return {"message": "Crypto Wallet deleted successfully"}, 200
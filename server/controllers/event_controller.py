@@ -0,0 +1,104 @@
+import queue
+from flask import Response, current_app, stream_with_context
+from server.models import db, User
+from server.services.events import (
+    accessible_wallet_ids,
+    event_broker,
+    format_event,
+    event_id_range,
+    replay_events
+)
+from server.utils.authorization import require_self
+from server.utils.cache import cached_row
+
+EVENT_STREAM_MIMETYPE = 'text/event-stream'
+# Reconnect delay suggested to EventSource clients, in milliseconds
+EVENT_RETRY_MS = 3000
+
+def _parse_cursor(value):
+    if value in (None, ''):
+        return None
+    try:
+        cursor = int(value)
+    except ValueError:
+        raise ValueError("Last-Event-ID must be an integer event id")
+    if cursor < 0:
+        raise ValueError("Last-Event-ID must be an integer event id")
+    return cursor
+
+def _reset_event(event_id):
+    # The client is further behind than the log can replay and has to refetch
+    return f"id: {event_id}\nevent: reset\ndata: {{}}\n\n"
+
+def stream_user_events(user_id, cursor=None):
+    """
+    text/event-stream of a user's new notifications and of transaction and access
+    changes in every wallet the user owns or collaborates on.
+
+    A reconnecting client sends the id of the last event it received (Last-Event-ID,
+    or ?last_event_id=) and first gets everything it missed from the activity log,
+    or a 'reset' event when that is more than EVENT_REPLAY_LIMIT events or already
+    pruned. Live events come from the process-wide publisher, so once the wallets
+    are resolved and the replay is sent the stream holds no database connection and
+    costs no queries while idle; it only writes a keepalive comment now and then.
+    """
+    denied = require_self(user_id)
+    if denied:
+        return denied
+    if not cached_row(User, user_id):
+        return {"error": "User not found"}, 404
+    try:
+        cursor = _parse_cursor(cursor)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    app = current_app._get_current_object()
+    keepalive = app.config['EVENT_KEEPALIVE_SECONDS']
+    replay_limit = app.config['EVENT_REPLAY_LIMIT']
+
+    def generate():
+        # Subscribed inside the generator so the finally below always unsubscribes
+        subscription = event_broker.subscribe(app, user_id, accessible_wallet_ids(user_id))
+        try:
+            yield f"retry: {EVENT_RETRY_MS}\n\n"
+            replayed = set()
+            if cursor is not None:
+                earliest, latest = event_id_range()
+                # A cursor below the oldest event was pruned past; one above the newest is from another log
+                replayable = earliest <= cursor + 1 and cursor <= latest
+                missed = replay_events(
+                    user_id, subscription.wallet_ids, cursor, subscription.start_id, replay_limit + 1
+                ) if replayable else []
+                if not replayable or len(missed) > replay_limit:
+                    # Events the client missed were pruned, or there are too many to replay
+                    yield _reset_event(subscription.start_id)
+                else:
+                    for event in missed:
+                        replayed.add(event['id'])
+                        yield format_event(event)
+            # Give the connection back to the pool before waiting
+            db.session.remove()
+
+            while True:
+                try:
+                    event = subscription.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Dropped for falling behind; the client reconnects with its cursor
+                    return
+                if event['id'] in replayed:
+                    continue
+                if event['event_type'] == 'wallet_access':
+                    event_broker.update_wallets(subscription, accessible_wallet_ids(user_id))
+                    db.session.remove()
+                yield format_event(event)
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EVENT_STREAM_MIMETYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
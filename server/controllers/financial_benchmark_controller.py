@@ -1,14 +1,41 @@
-from server.models import db, FinancialBenchmark
+from datetime import datetime
+from server.models import db, BenchmarkSketch, FinancialBenchmark
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
+from server.utils.tdigest import TDigest
+from server.services.benchmarks import (
+    comparison_metrics,
+    last_complete_month,
+    peer_group_key,
+    user_monthly_spending
+)
 
-def get_all_financial_benchmarks():
-    benchmarks = [fb.serialize() for fb in FinancialBenchmark.query.all()]
+def get_all_financial_benchmarks(fields=None):
+    try:
+        serializer = serializer_for(FinancialBenchmark).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = FinancialBenchmark.query.options(*serializer.load_options())
+    benchmarks = [serializer.dump(fb) for fb in query.all()]
     return benchmarks, 200
 
-def get_financial_benchmark_by_id(benchmark_id):
-    fb = FinancialBenchmark.query.get(benchmark_id)
+def stream_all_financial_benchmarks(fields=None):
+    try:
+        serializer = serializer_for(FinancialBenchmark).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = FinancialBenchmark.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_financial_benchmark_by_id(benchmark_id, fields=None):
+    try:
+        fb = cached_row(FinancialBenchmark, benchmark_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not fb:
         return {"error": "Financial Benchmark not found"}, 404
-    return fb.serialize(), 200
+    return fb, 200
 
 def create_financial_benchmark(data):
     required_fields = ['user_id']
@@ -24,7 +51,7 @@ def create_financial_benchmark(data):
     )
     db.session.add(new_fb)
     db.session.commit()
-    return new_fb.serialize(), 201
+    return serialize(new_fb), 201
 
 def update_financial_benchmark(benchmark_id, data):
     fb = FinancialBenchmark.query.get(benchmark_id)
@@ -33,7 +60,8 @@ def update_financial_benchmark(benchmark_id, data):
     for key, value in data.items():
         setattr(fb, key, value)
     db.session.commit()
-    return fb.serialize(), 200
+    entity_cache.invalidate(FinancialBenchmark, benchmark_id)
+    return serialize(fb), 200
 
 def delete_financial_benchmark(benchmark_id):
     fb = FinancialBenchmark.query.get(benchmark_id)
@@ -41,4 +69,34 @@ def delete_financial_benchmark(benchmark_id):
         return {"error": "Financial Benchmark not found"}, 404
     db.session.delete(fb)
     db.session.commit()
+    entity_cache.invalidate(FinancialBenchmark, benchmark_id)
     return {"message": "Financial Benchmark deleted successfully"}, 200
+
+def get_financial_benchmark_comparison(benchmark_id, month=None):
+    """
+    Percentile of the user's monthly spending among their peer group, answered from
+    the group's stored sketch. Defaults to the last complete month.
+    """
+    fb = cached_row(FinancialBenchmark, benchmark_id)
+    if not fb:
+        return {"error": "Financial Benchmark not found"}, 404
+    if month:
+        try:
+            month = datetime.strptime(month, '%Y-%m').date()
+        except ValueError:
+            return {"error": "month must be a month in YYYY-MM format"}, 400
+    else:
+        month = last_complete_month()
+
+    sketch = db.session.get(BenchmarkSketch, peer_group_key(fb['peer_group_params']))
+    if sketch is None:
+        return {"error": "No peer data for this benchmark yet"}, 404
+    metrics = comparison_metrics(
+        TDigest.from_dict(sketch.sketch),
+        user_monthly_spending(fb['user_id'], month),
+        month,
+        sketch.member_count
+    )
+    metrics['benchmark_id'] = benchmark_id
+    metrics['sketch_through'] = sketch.months_through.strftime('%Y-%m') if sketch.months_through else None
+    return metrics, 200
@@ -1,21 +1,98 @@
-from server.models import db, FinancialForecast
+from flask import current_app
+from server.models import db, FinancialForecast, Wallet
+from server.utils.serializers import serialize, serializer_for
+from server.utils.authorization import accessible_wallets_filter, require_wallet_access, require_wallets_access
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
+from server.services.forecasting import (
+    FORECAST_TYPES,
+    TIME_RANGES,
+    forecast_wallets,
+    refresh_expired_forecasts,
+    save_forecasts
+)
 from datetime import datetime
 
-def get_all_financial_forecasts():
-    forecasts = [ff.serialize() for ff in FinancialForecast.query.all()]
+def forecast_criteria(filters):
+    """SQL predicates for the supported query parameters; raises ValueError for bad ids."""
+    criteria = []
+    if not filters:
+        return criteria
+    for key in ('user_id', 'wallet_id'):
+        value = filters.get(key)
+        if value in (None, ''):
+            continue
+        try:
+            criteria.append(getattr(FinancialForecast, key) == int(value))
+        except ValueError:
+            raise ValueError(f"{key} must be an integer")
+    for key in ('forecast_type', 'time_range'):
+        if filters.get(key):
+            criteria.append(getattr(FinancialForecast, key) == filters.get(key))
+    return criteria
+
+def refresh_expired_financial_forecasts(filters=None, forecast_id=None):
+    """
+    Recomputes the expired forecasts a read is about to return, limited to wallets the
+    caller may see and to FORECAST_READ_REFRESH_LIMIT wallets per read. Forecasts whose
+    valid_until has not passed are served as stored, without fitting anything.
+    """
+    try:
+        criteria = forecast_criteria(filters) + accessible_wallets_filter(FinancialForecast.wallet_id)
+    except (ValueError, PermissionError):
+        # The read itself reports the bad parameter or missing user
+        return
+    if forecast_id is not None:
+        ff = cached_row(FinancialForecast, forecast_id)
+        if not ff or require_wallet_access(ff['wallet_id']):
+            return
+        criteria.append(FinancialForecast.id == forecast_id)
+    refresh_expired_forecasts(*criteria, max_wallets=current_app.config['FORECAST_READ_REFRESH_LIMIT'])
+
+def get_all_financial_forecasts(fields=None, filters=None):
+    try:
+        serializer = serializer_for(FinancialForecast).only(fields)
+        criteria = forecast_criteria(filters) + accessible_wallets_filter(FinancialForecast.wallet_id)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = FinancialForecast.query.filter(*criteria).options(*serializer.load_options())
+    forecasts = [serializer.dump(ff) for ff in query.all()]
     return forecasts, 200
 
-def get_financial_forecast_by_id(forecast_id):
-    ff = FinancialForecast.query.get(forecast_id)
+def stream_all_financial_forecasts(fields=None, filters=None):
+    try:
+        serializer = serializer_for(FinancialForecast).only(fields)
+        criteria = forecast_criteria(filters) + accessible_wallets_filter(FinancialForecast.wallet_id)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = FinancialForecast.query.filter(*criteria).options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_financial_forecast_by_id(forecast_id, fields=None):
+    try:
+        serializer = serializer_for(FinancialForecast).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    ff = cached_row(FinancialForecast, forecast_id)
     if not ff:
         return {"error": "Financial Forecast not found"}, 404
-    return ff.serialize(), 200
+    denied = require_wallet_access(ff['wallet_id'])
+    if denied:
+        return denied
+    return {key: ff[key] for key in serializer.fields}, 200
 
 def create_financial_forecast(data):
     required_fields = ['user_id', 'wallet_id', 'forecast_type', 'time_range']
     for field in required_fields:
         if not data.get(field):
             return {"error": f"{field} is required"}, 400
+    denied = require_wallet_access(data.get('wallet_id'), 'editor')
+    if denied:
+        return denied
     new_ff = FinancialForecast(
         user_id=data.get('user_id'),
         wallet_id=data.get('wallet_id'),
@@ -33,12 +110,46 @@ def create_financial_forecast(data):
             return {"error": "Invalid valid_until format. Please use ISO format."}, 400
     db.session.add(new_ff)
     db.session.commit()
-    return new_ff.serialize(), 201
+    return serialize(new_ff), 201
+
+def generate_financial_forecasts(data):
+    """
+    Computes forecasts for a wallet from its transaction history and stores them over
+    the previous ones. forecast_type and time_range default to every supported value.
+    """
+    data = data or {}
+    wallet_id = data.get('wallet_id')
+    if not wallet_id:
+        return {"error": "wallet_id is required"}, 400
+    try:
+        wallet_id = int(wallet_id)
+    except (TypeError, ValueError):
+        return {"error": "wallet_id must be an integer"}, 400
+    if not db.session.get(Wallet, wallet_id):
+        return {"error": "Wallet not found"}, 404
+    denied = require_wallet_access(wallet_id, 'editor')
+    if denied:
+        return denied
+
+    forecast_types = [data['forecast_type']] if data.get('forecast_type') else FORECAST_TYPES
+    time_ranges = [data['time_range']] if data.get('time_range') else tuple(TIME_RANGES)
+    if not set(forecast_types) <= set(FORECAST_TYPES):
+        return {"error": f"forecast_type must be one of: {', '.join(FORECAST_TYPES)}"}, 400
+    if not set(time_ranges) <= set(TIME_RANGES):
+        return {"error": f"time_range must be one of: {', '.join(TIME_RANGES)}"}, 400
+
+    ids = save_forecasts(forecast_wallets([wallet_id], forecast_types, time_ranges))
+    db.session.commit()
+    forecasts = FinancialForecast.query.filter(FinancialForecast.id.in_(ids)).order_by(FinancialForecast.id)
+    return [serialize(ff) for ff in forecasts], 201
 
 def update_financial_forecast(forecast_id, data):
     ff = FinancialForecast.query.get(forecast_id)
     if not ff:
         return {"error": "Financial Forecast not found"}, 404
+    denied = require_wallets_access({ff.wallet_id, data.get('wallet_id', ff.wallet_id)}, 'editor')
+    if denied:
+        return denied
     for key, value in data.items():
         if key == 'valid_until' and value:
             try:
@@ -47,12 +158,17 @@ def update_financial_forecast(forecast_id, data):
                 return {"error": "Invalid valid_until format. Please use ISO format."}, 400
         setattr(ff, key, value)
     db.session.commit()
-    return ff.serialize(), 200
+    entity_cache.invalidate(FinancialForecast, forecast_id)
+    return serialize(ff), 200
 
 def delete_financial_forecast(forecast_id):
     ff = FinancialForecast.query.get(forecast_id)
     if not ff:
         return {"error": "Financial Forecast not found"}, 404
+    denied = require_wallet_access(ff.wallet_id, 'editor')
+    if denied:
+        return denied
     db.session.delete(ff)
     db.session.commit()
+    entity_cache.invalidate(FinancialForecast, forecast_id)
     return {"message": "Financial Forecast deleted successfully"}, 200
@@ -1,14 +1,58 @@
-from server.models import db, Notification
+from sqlalchemy import func, update
+from server.models import db, Notification, User
+from server.services.events import notification_events, record_event, record_events
+from server.utils.authorization import require_self
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_notifications():
-    notifications = [n.serialize() for n in Notification.query.all()]
+MAX_MARK_READ_IDS = 1000
+
+def _unread():
+    # Same predicate as the partial index ix_notifications_user_id_unread
+    return Notification.is_read == db.false()
+
+def notification_criteria(filters):
+    """SQL predicates for ?user_id= and ?unread=true; raises ValueError for a bad user_id."""
+    criteria = []
+    if not filters:
+        return criteria
+    if filters.get('user_id') not in (None, ''):
+        try:
+            criteria.append(Notification.user_id == int(filters.get('user_id')))
+        except ValueError:
+            raise ValueError("user_id must be an integer")
+    if str(filters.get('unread', '')).lower() in ('1', 'true'):
+        criteria.append(_unread())
+    return criteria
+
+def get_all_notifications(fields=None, filters=None):
+    try:
+        serializer = serializer_for(Notification).only(fields)
+        criteria = notification_criteria(filters)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = Notification.query.filter(*criteria).options(*serializer.load_options())
+    notifications = [serializer.dump(n) for n in query.all()]
     return notifications, 200
 
-def get_notification_by_id(notification_id):
-    n = Notification.query.get(notification_id)
+def stream_all_notifications(fields=None, filters=None):
+    try:
+        serializer = serializer_for(Notification).only(fields)
+        criteria = notification_criteria(filters)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = Notification.query.filter(*criteria).options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_notification_by_id(notification_id, fields=None):
+    try:
+        n = cached_row(Notification, notification_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not n:
         return {"error": "Notification not found"}, 404
-    return n.serialize(), 200
+    return n, 200
 
 def create_notification(data):
     required_fields = ['user_id', 'title', 'message']
@@ -20,11 +64,13 @@ def create_notification(data):
         type=data.get('type'),
         title=data.get('title'),
         message=data.get('message'),
-        is_read=data.get('is_read', False)
+        is_read=bool(data.get('is_read', False))
     )
     db.session.add(new_n)
+    db.session.flush()
+    record_events(notification_events([serialize(new_n)]))
     db.session.commit()
-    return new_n.serialize(), 201
+    return serialize(new_n), 201
 
 def update_notification(notification_id, data):
     n = Notification.query.get(notification_id)
@@ -33,7 +79,8 @@ def update_notification(notification_id, data):
     for key, value in data.items():
         setattr(n, key, value)
     db.session.commit()
-    return n.serialize(), 200
+    entity_cache.invalidate(Notification, notification_id)
+    return serialize(n), 200
 
 def delete_notification(notification_id):
     n = Notification.query.get(notification_id)
@@ -41,4 +88,56 @@ def delete_notification(notification_id):
         return {"error": "Notification not found"}, 404
     db.session.delete(n)
     db.session.commit()
+    entity_cache.invalidate(Notification, notification_id)
     return {"message": "Notification deleted successfully"}, 200
+
+def get_unread_notification_count(user_id):
+    """Badge count: an index-only count over the partial index of unread rows."""
+    denied = require_self(user_id)
+    if denied:
+        return denied
+    if not cached_row(User, user_id):
+        return {"error": "User not found"}, 404
+    unread = db.session.query(func.count()).select_from(Notification).filter(
+        Notification.user_id == user_id, _unread()
+    ).scalar()
+    return {"user_id": user_id, "unread": unread}, 200
+
+def _mark_read(user_id, *criteria):
+    """One UPDATE over the user's unread rows matching `criteria`; returns the ids changed."""
+    table = Notification.__table__
+    statement = update(table).where(
+        table.c.user_id == user_id, table.c.is_read == db.false(), *criteria
+    ).values(is_read=True, updated_at=func.now()).returning(table.c.id)
+    ids = db.session.execute(statement).scalars().all()
+    if ids:
+        # Other open clients of the user clear the same badges
+        record_event('notifications_read', {'ids': sorted(ids)}, user_id=user_id)
+    db.session.commit()
+    for notification_id in ids:
+        entity_cache.invalidate(Notification, notification_id)
+    return ids
+
+def mark_all_notifications_read(user_id):
+    denied = require_self(user_id)
+    if denied:
+        return denied
+    if not cached_row(User, user_id):
+        return {"error": "User not found"}, 404
+    ids = _mark_read(user_id)
+    return {"user_id": user_id, "updated": len(ids)}, 200
+
+def mark_notifications_read(user_id, data):
+    denied = require_self(user_id)
+    if denied:
+        return denied
+    if not cached_row(User, user_id):
+        return {"error": "User not found"}, 404
+    ids = (data or {}).get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return {"error": "ids must be a non-empty list of notification ids"}, 400
+    if len(ids) > MAX_MARK_READ_IDS:
+        return {"error": f"At most {MAX_MARK_READ_IDS} notifications can be marked at once"}, 400
+    # Ids of other users' notifications are ignored by the user_id predicate
+    updated = _mark_read(user_id, Notification.__table__.c.id.in_(set(ids)))
+    return {"user_id": user_id, "updated": len(updated), "ids": sorted(updated)}, 200
@@ -1,15 +1,34 @@
 from datetime import datetime
 from server.models import db, ReceiptScan
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_receipt_scans():
-    scans = [scan.serialize() for scan in ReceiptScan.query.all()]
+def get_all_receipt_scans(fields=None):
+    try:
+        serializer = serializer_for(ReceiptScan).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = ReceiptScan.query.options(*serializer.load_options())
+    scans = [serializer.dump(scan) for scan in query.all()]
     return scans, 200
 
-def get_receipt_scan_by_id(scan_id):
-    scan = ReceiptScan.query.get(scan_id)
+def stream_all_receipt_scans(fields=None):
+    try:
+        serializer = serializer_for(ReceiptScan).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = ReceiptScan.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_receipt_scan_by_id(scan_id, fields=None):
+    try:
+        scan = cached_row(ReceiptScan, scan_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not scan:
         return {"error": "Receipt Scan not found"}, 404
-    return scan.serialize(), 200
+    return scan, 200
 
 def create_receipt_scan(data):
     required_fields = ['user_id']
@@ -45,7 +64,7 @@ def create_receipt_scan(data):
 
     db.session.add(new_scan)
     db.session.commit()
-    return new_scan.serialize(), 201
+    return serialize(new_scan), 201
 
 def update_receipt_scan(scan_id, data):
     scan = ReceiptScan.query.get(scan_id)
@@ -65,7 +84,8 @@ def update_receipt_scan(scan_id, data):
                     return {"error": f"Invalid {key} format. Please use ISO format."}, 400
             setattr(scan, key, value)
     db.session.commit()
-    return scan.serialize(), 200
+    entity_cache.invalidate(ReceiptScan, scan_id)
+    return serialize(scan), 200
 
 def delete_receipt_scan(scan_id):
     scan = ReceiptScan.query.get(scan_id)
@@ -73,4 +93,5 @@ def delete_receipt_scan(scan_id):
         return {"error": "Receipt Scan not found"}, 404
     db.session.delete(scan)
     db.session.commit()
+    entity_cache.invalidate(ReceiptScan, scan_id)
     return {"message": "Receipt Scan deleted successfully"}, 200
@@ -1,14 +1,33 @@
 from server.models import db, SmartBudget
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_smart_budgets():
-    smart_budgets = [sb.serialize() for sb in SmartBudget.query.all()]
+def get_all_smart_budgets(fields=None):
+    try:
+        serializer = serializer_for(SmartBudget).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = SmartBudget.query.options(*serializer.load_options())
+    smart_budgets = [serializer.dump(sb) for sb in query.all()]
     return smart_budgets, 200
 
-def get_smart_budget_by_id(sb_id):
-    sb = SmartBudget.query.get(sb_id)
+def stream_all_smart_budgets(fields=None):
+    try:
+        serializer = serializer_for(SmartBudget).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = SmartBudget.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_smart_budget_by_id(sb_id, fields=None):
+    try:
+        sb = cached_row(SmartBudget, sb_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not sb:
         return {"error": "Smart Budget not found"}, 404
-    return sb.serialize(), 200
+    return sb, 200
 
 def create_smart_budget(data):
     required_fields = ['budget_id']
@@ -25,7 +44,7 @@ def create_smart_budget(data):
     )
     db.session.add(new_sb)
     db.session.commit()
-    return new_sb.serialize(), 201
+    return serialize(new_sb), 201
 
 def update_smart_budget(sb_id, data):
     sb = SmartBudget.query.get(sb_id)
@@ -34,7 +53,8 @@ def update_smart_budget(sb_id, data):
     for key, value in data.items():
         setattr(sb, key, value)
     db.session.commit()
-    return sb.serialize(), 200
+    entity_cache.invalidate(SmartBudget, sb_id)
+    return serialize(sb), 200
 
 def delete_smart_budget(sb_id):
     sb = SmartBudget.query.get(sb_id)
@@ -42,4 +62,5 @@ def delete_smart_budget(sb_id):
         return {"error": "Smart Budget not found"}, 404
     db.session.delete(sb)
     db.session.commit()
+    entity_cache.invalidate(SmartBudget, sb_id)
     return {"message": "Smart Budget deleted successfully"}, 200
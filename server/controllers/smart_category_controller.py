@@ -1,20 +1,46 @@
 from server.models import db, SmartCategory
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
+from server.services.categorization import classify_description, invalidate_matcher, rule_terms
 
-def get_all_smart_categories():
-    smart_categories = [sc.serialize() for sc in SmartCategory.query.all()]
+MAX_CLASSIFY_DESCRIPTIONS = 1000
+
+def get_all_smart_categories(fields=None):
+    try:
+        serializer = serializer_for(SmartCategory).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = SmartCategory.query.options(*serializer.load_options())
+    smart_categories = [serializer.dump(sc) for sc in query.all()]
     return smart_categories, 200
 
-def get_smart_category_by_id(sc_id):
-    sc = SmartCategory.query.get(sc_id)
+def stream_all_smart_categories(fields=None):
+    try:
+        serializer = serializer_for(SmartCategory).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = SmartCategory.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_smart_category_by_id(sc_id, fields=None):
+    try:
+        sc = cached_row(SmartCategory, sc_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not sc:
         return {"error": "Smart Category not found"}, 404
-    return sc.serialize(), 200
+    return sc, 200
 
 def create_smart_category(data):
     required_fields = ['name']
     for field in required_fields:
         if not data.get(field):
             return {"error": f"{field} is required"}, 400
+    try:
+        rule_terms(data.get('rules_set'))
+    except ValueError as e:
+        return {"error": str(e)}, 400
     new_sc = SmartCategory(
         name=data.get('name'),
         parent_category_id=data.get('parent_category_id'),
@@ -24,16 +50,24 @@ def create_smart_category(data):
     )
     db.session.add(new_sc)
     db.session.commit()
-    return new_sc.serialize(), 201
+    invalidate_matcher()
+    return serialize(new_sc), 201
 
 def update_smart_category(sc_id, data):
     sc = SmartCategory.query.get(sc_id)
     if not sc:
         return {"error": "Smart Category not found"}, 404
+    if 'rules_set' in data:
+        try:
+            rule_terms(data['rules_set'])
+        except ValueError as e:
+            return {"error": str(e)}, 400
     for key, value in data.items():
         setattr(sc, key, value)
     db.session.commit()
-    return sc.serialize(), 200
+    entity_cache.invalidate(SmartCategory, sc_id)
+    invalidate_matcher()
+    return serialize(sc), 200
 
 def delete_smart_category(sc_id):
     sc = SmartCategory.query.get(sc_id)
@@ -41,4 +75,33 @@ def delete_smart_category(sc_id):
         return {"error": "Smart Category not found"}, 404
     db.session.delete(sc)
     db.session.commit()
+    entity_cache.invalidate(SmartCategory, sc_id)
+    invalidate_matcher()
     return {"message": "Smart Category deleted successfully"}, 200
+
+def _classification(description, kind):
+    match = classify_description(description, kind)
+    return {
+        "description": description,
+        "smart_category_id": match.smart_category_id if match else None,
+        "category_id": match.category_id if match else None,
+        "confidence": match.confidence if match else None
+    }
+
+def classify_descriptions(data):
+    """
+    Runs the compiled smart category rules over one description or a list of them.
+    `type` (expense or income) restricts the match to categories of that type.
+    """
+    data = data or {}
+    kind = data.get('type')
+    if 'descriptions' in data:
+        descriptions = data.get('descriptions')
+        if not isinstance(descriptions, list) or not all(isinstance(d, str) for d in descriptions):
+            return {"error": "descriptions must be a list of strings"}, 400
+        if len(descriptions) > MAX_CLASSIFY_DESCRIPTIONS:
+            return {"error": f"At most {MAX_CLASSIFY_DESCRIPTIONS} descriptions can be classified at once"}, 400
+        return [_classification(description, kind) for description in descriptions], 200
+    if not isinstance(data.get('description'), str) or not data.get('description'):
+        return {"error": "description is required"}, 400
+    return _classification(data['description'], kind), 200
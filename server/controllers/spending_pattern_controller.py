@@ -1,14 +1,33 @@
 from server.models import db, SpendingPattern
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_spending_patterns():
-    patterns = [sp.serialize() for sp in SpendingPattern.query.all()]
+def get_all_spending_patterns(fields=None):
+    try:
+        serializer = serializer_for(SpendingPattern).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = SpendingPattern.query.options(*serializer.load_options())
+    patterns = [serializer.dump(sp) for sp in query.all()]
     return patterns, 200
 
-def get_spending_pattern_by_id(pattern_id):
-    sp = SpendingPattern.query.get(pattern_id)
+def stream_all_spending_patterns(fields=None):
+    try:
+        serializer = serializer_for(SpendingPattern).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = SpendingPattern.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_spending_pattern_by_id(pattern_id, fields=None):
+    try:
+        sp = cached_row(SpendingPattern, pattern_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not sp:
         return {"error": "Spending Pattern not found"}, 404
-    return sp.serialize(), 200
+    return sp, 200
 
 def create_spending_pattern(data):
     required_fields = ['user_id', 'pattern_type']
@@ -25,7 +44,7 @@ def create_spending_pattern(data):
     )
     db.session.add(new_sp)
     db.session.commit()
-    return new_sp.serialize(), 201
+    return serialize(new_sp), 201
 
 def update_spending_pattern(pattern_id, data):
     sp = SpendingPattern.query.get(pattern_id)
@@ -34,7 +53,8 @@ def update_spending_pattern(pattern_id, data):
     for key, value in data.items():
         setattr(sp, key, value)
     db.session.commit()
-    return sp.serialize(), 200
+    entity_cache.invalidate(SpendingPattern, pattern_id)
+    return serialize(sp), 200
 
 def delete_spending_pattern(pattern_id):
     sp = SpendingPattern.query.get(pattern_id)
@@ -42,4 +62,5 @@ def delete_spending_pattern(pattern_id):
         return {"error": "Spending Pattern not found"}, 404
     db.session.delete(sp)
     db.session.commit()
+    entity_cache.invalidate(SpendingPattern, pattern_id)
     return {"message": "Spending Pattern deleted successfully"}, 200
@@ -1,48 +1,278 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
 from server.models import db, Transaction
+from server.utils.serializers import serialize, serializer_for
+from server.utils.pagination import parse_limit, encode_cursor, decode_cursor
+from server.utils.authorization import accessible_wallets_filter, require_wallet_access, require_wallets_access
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
+from server.services.categorization import classify_description
+from server.services.transaction_effects import apply_transaction_effects, transaction_snapshot
 
-def get_all_transactions():
-    transactions = [transaction.serialize() for transaction in Transaction.query.all()]
-    return transactions, 200
+def _parse_int_filter(filters, key):
+    value = filters.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be an integer")
+
+def _parse_amount_filter(filters, key):
+    value = filters.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"{key} must be a number")
+
+def _parse_amount(value):
+    """Decimal for a JSON number or numeric string, None when it is not a finite number."""
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
+
+def _parse_date_filter(filters, key):
+    value = filters.get(key)
+    if value in (None, ''):
+        return None, False
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {key} format. Please use ISO format.")
+    # A bare date such as 2025-03-31 covers the whole day
+    return parsed, len(value) == 10
+
+def apply_transaction_filters(query, filters):
+    """
+    Narrows a Transaction query by the supported query parameters. Every filter is a
+    SQL predicate, so wallet/category + date range lookups are served by the
+    (wallet_id, date) and (category_id, date) indexes instead of a full scan.
+    """
+    if not filters:
+        return query
+
+    for key in ('wallet_id', 'category_id', 'created_by'):
+        value = _parse_int_filter(filters, key)
+        if value is not None:
+            query = query.filter(getattr(Transaction, key) == value)
+
+    if filters.get('type'):
+        query = query.filter(Transaction.type == filters.get('type'))
+
+    date_from, _ = _parse_date_filter(filters, 'date_from')
+    if date_from is not None:
+        query = query.filter(Transaction.date >= date_from)
+    date_to, whole_day = _parse_date_filter(filters, 'date_to')
+    if date_to is not None:
+        if whole_day:
+            query = query.filter(Transaction.date < date_to + timedelta(days=1))
+        else:
+            query = query.filter(Transaction.date <= date_to)
+
+    min_amount = _parse_amount_filter(filters, 'min_amount')
+    if min_amount is not None:
+        query = query.filter(Transaction.amount >= min_amount)
+    max_amount = _parse_amount_filter(filters, 'max_amount')
+    if max_amount is not None:
+        query = query.filter(Transaction.amount <= max_amount)
+
+    return query
+
+def get_all_transactions(filters=None, limit=None, cursor=None, fields=None):
+    try:
+        limit = parse_limit(limit)
+        serializer = serializer_for(Transaction).only(fields)
+        query = apply_transaction_filters(Transaction.query, filters)
+        query = query.filter(*accessible_wallets_filter(Transaction.wallet_id))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+
+    # Newest first; (date, id) is unique so it is a stable keyset for paging
+    query = query.options(*serializer.load_options(required=('date',)))
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            last_date = datetime.fromisoformat(last_date)
+            last_id = int(last_id)
+        except Exception:
+            return {"error": "Invalid cursor"}, 400
+        # Seek past the last row of the previous page instead of using OFFSET,
+        # so deep pages cost the same as the first one
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < tuple_(last_date, last_id))
+
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1].date, page[-1].id)
+
+    return {
+        "transactions": [serializer.dump(transaction) for transaction in page],
+        "limit": limit,
+        "next_cursor": next_cursor
+    }, 200
 
-def get_transaction_by_id(transaction_id):
-    transaction = Transaction.query.get(transaction_id)
+def stream_all_transactions(filters=None, fields=None):
+    try:
+        serializer = serializer_for(Transaction).only(fields)
+        query = apply_transaction_filters(Transaction.query, filters)
+        query = query.filter(*accessible_wallets_filter(Transaction.wallet_id))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_transaction_by_id(transaction_id, fields=None):
+    try:
+        serializer = serializer_for(Transaction).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    # The full row is read so the wallet can be checked whatever ?fields asks for
+    transaction = cached_row(Transaction, transaction_id)
     if not transaction:
         return {"error": "Transaction not found"}, 404
-    return transaction.serialize(), 200
+    denied = require_wallet_access(transaction['wallet_id'])
+    if denied:
+        return denied
+    return {key: transaction[key] for key in serializer.fields}, 200
 
-def create_transaction(data):
-    required_fields = ['wallet_id', 'category_id', 'amount', 'type', 'date', 'created_by']
+MAX_BATCH_SIZE = 5000
+BATCH_ERROR_MODES = ('abort', 'skip')
+
+def _validate_transaction(data):
+    """
+    Shared rules for single and batch creates. Returns (values, None) for a valid row
+    or (None, error message) for an invalid one.
+    """
+    if not isinstance(data, dict):
+        return None, "Transaction must be an object"
+
+    required_fields = ['wallet_id', 'amount', 'type', 'date', 'created_by']
     for field in required_fields:
         if not data.get(field):
-            return {"error": f"{field} is required"}, 400
+            return None, f"{field} is required"
+    if data.get('description') is not None and not isinstance(data.get('description'), str):
+        return None, "description must be a string"
+
+    category_id = data.get('category_id')
+    if not category_id:
+        # Without an explicit category the smart category rules may supply one
+        match = classify_description(data.get('description'), data.get('type'))
+        if match is None:
+            return None, "category_id is required"
+        category_id = match.category_id
 
     try:
         # Expecting ISO format date string
         date = datetime.fromisoformat(data.get('date'))
     except Exception:
-        return {"error": "Invalid date format. Please use ISO format."}, 400
-
-    new_transaction = Transaction(
-        wallet_id=data.get('wallet_id'),
-        category_id=data.get('category_id'),
-        amount=data.get('amount'),
-        type=data.get('type'),
-        description=data.get('description'),
-        date=date,
-        is_recurring=data.get('is_recurring', False),
-        recurring_interval=data.get('recurring_interval'),
-        created_by=data.get('created_by')
-    )
+        return None, "Invalid date format. Please use ISO format."
+
+    amount = _parse_amount(data.get('amount'))
+    if amount is None:
+        return None, "amount must be a number"
+
+    return {
+        'wallet_id': data.get('wallet_id'),
+        'category_id': category_id,
+        'amount': amount,
+        'type': data.get('type'),
+        'description': data.get('description'),
+        'date': date,
+        'is_recurring': data.get('is_recurring', False),
+        'recurring_interval': data.get('recurring_interval'),
+        'created_by': data.get('created_by')
+    }, None
+
+def create_transaction(data):
+    values, error = _validate_transaction(data)
+    if error:
+        return {"error": error}, 400
+    denied = require_wallet_access(values['wallet_id'], 'editor')
+    if denied:
+        return denied
+
+    new_transaction = Transaction(**values)
 
     db.session.add(new_transaction)
+    apply_transaction_effects(added=[values])
     db.session.commit()
-    return new_transaction.serialize(), 201
+    return serialize(new_transaction), 201
+
+def create_transactions_batch(rows, on_error='abort'):
+    """
+    Validates every row with the create_transaction rules and inserts the valid ones
+    with a single executemany in one database transaction.
+
+    on_error='abort' rejects the whole batch at the first invalid row; 'skip' inserts
+    the valid rows and reports the invalid ones. Results are returned per input row,
+    in input order.
+    """
+    if not isinstance(rows, list) or not rows:
+        return {"error": "transactions must be a non-empty list"}, 400
+    if len(rows) > MAX_BATCH_SIZE:
+        return {"error": f"A batch can contain at most {MAX_BATCH_SIZE} transactions"}, 400
+    if on_error not in BATCH_ERROR_MODES:
+        return {"error": f"on_error must be one of: {', '.join(BATCH_ERROR_MODES)}"}, 400
+
+    results = []
+    valid_rows = []
+    for index, data in enumerate(rows):
+        values, error = _validate_transaction(data)
+        if error:
+            if on_error == 'abort':
+                return {"error": f"Row {index}: {error}", "index": index}, 400
+            results.append({"index": index, "status": "skipped", "error": error})
+            continue
+        results.append({"index": index, "status": "created"})
+        valid_rows.append(values)
+    denied = require_wallets_access([values['wallet_id'] for values in valid_rows], 'editor')
+    if denied:
+        return denied
+
+    if valid_rows:
+        # insertmanyvalues batches this into multi-row INSERT ... RETURNING statements;
+        # sort_by_parameter_order keeps the returned ids aligned with the input rows
+        statement = insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True)
+        try:
+            ids = db.session.execute(statement, valid_rows).scalars().all()
+            apply_transaction_effects(added=valid_rows)
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            return {"error": f"Batch rejected by the database: {e.orig}"}, 400
+        created = iter(ids)
+        for result in results:
+            if result["status"] == "created":
+                result["id"] = next(created)
+
+    return {
+        "created": len(valid_rows),
+        "skipped": len(rows) - len(valid_rows),
+        "results": results
+    }, 201 if valid_rows else 200
 
 def update_transaction(transaction_id, data):
-    transaction = Transaction.query.get(transaction_id)
+    # Row lock: two concurrent updates must not both reverse the same old amount
+    transaction = Transaction.query.with_for_update().get(transaction_id)
     if not transaction:
         return {"error": "Transaction not found"}, 404
+    # Moving a transaction needs edit access to both wallets
+    denied = require_wallets_access({transaction.wallet_id, data.get('wallet_id', transaction.wallet_id)}, 'editor')
+    if denied:
+        return denied
+    before = transaction_snapshot(transaction)
 
     allowed_fields = {'wallet_id', 'category_id', 'amount', 'type', 'description', 'date', 'is_recurring', 'recurring_interval'}
     for key, value in data.items():
@@ -52,14 +282,26 @@ def update_transaction(transaction_id, data):
                     value = datetime.fromisoformat(value)
                 except Exception:
                     return {"error": "Invalid date format. Please use ISO format."}, 400
+            if key == 'amount':
+                value = _parse_amount(value)
+                if value is None:
+                    return {"error": "amount must be a number"}, 400
             setattr(transaction, key, value)
+    apply_transaction_effects(added=[transaction_snapshot(transaction)], removed=[before])
     db.session.commit()
-    return transaction.serialize(), 200
+    entity_cache.invalidate(Transaction, transaction_id)
+    return serialize(transaction), 200
 
 def delete_transaction(transaction_id):
-    transaction = Transaction.query.get(transaction_id)
+    transaction = Transaction.query.with_for_update().get(transaction_id)
     if not transaction:
         return {"error": "Transaction not found"}, 404
+    denied = require_wallet_access(transaction.wallet_id, 'editor')
+    if denied:
+        return denied
+    removed = transaction_snapshot(transaction)
     db.session.delete(transaction)
+    apply_transaction_effects(removed=[removed])
     db.session.commit()
+    entity_cache.invalidate(Transaction, transaction_id)
     return {"message": "Transaction deleted successfully"}, 200
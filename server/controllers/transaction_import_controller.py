@@ -0,0 +1,66 @@
+import os
+import tempfile
+from server.models import db, Wallet, TransactionImport
+from server.utils.authorization import require_wallet_access
+from server.utils.serializers import serialize
+from server.services.transaction_import import IMPORT_FORMATS, resolve_mapping, start_import
+
+def _import_status(transaction_import):
+    data = serialize(transaction_import)
+    total = transaction_import.bytes_total or 0
+    data['progress'] = round(100 * (transaction_import.bytes_processed or 0) / total, 1) if total else None
+    return data
+
+def start_transaction_import(upload, form):
+    if upload is None or not upload.filename:
+        return {"error": "file is required"}, 400
+    required_fields = ['wallet_id', 'created_by']
+    for field in required_fields:
+        if not form.get(field):
+            return {"error": f"{field} is required"}, 400
+
+    extension = os.path.splitext(upload.filename)[1].lstrip('.').lower()
+    import_format = (form.get('format') or extension).lower()
+    if import_format not in IMPORT_FORMATS:
+        return {"error": f"format must be one of: {', '.join(IMPORT_FORMATS)}"}, 400
+    try:
+        wallet_id = int(form.get('wallet_id'))
+        created_by = int(form.get('created_by'))
+        default_category_id = int(form['default_category_id']) if form.get('default_category_id') else None
+        mapping = resolve_mapping(form.get('mapping')) if import_format == 'csv' else None
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if not Wallet.query.get(wallet_id):
+        return {"error": "Wallet not found"}, 404
+    denied = require_wallet_access(wallet_id, 'editor')
+    if denied:
+        return denied
+
+    # Werkzeug has already spooled large uploads to disk; copy it somewhere that
+    # outlives the request so the background import can read it line by line
+    fd, path = tempfile.mkstemp(prefix='spendwise-import-', suffix=f'.{import_format}')
+    with os.fdopen(fd, 'wb') as destination:
+        upload.save(destination)
+
+    transaction_import = TransactionImport(
+        wallet_id=wallet_id,
+        created_by=created_by,
+        format=import_format,
+        filename=upload.filename,
+        status='pending',
+        bytes_total=os.path.getsize(path)
+    )
+    db.session.add(transaction_import)
+    db.session.commit()
+
+    start_import(transaction_import.id, path, mapping, default_category_id)
+    return _import_status(transaction_import), 202
+
+def get_transaction_import_by_id(import_id):
+    transaction_import = TransactionImport.query.get(import_id)
+    if not transaction_import:
+        return {"error": "Import not found"}, 404
+    denied = require_wallet_access(transaction_import.wallet_id)
+    if denied:
+        return denied
+    return _import_status(transaction_import), 200
@@ -1,14 +1,33 @@
 from server.models import db, User
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_users():
-    users = [user.serialize() for user in User.query.all()]
+def get_all_users(fields=None):
+    try:
+        serializer = serializer_for(User).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = User.query.options(*serializer.load_options())
+    users = [serializer.dump(user) for user in query.all()]
     return users, 200
 
-def get_user_by_id(user_id):
-    user = User.query.get(user_id)
+def stream_all_users(fields=None):
+    try:
+        serializer = serializer_for(User).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = User.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_user_by_id(user_id, fields=None):
+    try:
+        user = cached_row(User, user_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not user:
         return {"error": "User not found"}, 404
-    return user.serialize(), 200
+    return user, 200
 
 def create_user(data):
     required_fields = ['username', 'email', 'password']
@@ -31,7 +50,7 @@ def create_user(data):
     new_user.set_password(data.get('password'))
     db.session.add(new_user)
     db.session.commit()
-    return new_user.serialize(), 201
+    return serialize(new_user), 201
 
 def update_user(user_id, data):
     user = User.query.get(user_id)
@@ -47,7 +66,8 @@ def update_user(user_id, data):
         else:
             setattr(user, key, value)
     db.session.commit()
-    return user.serialize(), 200
+    entity_cache.invalidate(User, user_id)
+    return serialize(user), 200
 
 def delete_user(user_id):
     user = User.query.get(user_id)
@@ -56,4 +76,5 @@ def delete_user(user_id):
 
     db.session.delete(user)
     db.session.commit()
+    entity_cache.invalidate(User, user_id)
     return {"message": "User deleted successfully"}, 200
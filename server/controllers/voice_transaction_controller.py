@@ -1,15 +1,34 @@
 from server.models import db, VoiceTransaction
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 from datetime import datetime
 
-def get_all_voice_transactions():
-    transactions = [vt.serialize() for vt in VoiceTransaction.query.all()]
+def get_all_voice_transactions(fields=None):
+    try:
+        serializer = serializer_for(VoiceTransaction).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = VoiceTransaction.query.options(*serializer.load_options())
+    transactions = [serializer.dump(vt) for vt in query.all()]
     return transactions, 200
 
-def get_voice_transaction_by_id(vt_id):
-    vt = VoiceTransaction.query.get(vt_id)
+def stream_all_voice_transactions(fields=None):
+    try:
+        serializer = serializer_for(VoiceTransaction).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = VoiceTransaction.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_voice_transaction_by_id(vt_id, fields=None):
+    try:
+        vt = cached_row(VoiceTransaction, vt_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not vt:
         return {"error": "Voice Transaction not found"}, 404
-    return vt.serialize(), 200
+    return vt, 200
 
 def create_voice_transaction(data):
     required_fields = ['user_id']
@@ -32,7 +51,7 @@ def create_voice_transaction(data):
             return {"error": "Invalid processed_at format. Please use ISO format."}, 400
     db.session.add(new_vt)
     db.session.commit()
-    return new_vt.serialize(), 201
+    return serialize(new_vt), 201
 
 def update_voice_transaction(vt_id, data):
     vt = VoiceTransaction.query.get(vt_id)
@@ -46,7 +65,8 @@ def update_voice_transaction(vt_id, data):
                 return {"error": "Invalid processed_at format. Please use ISO format."}, 400
         setattr(vt, key, value)
     db.session.commit()
-    return vt.serialize(), 200
+    entity_cache.invalidate(VoiceTransaction, vt_id)
+    return serialize(vt), 200
 
 def delete_voice_transaction(vt_id):
     vt = VoiceTransaction.query.get(vt_id)
@@ -54,4 +74,5 @@ def delete_voice_transaction(vt_id):
         return {"error": "Voice Transaction not found"}, 404
     db.session.delete(vt)
     db.session.commit()
+    entity_cache.invalidate(VoiceTransaction, vt_id)
     return {"message": "Voice Transaction deleted successfully"}, 200
@@ -1,14 +1,65 @@
-from server.models import db, Wallet
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from server.models import db, Wallet, WalletCollaborator
+from server.utils.serializers import format_decimal, serialize, serializer_for
+from server.utils.authorization import accessible_wallets_filter, invalidate_wallet_access, require_wallet_access
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
+from server.services.events import record_event
+from server.services.rollups import wallet_summary
 
-def get_all_wallets():
-    wallets = [wallet.serialize() for wallet in Wallet.query.all()]
+def _record_access(wallet, action):
+    # The owner's and collaborators' event streams reload which wallets they follow
+    record_event('wallet_access', {
+        'action': action,
+        'wallet_id': wallet.id,
+        'user_id': wallet.owner_id,
+        'permission_level': 'owner'
+    }, user_id=wallet.owner_id, wallet_id=wallet.id)
+
+def get_all_wallets(fields=None, expand=None):
+    try:
+        serializer = serializer_for(Wallet).only(fields)
+        expand = serializer.parse_expand(expand)
+        criteria = accessible_wallets_filter(Wallet.id)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = Wallet.query.filter(*criteria).options(*serializer.load_options(expand))
+    wallets = [serializer.dump(wallet, expand) for wallet in query.all()]
     return wallets, 200
 
-def get_wallet_by_id(wallet_id):
-    wallet = Wallet.query.get(wallet_id)
+def stream_all_wallets(fields=None):
+    try:
+        serializer = serializer_for(Wallet).only(fields)
+        criteria = accessible_wallets_filter(Wallet.id)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except PermissionError as e:
+        return {"error": str(e)}, 401
+    query = Wallet.query.filter(*criteria).options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_wallet_by_id(wallet_id, fields=None, expand=None):
+    try:
+        serializer = serializer_for(Wallet).only(fields)
+        expand = serializer.parse_expand(expand)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    denied = require_wallet_access(wallet_id)
+    if denied:
+        return denied
+    if not expand:
+        # Plain lookups go through the row cache; expanded ones need the relationships
+        wallet = cached_row(Wallet, wallet_id, fields)
+        if not wallet:
+            return {"error": "Wallet not found"}, 404
+        return wallet, 200
+    wallet = Wallet.query.options(*serializer.load_options(expand)).get(wallet_id)
     if not wallet:
         return {"error": "Wallet not found"}, 404
-    return wallet.serialize(), 200
+    return serializer.dump(wallet, expand), 200
 
 def create_wallet(data):
     required_fields = ['name', 'owner_id']
@@ -21,30 +72,117 @@ def create_wallet(data):
         description=data.get('description'),
         currency=data.get('currency', 'KES'),
         balance=data.get('balance', 0),
+        opening_balance=data.get('balance', 0),
         type=data.get('type'),
         owner_id=data.get('owner_id')
     )
 
     db.session.add(new_wallet)
+    db.session.flush()
+    _record_access(new_wallet, 'added')
     db.session.commit()
-    return new_wallet.serialize(), 201
+    invalidate_wallet_access(new_wallet.owner_id)
+    return serialize(new_wallet), 201
 
 def update_wallet(wallet_id, data):
     wallet = Wallet.query.get(wallet_id)
     if not wallet:
         return {"error": "Wallet not found"}, 404
+    denied = require_wallet_access(wallet_id, 'editor')
+    if denied:
+        return denied
 
-    allowed_fields = {'name', 'description', 'currency', 'balance', 'type'}
+    allowed_fields = {'name', 'description', 'currency', 'type'}
     for key, value in data.items():
         if key in allowed_fields:
             setattr(wallet, key, value)
+    if 'balance' in data:
+        # Setting the balance by hand moves the opening balance by the same amount,
+        # computed in SQL so a concurrent transaction delta is not lost
+        try:
+            balance = Decimal(str(data['balance']))
+        except InvalidOperation:
+            return {"error": "balance must be a number"}, 400
+        wallet.opening_balance = Wallet.opening_balance + (balance - Wallet.balance)
+        wallet.balance = balance
     db.session.commit()
-    return wallet.serialize(), 200
+    entity_cache.invalidate(Wallet, wallet_id)
+    return serialize(wallet), 200
 
 def delete_wallet(wallet_id):
     wallet = Wallet.query.get(wallet_id)
     if not wallet:
         return {"error": "Wallet not found"}, 404
+    denied = require_wallet_access(wallet_id, 'owner')
+    if denied:
+        return denied
+    members = [wallet.owner_id] + [
+        user_id for user_id, in db.session.query(WalletCollaborator.user_id).filter_by(wallet_id=wallet_id)
+    ]
+    _record_access(wallet, 'removed')
     db.session.delete(wallet)
     db.session.commit()
+    entity_cache.invalidate(Wallet, wallet_id)
+    invalidate_wallet_access(*members)
     return {"message": "Wallet deleted successfully"}, 200
+
+def _parse_month(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise ValueError(f"{name} must be a month in YYYY-MM format")
+
+def get_wallet_summary(wallet_id, month_from=None, month_to=None):
+    wallet = cached_row(Wallet, wallet_id)
+    if not wallet:
+        return {"error": "Wallet not found"}, 404
+    denied = require_wallet_access(wallet_id)
+    if denied:
+        return denied
+    try:
+        month_from = _parse_month(month_from, 'from')
+        month_to = _parse_month(month_to, 'to')
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    months, categories = wallet_summary(wallet_id, month_from, month_to)
+    totals = {'income': Decimal(0), 'expense': Decimal(0)}
+    count = 0
+    by_month = {}
+    for month, type_, total, month_count in months:
+        entry = by_month.setdefault(month, {"month": month.strftime('%Y-%m'), "income": Decimal(0), "expense": Decimal(0), "count": 0})
+        entry[type_] = entry.get(type_, Decimal(0)) + total
+        entry["count"] += month_count
+        totals[type_] = totals.get(type_, Decimal(0)) + total
+        count += month_count
+
+    return {
+        "wallet_id": wallet_id,
+        "currency": wallet['currency'],
+        "balance": wallet['balance'],
+        "from": month_from.strftime('%Y-%m') if month_from else None,
+        "to": month_to.strftime('%Y-%m') if month_to else None,
+        "totals": {
+            "income": format_decimal(totals['income']),
+            "expense": format_decimal(totals['expense']),
+            "net": format_decimal(totals['income'] - totals['expense']),
+            "count": count
+        },
+        "months": [
+            {key: format_decimal(value) if isinstance(value, Decimal) else value for key, value in entry.items()}
+            for entry in by_month.values()
+        ],
+        "categories": [
+            {
+                "category_id": category_id,
+                "type": type_,
+                "total": format_decimal(total),
+                "count": category_count,
+                "min_amount": format_decimal(min_amount),
+                "max_amount": format_decimal(max_amount)
+            }
+            for category_id, type_, total, category_count, min_amount, max_amount in categories
+        ]
+    }, 200
@@ -1,21 +1,66 @@
 from server.models import db, WalletCollaborator
+from server.services.events import record_event
+from server.utils.serializers import serialize, serializer_for
+from server.utils.authorization import invalidate_wallet_access, require_wallet_access
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_collaborators_for_wallet(wallet_id):
-    collaborators = WalletCollaborator.query.filter_by(wallet_id=wallet_id).all()
-    collaborators_serialized = [collaborator.serialize() for collaborator in collaborators]
+def _record_access(collaborator, action):
+    # Open event streams of the collaborator reload which wallets they may follow
+    record_event('wallet_access', {
+        'action': action,
+        'wallet_id': collaborator.wallet_id,
+        'user_id': collaborator.user_id,
+        'permission_level': collaborator.permission_level
+    }, user_id=collaborator.user_id, wallet_id=collaborator.wallet_id)
+
+def get_collaborators_for_wallet(wallet_id, fields=None):
+    try:
+        serializer = serializer_for(WalletCollaborator).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    denied = require_wallet_access(wallet_id)
+    if denied:
+        return denied
+    query = WalletCollaborator.query.options(*serializer.load_options())
+    collaborators = query.filter_by(wallet_id=wallet_id).all()
+    collaborators_serialized = [serializer.dump(collaborator) for collaborator in collaborators]
     return collaborators_serialized, 200
 
-def get_wallet_collaborator_by_id(wallet_id, collaborator_id):
-    collaborator = WalletCollaborator.query.filter_by(wallet_id=wallet_id, id=collaborator_id).first()
-    if not collaborator:
+def stream_collaborators_for_wallet(wallet_id, fields=None):
+    try:
+        serializer = serializer_for(WalletCollaborator).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    denied = require_wallet_access(wallet_id)
+    if denied:
+        return denied
+    query = WalletCollaborator.query.options(*serializer.load_options())
+    return ndjson_response(query.filter_by(wallet_id=wallet_id), serialize=serializer.dump)
+
+def get_wallet_collaborator_by_id(wallet_id, collaborator_id, fields=None):
+    try:
+        serializer = serializer_for(WalletCollaborator).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    denied = require_wallet_access(wallet_id)
+    if denied:
+        return denied
+    collaborator = cached_row(WalletCollaborator, collaborator_id)
+    # Rows are cached by id alone, so the wallet still has to match
+    if not collaborator or collaborator['wallet_id'] != wallet_id:
         return {"error": "Collaborator not found"}, 404
-    return collaborator.serialize(), 200
+    return {key: collaborator[key] for key in serializer.fields}, 200
 
 def add_collaborator(wallet_id, data):
     required_fields = ['user_id', 'permission_level']
     for field in required_fields:
         if not data.get(field):
             return {"error": f"{field} is required"}, 400
+    # Only owners share or unshare a wallet
+    denied = require_wallet_access(wallet_id, 'owner')
+    if denied:
+        return denied
 
     new_collaborator = WalletCollaborator(
         wallet_id=wallet_id,
@@ -24,25 +69,40 @@ def add_collaborator(wallet_id, data):
     )
 
     db.session.add(new_collaborator)
+    db.session.flush()
+    _record_access(new_collaborator, 'added')
     db.session.commit()
-    return new_collaborator.serialize(), 201
+    invalidate_wallet_access(new_collaborator.user_id)
+    return serialize(new_collaborator), 201
 
 def update_collaborator(wallet_id, collaborator_id, data):
     collaborator = WalletCollaborator.query.filter_by(wallet_id=wallet_id, id=collaborator_id).first()
     if not collaborator:
         return {"error": "Collaborator not found"}, 404
+    denied = require_wallet_access(wallet_id, 'owner')
+    if denied:
+        return denied
 
     allowed_fields = {'permission_level'}
     for key, value in data.items():
         if key in allowed_fields:
             setattr(collaborator, key, value)
     db.session.commit()
-    return collaborator.serialize(), 200
+    entity_cache.invalidate(WalletCollaborator, collaborator_id)
+    invalidate_wallet_access(collaborator.user_id)
+    return serialize(collaborator), 200
 
 def delete_collaborator(wallet_id, collaborator_id):
     collaborator = WalletCollaborator.query.filter_by(wallet_id=wallet_id, id=collaborator_id).first()
     if not collaborator:
         return {"error": "Collaborator not found"}, 404
+    denied = require_wallet_access(wallet_id, 'owner')
+    if denied:
+        return denied
+    user_id = collaborator.user_id
+    _record_access(collaborator, 'removed')
     db.session.delete(collaborator)
     db.session.commit()
+    entity_cache.invalidate(WalletCollaborator, collaborator_id)
+    invalidate_wallet_access(user_id)
     return {"message": "Collaborator deleted successfully"}, 200
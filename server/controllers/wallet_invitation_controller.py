@@ -1,15 +1,49 @@
 from server.models import db, WalletInvitation
+from server.services.invitations import effective_status
+from server.utils.serializers import format_datetime, serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 from datetime import datetime
 
-def get_all_wallet_invitations():
-    invitations = [inv.serialize() for inv in WalletInvitation.query.all()]
+def _invitations_query(serializer):
+    # The status column is replaced by effective_status, computed by the database
+    return db.session.query(WalletInvitation, effective_status().label('effective_status')).options(
+        *serializer.load_options()
+    )
+
+def _dumper(serializer):
+    if 'status' not in serializer.fields:
+        return lambda row: serializer.dump(row[0])
+    return lambda row: dict(serializer.dump(row[0]), status=row[1])
+
+def get_all_wallet_invitations(fields=None):
+    try:
+        serializer = serializer_for(WalletInvitation).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    dump = _dumper(serializer)
+    invitations = [dump(row) for row in _invitations_query(serializer).all()]
     return invitations, 200
 
-def get_wallet_invitation_by_id(invitation_id):
-    inv = WalletInvitation.query.get(invitation_id)
+def stream_all_wallet_invitations(fields=None):
+    try:
+        serializer = serializer_for(WalletInvitation).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    return ndjson_response(_invitations_query(serializer), serialize=_dumper(serializer))
+
+def get_wallet_invitation_by_id(invitation_id, fields=None):
+    try:
+        serializer = serializer_for(WalletInvitation).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    inv = cached_row(WalletInvitation, invitation_id)
     if not inv:
         return {"error": "Wallet Invitation not found"}, 404
-    return inv.serialize(), 200
+    if inv['status'] == 'pending' and inv['expires_at'] and inv['expires_at'] <= format_datetime(datetime.utcnow()):
+        # Same rule as effective_status, for a row the sweeper has not reached yet
+        inv['status'] = 'expired'
+    return {key: inv[key] for key in serializer.fields}, 200
 
 def create_wallet_invitation(data):
     required_fields = ['wallet_id', 'invited_by', 'invited_email', 'permission_level']
@@ -30,7 +64,7 @@ def create_wallet_invitation(data):
             return {"error": "Invalid expires_at format. Please use ISO format."}, 400
     db.session.add(new_inv)
     db.session.commit()
-    return new_inv.serialize(), 201
+    return serialize(new_inv), 201
 
 def update_wallet_invitation(invitation_id, data):
     inv = WalletInvitation.query.get(invitation_id)
@@ -44,7 +78,8 @@ def update_wallet_invitation(invitation_id, data):
                 return {"error": "Invalid expires_at format. Please use ISO format."}, 400
         setattr(inv, key, value)
     db.session.commit()
-    return inv.serialize(), 200
+    entity_cache.invalidate(WalletInvitation, invitation_id)
+    return serialize(inv), 200
 
 def delete_wallet_invitation(invitation_id):
     inv = WalletInvitation.query.get(invitation_id)
@@ -52,4 +87,5 @@ def delete_wallet_invitation(invitation_id):
         return {"error": "Wallet Invitation not found"}, 404
     db.session.delete(inv)
     db.session.commit()
+    entity_cache.invalidate(WalletInvitation, invitation_id)
     return {"message": "Wallet Invitation deleted successfully"}, 200
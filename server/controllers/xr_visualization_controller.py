@@ -1,14 +1,33 @@
 from server.models import db, XRVisualization
+from server.utils.serializers import serialize, serializer_for
+from server.utils.cache import cached_row, entity_cache
+from server.utils.streaming import ndjson_response
 
-def get_all_xr_visualizations():
-    visualizations = [xr.serialize() for xr in XRVisualization.query.all()]
+def get_all_xr_visualizations(fields=None):
+    try:
+        serializer = serializer_for(XRVisualization).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = XRVisualization.query.options(*serializer.load_options())
+    visualizations = [serializer.dump(xr) for xr in query.all()]
     return visualizations, 200
 
-def get_xr_visualization_by_id(xr_id):
-    xr = XRVisualization.query.get(xr_id)
+def stream_all_xr_visualizations(fields=None):
+    try:
+        serializer = serializer_for(XRVisualization).only(fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    query = XRVisualization.query.options(*serializer.load_options())
+    return ndjson_response(query, serialize=serializer.dump)
+
+def get_xr_visualization_by_id(xr_id, fields=None):
+    try:
+        xr = cached_row(XRVisualization, xr_id, fields)
+    except ValueError as e:
+        return {"error": str(e)}, 400
     if not xr:
         return {"error": "XR Visualization not found"}, 404
-    return xr.serialize(), 200
+    return xr, 200
 
 def create_xr_visualization(data):
     required_fields = ['user_id', 'visualization_type']
@@ -24,7 +43,7 @@ def create_xr_visualization(data):
     )
     db.session.add(new_xr)
     db.session.commit()
-    return new_xr.serialize(), 201
+    return serialize(new_xr), 201
 
 def update_xr_visualization(xr_id, data):
     xr = XRVisualization.query.get(xr_id)
@@ -33,7 +52,8 @@ def update_xr_visualization(xr_id, data):
     for key, value in data.items():
         setattr(xr, key, value)
     db.session.commit()
-    return xr.serialize(), 200
+    entity_cache.invalidate(XRVisualization, xr_id)
+    return serialize(xr), 200
 
 def delete_xr_visualization(xr_id):
     xr = XRVisualization.query.get(xr_id)
@@ -41,4 +61,5 @@ def delete_xr_visualization(xr_id):
         return {"error": "XR Visualization not found"}, 404
     db.session.delete(xr)
     db.session.commit()
+    entity_cache.invalidate(XRVisualization, xr_id)
     return {"message": "XR Visualization deleted successfully"}, 200
@@ -29,7 +29,7 @@ class User(db.Model, SerializerMixin):
     serialize_rules = ('-password_hash',)
 
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(50), nullable=False)
+    username = db.Column(db.String(50), nullable=False, index=True)
     email = db.Column(db.String(120), nullable=False, unique=True)
     password_hash = db.Column(db.String(256), nullable=False)
     full_name = db.Column(db.String(255))
@@ -68,7 +68,8 @@ class User(db.Model, SerializerMixin):
     - name: Display name of the wallet.
     - description: Detailed description of the wallet's purpose.
     - currency: Currency used for the wallet (default: 'KES').
-    - balance: Current balance of the wallet.
+    - balance: Current balance of the wallet, kept up to date by transaction writes.
+    - opening_balance: Balance before any recorded transaction; balance = opening_balance + transactions.
     - type: Indicates if the wallet is personal or shared.
     - owner_id: Reference to the user who owns the wallet.
     - created_at: Timestamp of wallet creation.
@@ -82,8 +83,9 @@ class Wallet(db.Model, SerializerMixin):
     description = db.Column(db.Text)
     currency = db.Column(db.String(10), default='KES')
     balance = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    opening_balance = db.Column(db.Numeric(10, 2), nullable=False, default=0, server_default='0')
     type = db.Column(db.String(50))  # 'personal' or 'shared'
-    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, onupdate=func.now())
     
@@ -112,12 +114,29 @@ class Wallet(db.Model, SerializerMixin):
     - date: When the transaction occurred.
     - is_recurring: Indicates if the transaction is recurring.
     - recurring_interval: Frequency of recurrence (daily, weekly, monthly, yearly).
+    - recurring_template_id: Reference to the recurring transaction this occurrence was generated from.
+    - recurring_generated_until: For recurring templates, date of the last generated occurrence.
     - created_by: Reference to the user who recorded the transaction.
     - created_at: Timestamp when the transaction was recorded.
     - updated_at: Timestamp of the last update.
 """
 class Transaction(db.Model, SerializerMixin):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_date_id', 'date', 'id'),
+        db.Index('ix_transactions_wallet_id_date', 'wallet_id', 'date'),
+        db.Index('ix_transactions_category_id_date', 'category_id', 'date'),
+        db.Index('ix_transactions_wallet_id_category_id_date', 'wallet_id', 'category_id', 'date'),
+        # Occurrences generated from a recurring template; one per template and date
+        db.Index('ix_transactions_recurring_template_id_date', 'recurring_template_id', 'date', unique=True),
+        # Keyset scan over recurring templates only
+        db.Index(
+            'ix_transactions_recurring_templates', 'id',
+            postgresql_where=db.text('is_recurring'),
+            sqlite_where=db.text('is_recurring = 1')
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
@@ -127,10 +146,44 @@ class Transaction(db.Model, SerializerMixin):
     date = db.Column(db.DateTime, nullable=False)
     is_recurring = db.Column(db.Boolean, default=False)
     recurring_interval = db.Column(db.String(50))
-    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    recurring_template_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='SET NULL'))
+    recurring_generated_until = db.Column(db.DateTime)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, onupdate=func.now())
 
+# ====================================
+# Wallet Monthly Rollup Model
+# ====================================
+"""
+    Wallet Monthly Rollup Model: Pre-aggregated transaction totals for analytics.
+
+    One row per wallet, category, transaction type and month, kept up to date by the
+    transaction write paths.
+
+    Attributes:
+    - wallet_id: Reference to the wallet.
+    - category_id: Reference to the transaction category.
+    - type: Transaction type, e.g. 'expense' or 'income'.
+    - month: First day of the month the transactions fall in.
+    - total: Sum of the transaction amounts.
+    - count: Number of transactions.
+    - min_amount: Smallest transaction amount.
+    - max_amount: Largest transaction amount.
+    - updated_at: Timestamp of the last update.
+"""
+class WalletMonthlyRollup(db.Model, SerializerMixin):
+    __tablename__ = 'wallet_monthly_rollups'
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), primary_key=True)
+    type = db.Column(db.String(20), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Numeric, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    min_amount = db.Column(db.Numeric)
+    max_amount = db.Column(db.Numeric)
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
 # ====================================
 # Category Model
 # ====================================
@@ -156,7 +209,7 @@ class Category(db.Model, SerializerMixin):
     icon = db.Column(db.String(100))
     color = db.Column(db.String(20))
     is_default = db.Column(db.Boolean, default=False)
-    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, onupdate=func.now())
 
@@ -177,8 +230,8 @@ class Category(db.Model, SerializerMixin):
 class WalletCollaborator(db.Model, SerializerMixin):
     __tablename__ = 'wallet_collaborators'
     id = db.Column(db.Integer, primary_key=True)
-    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     permission_level = db.Column(db.String(20))  # owner, editor, viewer
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, onupdate=func.now())
@@ -204,9 +257,9 @@ class WalletCollaborator(db.Model, SerializerMixin):
 class Budget(db.Model, SerializerMixin):
     __tablename__ = 'budgets'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
-    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False, index=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False, index=True)
     amount = db.Column(db.Numeric, nullable=False)
     period = db.Column(db.String(50))  # monthly, quarterly, yearly
     start_date = db.Column(db.DateTime, nullable=False)
@@ -215,6 +268,35 @@ class Budget(db.Model, SerializerMixin):
     updated_at = db.Column(db.DateTime, onupdate=func.now())
 
 
+# ====================================
+# Budget Alert Model
+# ====================================
+"""
+    Budget Alert Model: Records which spending thresholds a budget has crossed.
+
+    One row per budget, budget period and threshold, so each alert is sent once.
+
+    Attributes:
+    - id: Unique identifier for the alert.
+    - budget_id: Reference to the budget.
+    - period_start: Start of the budget period the alert belongs to.
+    - threshold: Percentage of the budget that was crossed (e.g. 80, 100).
+    - percent_used: Percentage of the budget used when the alert fired.
+    - created_at: Timestamp when the alert fired.
+"""
+class BudgetAlert(db.Model, SerializerMixin):
+    __tablename__ = 'budget_alerts'
+    __table_args__ = (
+        db.UniqueConstraint('budget_id', 'period_start', 'threshold', name='uq_budget_alerts_budget_period_threshold'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    budget_id = db.Column(db.Integer, db.ForeignKey('budgets.id', ondelete='CASCADE'), nullable=False)
+    period_start = db.Column(db.DateTime, nullable=False)
+    threshold = db.Column(db.Integer, nullable=False)
+    percent_used = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, server_default=func.now())
+
+
 # ------------------------------
 # AI Advisor Profile Model
 # ------------------------------
@@ -234,7 +316,7 @@ class Budget(db.Model, SerializerMixin):
 class AIAdvisorProfile(db.Model, SerializerMixin):
     __tablename__ = 'ai_advisor_profiles'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     risk_tolerance = db.Column(db.Float, nullable=False)
     financial_goals = db.Column(db.JSON)
     investment_preferences = db.Column(db.JSON)
@@ -260,11 +342,12 @@ class AIAdvisorProfile(db.Model, SerializerMixin):
     - status: Status of processing (processing, completed, failed).
     - created_at: Timestamp when the voice transaction was created.
     - processed_at: Timestamp when the voice transaction was processed.
+    - updated_at: Timestamp of the last update.
 """
 class VoiceTransaction(db.Model, SerializerMixin):
     __tablename__ = 'voice_transactions'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     audio_url = db.Column(db.String(255))
     transcription = db.Column(db.Text)
     intent_analysis = db.Column(db.JSON)
@@ -273,6 +356,7 @@ class VoiceTransaction(db.Model, SerializerMixin):
     status = db.Column(db.String(50))  # processing, completed, failed
     created_at = db.Column(db.DateTime, server_default=func.now())
     processed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, onupdate=func.now())
 
 
 # ------------------------------
@@ -285,6 +369,8 @@ class VoiceTransaction(db.Model, SerializerMixin):
     - id: Unique identifier for the spending pattern.
     - user_id: Reference to the associated user.
     - pattern_type: Type of pattern (habit, anomaly, opportunity).
+    - pattern_key: What a detected pattern is about (e.g. 'category:12'), so a rerun
+      updates the pattern instead of adding a copy. Unique per user and pattern_type.
     - pattern_data: JSON data with details of the detected pattern.
     - significance_score: A score indicating the importance of the pattern.
     - recognition_params: JSON parameters used for pattern recognition.
@@ -294,9 +380,13 @@ class VoiceTransaction(db.Model, SerializerMixin):
 """
 class SpendingPattern(db.Model, SerializerMixin):
     __tablename__ = 'spending_patterns'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'pattern_type', 'pattern_key', name='uq_spending_patterns_user_type_key'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     pattern_type = db.Column(db.String(50))
+    pattern_key = db.Column(db.String(100))
     pattern_data = db.Column(db.JSON)
     significance_score = db.Column(db.Float)
     recognition_params = db.Column(db.JSON)
@@ -305,6 +395,85 @@ class SpendingPattern(db.Model, SerializerMixin):
     updated_at = db.Column(db.DateTime, onupdate=func.now())
 
 
+# ------------------------------
+# Benchmark Sketch Model
+# ------------------------------
+"""
+    Benchmark Sketch Model: Distribution of monthly spending within a peer group.
+
+    One row per distinct peer_group_params of the financial benchmarks, holding a
+    t-digest of its members' monthly spending totals, so percentiles are answered
+    without sorting every user's numbers.
+
+    Attributes:
+    - peer_group_key: Hash of the canonical JSON of peer_group_params.
+    - peer_group_params: The peer group definition shared by the member benchmarks.
+    - sketch: Serialized t-digest (compression, centroids, min, max).
+    - value_count: Number of monthly totals folded into the sketch.
+    - member_count: Number of users in the group at the last update.
+    - months_through: Last month whose totals have been folded in.
+    - updated_at: Timestamp of the last update.
+"""
+class BenchmarkSketch(db.Model, SerializerMixin):
+    __tablename__ = 'benchmark_sketches'
+    peer_group_key = db.Column(db.String(64), primary_key=True)
+    peer_group_params = db.Column(db.JSON)
+    sketch = db.Column(db.JSON, nullable=False)
+    value_count = db.Column(db.Integer, nullable=False, default=0)
+    member_count = db.Column(db.Integer, nullable=False, default=0)
+    months_through = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
+# ------------------------------
+# Spending Statistic Model
+# ------------------------------
+"""
+    Spending Statistic Model: Running statistics of a user's spending in a category.
+
+    One row per user and category, updated by the anomaly detector as it reads new
+    transactions, so a transaction is scored without rereading the history. Mean and
+    variance are exponentially weighted and kept on log(1 + amount).
+
+    Attributes:
+    - user_id: Reference to the user who made the transactions.
+    - category_id: Reference to the transaction category.
+    - count: Number of transactions observed.
+    - mean: Exponentially weighted mean of log(1 + amount).
+    - variance: Exponentially weighted variance of log(1 + amount).
+    - last_transaction_id: Last transaction folded into the statistics.
+    - updated_at: Timestamp of the last update.
+"""
+class SpendingStatistic(db.Model, SerializerMixin):
+    __tablename__ = 'spending_statistics'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0)
+    variance = db.Column(db.Float, nullable=False, default=0)
+    last_transaction_id = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
+
+# ------------------------------
+# Detector Checkpoint Model
+# ------------------------------
+"""
+    Detector Checkpoint Model: How far a background detector has read the transactions.
+
+    Attributes:
+    - name: Detector name, e.g. 'anomalies'.
+    - last_transaction_id: Highest transaction id the detector has processed.
+    - pending_gaps: [transaction_id, deadline] pairs for skipped ids below the
+      checkpoint that a slow transaction may still commit.
+    - updated_at: Timestamp of the last run that moved the checkpoint.
+"""
+class DetectorCheckpoint(db.Model, SerializerMixin):
+    __tablename__ = 'detector_checkpoints'
+    name = db.Column(db.String(50), primary_key=True)
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    pending_gaps = db.Column(db.JSON)
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
 # ------------------------------
 # Financial Benchmark Model
 # ------------------------------
@@ -324,7 +493,7 @@ class SpendingPattern(db.Model, SerializerMixin):
 class FinancialBenchmark(db.Model, SerializerMixin):
     __tablename__ = 'financial_benchmarks'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     peer_group_params = db.Column(db.JSON)
     comparison_metrics = db.Column(db.JSON)
     insights_generated = db.Column(db.JSON)
@@ -352,7 +521,7 @@ class FinancialBenchmark(db.Model, SerializerMixin):
 class XRVisualization(db.Model, SerializerMixin):
     __tablename__ = 'xr_visualizations'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     visualization_type = db.Column(db.String(50))
     scene_data = db.Column(db.JSON)
     interaction_metrics = db.Column(db.JSON)
@@ -381,7 +550,7 @@ class XRVisualization(db.Model, SerializerMixin):
 class CryptoWallet(db.Model, SerializerMixin):
     __tablename__ = 'crypto_wallets'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     wallet_address = db.Column(db.String(255))
     blockchain_type = db.Column(db.String(50))
     balance_snapshot = db.Column(db.JSON)
@@ -408,13 +577,15 @@ class CryptoWallet(db.Model, SerializerMixin):
     - model_version: Version of the ML model used.
     - accuracy_metrics: JSON data with model performance metrics.
     - created_at: Timestamp when the forecast was created.
-    - valid_until: Timestamp indicating forecast validity.
+    - valid_until: Timestamp after which the forecast is stale and recomputed on read;
+      transaction writes move it to the time of the write.
+    - updated_at: Timestamp of the last update.
 """
 class FinancialForecast(db.Model, SerializerMixin):
     __tablename__ = 'financial_forecasts'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False, index=True)
     forecast_type = db.Column(db.String(50))
     time_range = db.Column(db.String(50))
     prediction_data = db.Column(db.JSON)
@@ -422,7 +593,8 @@ class FinancialForecast(db.Model, SerializerMixin):
     model_version = db.Column(db.String(50))
     accuracy_metrics = db.Column(db.JSON)
     created_at = db.Column(db.DateTime, server_default=func.now())
-    valid_until = db.Column(db.DateTime)
+    valid_until = db.Column(db.DateTime, index=True)
+    updated_at = db.Column(db.DateTime, onupdate=func.now())
 
 
 # ------------------------------
@@ -445,7 +617,7 @@ class SmartCategory(db.Model, SerializerMixin):
     __tablename__ = 'smart_categories'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    parent_category_id = db.Column(db.Integer, db.ForeignKey('categories.id'))
+    parent_category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), index=True)
     rules_set = db.Column(db.JSON)
     learning_threshold = db.Column(db.Float)
     confidence_minimum = db.Column(db.Float)
@@ -465,20 +637,27 @@ class SmartCategory(db.Model, SerializerMixin):
     - invited_by: Reference to the user sending the invitation.
     - invited_email: Email address of the invitee.
     - permission_level: Proposed access level for the invitee.
-    - status: Current invitation status (pending, accepted, rejected).
+    - status: Current invitation status (pending, accepted, rejected, expired). Pending
+      invitations past expires_at are set to expired by the sweeper, which finds them
+      through the (status, expires_at) index.
     - created_at: Timestamp when the invitation was sent.
     - expires_at: Timestamp when the invitation expires.
+    - updated_at: Timestamp of the last update.
 """
 class WalletInvitation(db.Model, SerializerMixin):
     __tablename__ = 'wallet_invitations'
+    __table_args__ = (
+        db.Index('ix_wallet_invitations_status_expires_at', 'status', 'expires_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
-    invited_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    invited_email = db.Column(db.String(120), nullable=False)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False, index=True)
+    invited_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    invited_email = db.Column(db.String(120), nullable=False, index=True)
     permission_level = db.Column(db.String(50), nullable=False)
-    status = db.Column(db.String(50))  # pending, accepted, rejected
+    status = db.Column(db.String(50))  # pending, accepted, rejected, expired
     created_at = db.Column(db.DateTime, server_default=func.now())
     expires_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, onupdate=func.now())
 
 
 # ------------------------------
@@ -501,7 +680,7 @@ class WalletInvitation(db.Model, SerializerMixin):
 class SmartBudget(db.Model, SerializerMixin):
     __tablename__ = 'smart_budgets'
     id = db.Column(db.Integer, primary_key=True)
-    budget_id = db.Column(db.Integer, db.ForeignKey('budgets.id'), nullable=False)
+    budget_id = db.Column(db.Integer, db.ForeignKey('budgets.id'), nullable=False, index=True)
     ai_parameters = db.Column(db.JSON)
     market_conditions = db.Column(db.JSON)
     adjustment_history = db.Column(db.JSON)
@@ -523,18 +702,62 @@ class SmartBudget(db.Model, SerializerMixin):
     - type: Type of notification (budget_alert, shared_wallet_invite, security_alert).
     - title: Short title of the notification.
     - message: Detailed content of the notification.
-    - is_read: Boolean flag indicating if the notification has been read.
+    - is_read: Boolean flag indicating if the notification has been read. Unread rows
+      are covered by a partial index on user_id, so unread counts read only those.
     - created_at: Timestamp when the notification was generated.
+    - updated_at: Timestamp of the last update.
 """
 class Notification(db.Model, SerializerMixin):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Badge counts and mark-all-read only touch a user's unread rows
+        db.Index(
+            'ix_notifications_user_id_unread', 'user_id',
+            postgresql_where=db.text('NOT is_read'),
+            sqlite_where=db.text('is_read = 0')
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     type = db.Column(db.String(50))
     title = db.Column(db.String(255), nullable=False)
     message = db.Column(db.Text, nullable=False)
-    is_read = db.Column(db.Boolean, default=False)
+    is_read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, server_default=func.now())
+    updated_at = db.Column(db.DateTime, onupdate=func.now())
+
+# ------------------------------
+# Activity Event Model
+# ------------------------------
+"""
+    Activity Event Model: Append-only log of changes pushed to clients over server-sent events.
+
+    Every write that clients watch for (new notifications, transaction changes in a
+    wallet, wallets shared or unshared) appends a row in the same database transaction,
+    so the increasing id is a cursor a client can resume from after a reconnect. The
+    log has no foreign keys, so it outlives deleted users and wallets until it is pruned.
+
+    Attributes:
+    - id: Increasing event id, sent to clients as the SSE event id.
+    - user_id: User the event is addressed to, if any.
+    - wallet_id: Wallet the event is about, if any; sent to its owner and collaborators.
+    - event_type: notification, notifications_read, transactions or wallet_access.
+    - payload: JSON body of the event.
+    - created_at: Timestamp when the event was recorded.
+"""
+class ActivityEvent(db.Model, SerializerMixin):
+    __tablename__ = 'activity_events'
+    __table_args__ = (
+        # Replaying a reconnecting client's missed events reads these in id order
+        db.Index('ix_activity_events_user_id_id', 'user_id', 'id'),
+        db.Index('ix_activity_events_wallet_id_id', 'wallet_id', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer)
+    wallet_id = db.Column(db.Integer)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, server_default=func.now(), index=True)
 
 # ====================================
 # Receipt Scan Model
@@ -555,11 +778,12 @@ class Notification(db.Model, SerializerMixin):
     - status: Status of processing (processing, completed, failed).
     - created_at: When the receipt was submitted.
     - processed_at: When the receipt was processed.
+    - updated_at: Timestamp of the last update.
 """
 class ReceiptScan(db.Model, SerializerMixin):
     __tablename__ = 'receipt_scans'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     image_url = db.Column(db.String(255))
     ocr_text = db.Column(db.Text)
     confidence_score = db.Column(db.Float)
@@ -570,3 +794,45 @@ class ReceiptScan(db.Model, SerializerMixin):
     status = db.Column(db.String(50))  # processing, completed, failed
     created_at = db.Column(db.DateTime, server_default=func.now())
     processed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, onupdate=func.now())
+
+# ====================================
+# Transaction Import Model
+# ====================================
+"""
+    Transaction Import Model: Tracks a CSV/OFX statement import while it runs.
+
+    Attributes:
+    - id: Unique identifier for the import.
+    - wallet_id: Reference to the wallet the transactions are imported into.
+    - created_by: Reference to the user who uploaded the statement.
+    - format: Statement format (csv, ofx).
+    - filename: Original name of the uploaded file.
+    - status: Status of the import (pending, running, completed, failed).
+    - bytes_total: Size of the uploaded file.
+    - bytes_processed: Bytes of the file parsed so far.
+    - rows_processed: Statement rows read so far.
+    - rows_imported: Rows inserted as transactions.
+    - rows_skipped: Rows that could not be imported.
+    - errors: JSON list with the first row errors encountered.
+    - created_at: Timestamp when the import was started.
+    - completed_at: Timestamp when the import finished or failed.
+    - updated_at: Timestamp of the last progress update.
+"""
+class TransactionImport(db.Model, SerializerMixin):
+    __tablename__ = 'transaction_imports'
+    id = db.Column(db.Integer, primary_key=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False, index=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    format = db.Column(db.String(10), nullable=False)  # csv, ofx
+    filename = db.Column(db.String(255))
+    status = db.Column(db.String(20), default='pending')  # pending, running, completed, failed
+    bytes_total = db.Column(db.BigInteger, default=0)
+    bytes_processed = db.Column(db.BigInteger, default=0)
+    rows_processed = db.Column(db.Integer, default=0)
+    rows_imported = db.Column(db.Integer, default=0)
+    rows_skipped = db.Column(db.Integer, default=0)
+    errors = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, server_default=func.now())
+    completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, onupdate=func.now())
@@ -1,20 +1,33 @@
 from server.routes.user_routes import UserResource, UserByIdResource
-from server.routes.transaction_routes import TransactionsResource, TransactionByIdResource
-from server.routes.wallet__routes import WalletsResource, WalletByIdResource
+from server.routes.transaction_routes import (
+    TransactionsResource,
+    TransactionBatchResource,
+    TransactionImportsResource,
+    TransactionImportByIdResource,
+    TransactionByIdResource
+)
+from server.routes.wallet__routes import WalletsResource, WalletByIdResource, WalletSummaryResource
 from server.routes.categories_routes import CategoriesResource, CategoryByIdResource
 from server.routes.wallet_collaborators_routes import WalletCollaboratorsResource, WalletCollaboratorByIdResource
-from server.routes.budgets_routes import BudgetsResource, BudgetByIdResource
+from server.routes.budgets_routes import BudgetsResource, BudgetStatusResource, BudgetByIdResource
 from server.routes.ai_advisor_routes import AIAdvisorProfilesResource, AIAdvisorProfileByIdResource
 from server.routes.voice_transactions_routes import VoiceTransactionsResource, VoiceTransactionByIdResource
 from server.routes.spending_patterns_routes import SpendingPatternsResource, SpendingPatternByIdResource
-from server.routes.financial_benchmarks_routes import FinancialBenchmarksResource, FinancialBenchmarkByIdResource
+from server.routes.financial_benchmarks_routes import FinancialBenchmarksResource, FinancialBenchmarkByIdResource, FinancialBenchmarkComparisonResource
 from server.routes.xr_visualizations_routes import XRVisualizationsResource, XRVisualizationByIdResource
 from server.routes.crypto_wallets_routes import CryptoWalletsResource, CryptoWalletByIdResource
-from server.routes.financial_forecasts_routes import FinancialForecastsResource, FinancialForecastByIdResource
-from server.routes.smart_categories_routes import SmartCategoriesResource, SmartCategoryByIdResource
+from server.routes.financial_forecasts_routes import FinancialForecastsResource, FinancialForecastByIdResource, FinancialForecastGenerateResource
+from server.routes.smart_categories_routes import SmartCategoriesResource, SmartCategoryByIdResource, SmartCategoryClassifyResource
 from server.routes.wallet_invitations_routes import WalletInvitationsResource, WalletInvitationByIdResource
 from server.routes.smart_budgets_routes import SmartBudgetsResource, SmartBudgetByIdResource
-from server.routes.notifications_routes import NotificationsResource, NotificationByIdResource
+from server.routes.notifications_routes import (
+    NotificationsResource,
+    NotificationByIdResource,
+    UnreadNotificationCountResource,
+    MarkAllNotificationsReadResource,
+    MarkNotificationsReadResource
+)
+from server.routes.events_routes import UserEventsResource
 from server.routes.receipt_scans_routes import ReceiptScansResource, ReceiptScanByIdResource
 
 def register_routes(api):
@@ -24,11 +37,15 @@ def register_routes(api):
 
     # Transaction Routes
     api.add_resource(TransactionsResource, '/api/transactions')
+    api.add_resource(TransactionBatchResource, '/api/transactions/batch')
+    api.add_resource(TransactionImportsResource, '/api/transactions/imports')
+    api.add_resource(TransactionImportByIdResource, '/api/transactions/imports/<int:import_id>')
     api.add_resource(TransactionByIdResource, '/api/transactions/<int:transaction_id>')
 
     # Wallet Routes
     api.add_resource(WalletsResource, '/api/wallets')
     api.add_resource(WalletByIdResource, '/api/wallets/<int:wallet_id>')
+    api.add_resource(WalletSummaryResource, '/api/wallets/<int:wallet_id>/summary')
 
     # Category Routes
     api.add_resource(CategoriesResource, '/api/categories')
@@ -40,6 +57,7 @@ def register_routes(api):
 
     # Budget Routes
     api.add_resource(BudgetsResource, '/api/budgets')
+    api.add_resource(BudgetStatusResource, '/api/budgets/status')
     api.add_resource(BudgetByIdResource, '/api/budgets/<int:budget_id>')
 
     # AI Advisor Profiles Routes
@@ -57,6 +75,7 @@ def register_routes(api):
     # Financial Benchmarks Routes
     api.add_resource(FinancialBenchmarksResource, '/api/financial-benchmarks')
     api.add_resource(FinancialBenchmarkByIdResource, '/api/financial-benchmarks/<int:benchmark_id>')
+    api.add_resource(FinancialBenchmarkComparisonResource, '/api/financial-benchmarks/<int:benchmark_id>/comparison')
 
     # XR Visualizations Routes
     api.add_resource(XRVisualizationsResource, '/api/xr-visualizations')
@@ -69,10 +88,12 @@ def register_routes(api):
     # Financial Forecasts Routes
     api.add_resource(FinancialForecastsResource, '/api/financial-forecasts')
     api.add_resource(FinancialForecastByIdResource, '/api/financial-forecasts/<int:forecast_id>')
+    api.add_resource(FinancialForecastGenerateResource, '/api/financial-forecasts/generate')
 
     # Smart Categories Routes
     api.add_resource(SmartCategoriesResource, '/api/smart-categories')
     api.add_resource(SmartCategoryByIdResource, '/api/smart-categories/<int:sc_id>')
+    api.add_resource(SmartCategoryClassifyResource, '/api/smart-categories/classify')
 
     # Wallet Invitations Routes
     api.add_resource(WalletInvitationsResource, '/api/wallet-invitations')
@@ -85,6 +106,12 @@ def register_routes(api):
     # Notifications Routes
     api.add_resource(NotificationsResource, '/api/notifications')
     api.add_resource(NotificationByIdResource, '/api/notifications/<int:notification_id>')
+    api.add_resource(UnreadNotificationCountResource, '/api/users/<int:user_id>/notifications/unread-count')
+    api.add_resource(MarkAllNotificationsReadResource, '/api/users/<int:user_id>/notifications/mark-all-read')
+    api.add_resource(MarkNotificationsReadResource, '/api/users/<int:user_id>/notifications/mark-read')
+
+    # Server-Sent Events Routes
+    api.add_resource(UserEventsResource, '/api/users/<int:user_id>/events')
 
     # Receipt Scans Routes
     api.add_resource(ReceiptScansResource, '/api/receipt-scans')
@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import AIAdvisorProfile
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.ai_advisor_controller import (
     get_all_ai_advisors,
+    stream_all_ai_advisors,
     get_ai_advisor_by_id,
     create_ai_advisor,
     update_ai_advisor,
@@ -9,8 +13,11 @@ from server.controllers.ai_advisor_controller import (
 )
 
 class AIAdvisorProfilesResource(Resource):
+    @conditional_get(AIAdvisorProfile)
     def get(self):
-        profiles, status_code = get_all_ai_advisors()
+        if wants_stream():
+            return stream_all_ai_advisors(fields=request.args.get('fields'))
+        profiles, status_code = get_all_ai_advisors(fields=request.args.get('fields'))
         return profiles, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class AIAdvisorProfilesResource(Resource):
         return profile, status_code
 
 class AIAdvisorProfileByIdResource(Resource):
+    @conditional_get(AIAdvisorProfile, id_arg='profile_id')
     def get(self, profile_id):
-        profile, status_code = get_ai_advisor_by_id(profile_id)
+        profile, status_code = get_ai_advisor_by_id(profile_id, fields=request.args.get('fields'))
         return profile, status_code
 
     def patch(self, profile_id):
@@ -1,16 +1,31 @@
 from flask import request
 from flask_restful import Resource
+from server.models import Budget
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.budget_controller import (
     get_all_budgets,
+    stream_all_budgets,
     get_budget_by_id,
     create_budget,
     update_budget,
-    delete_budget
+    delete_budget,
+    get_budget_statuses
 )
 
+def _include_status():
+    return 'status' in request.args.get('include', '').split(',')
+
 class BudgetsResource(Resource):
+    # Embedded statuses change with every transaction write, not just budget edits
+    @conditional_get(Budget, unless=_include_status)
     def get(self):
-        budgets, status_code = get_all_budgets()
+        if wants_stream():
+            return stream_all_budgets(fields=request.args.get('fields'))
+        budgets, status_code = get_all_budgets(
+            fields=request.args.get('fields'),
+            include_status=_include_status()
+        )
         return budgets, status_code
 
     def post(self):
@@ -18,9 +33,15 @@ class BudgetsResource(Resource):
         budget, status_code = create_budget(data)
         return budget, status_code
 
+class BudgetStatusResource(Resource):
+    def get(self):
+        statuses, status_code = get_budget_statuses(filters=request.args)
+        return statuses, status_code
+
 class BudgetByIdResource(Resource):
+    @conditional_get(Budget, id_arg='budget_id')
     def get(self, budget_id):
-        budget, status_code = get_budget_by_id(budget_id)
+        budget, status_code = get_budget_by_id(budget_id, fields=request.args.get('fields'))
         return budget, status_code
 
     def patch(self, budget_id):
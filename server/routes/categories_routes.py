@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import Category
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.category_controller import (
     get_all_categories,
+    stream_all_categories,
     get_category_by_id,
     create_category,
     update_category,
@@ -9,8 +13,11 @@ from server.controllers.category_controller import (
 )
 
 class CategoriesResource(Resource):
+    @conditional_get(Category)
     def get(self):
-        categories, status_code = get_all_categories()
+        if wants_stream():
+            return stream_all_categories(fields=request.args.get('fields'))
+        categories, status_code = get_all_categories(fields=request.args.get('fields'))
         return categories, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class CategoriesResource(Resource):
         return category, status_code
 
 class CategoryByIdResource(Resource):
+    @conditional_get(Category, id_arg='category_id')
     def get(self, category_id):
-        category, status_code = get_category_by_id(category_id)
+        category, status_code = get_category_by_id(category_id, fields=request.args.get('fields'))
         return category, status_code
 
     def patch(self, category_id):
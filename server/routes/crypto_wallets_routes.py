@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import CryptoWallet
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.crypto_wallet_controller import (
     get_all_crypto_wallets,
+    stream_all_crypto_wallets,
     get_crypto_wallet_by_id,
     create_crypto_wallet,
     update_crypto_wallet,
@@ -9,8 +13,11 @@ from server.controllers.crypto_wallet_controller import (
 )
 
 class CryptoWalletsResource(Resource):
+    @conditional_get(CryptoWallet)
     def get(self):
-        wallets, status_code = get_all_crypto_wallets()
+        if wants_stream():
+            return stream_all_crypto_wallets(fields=request.args.get('fields'))
+        wallets, status_code = get_all_crypto_wallets(fields=request.args.get('fields'))
         return wallets, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class CryptoWalletsResource(Resource):
         return cw, status_code
 
 class CryptoWalletByIdResource(Resource):
+    @conditional_get(CryptoWallet, id_arg='wallet_id')
     def get(self, wallet_id):
-        cw, status_code = get_crypto_wallet_by_id(wallet_id)
+        cw, status_code = get_crypto_wallet_by_id(wallet_id, fields=request.args.get('fields'))
         return cw, status_code
 
     def patch(self, wallet_id):
@@ -0,0 +1,9 @@
+from flask import request
+from flask_restful import Resource
+from server.controllers.event_controller import stream_user_events
+
+class UserEventsResource(Resource):
+    def get(self, user_id):
+        # EventSource sends Last-Event-ID on reconnect; the query parameter is for the first connect
+        cursor = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+        return stream_user_events(user_id, cursor=cursor)
@@ -1,16 +1,24 @@
 from flask import request
 from flask_restful import Resource
+from server.models import FinancialBenchmark
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.financial_benchmark_controller import (
     get_all_financial_benchmarks,
+    stream_all_financial_benchmarks,
     get_financial_benchmark_by_id,
     create_financial_benchmark,
     update_financial_benchmark,
-    delete_financial_benchmark
+    delete_financial_benchmark,
+    get_financial_benchmark_comparison
 )
 
 class FinancialBenchmarksResource(Resource):
+    @conditional_get(FinancialBenchmark)
     def get(self):
-        benchmarks, status_code = get_all_financial_benchmarks()
+        if wants_stream():
+            return stream_all_financial_benchmarks(fields=request.args.get('fields'))
+        benchmarks, status_code = get_all_financial_benchmarks(fields=request.args.get('fields'))
         return benchmarks, status_code
 
     def post(self):
@@ -19,8 +27,9 @@ class FinancialBenchmarksResource(Resource):
         return fb, status_code
 
 class FinancialBenchmarkByIdResource(Resource):
+    @conditional_get(FinancialBenchmark, id_arg='benchmark_id')
     def get(self, benchmark_id):
-        fb, status_code = get_financial_benchmark_by_id(benchmark_id)
+        fb, status_code = get_financial_benchmark_by_id(benchmark_id, fields=request.args.get('fields'))
         return fb, status_code
 
     def patch(self, benchmark_id):
@@ -31,3 +40,11 @@ class FinancialBenchmarkByIdResource(Resource):
     def delete(self, benchmark_id):
         response, status_code = delete_financial_benchmark(benchmark_id)
         return response, status_code
+
+class FinancialBenchmarkComparisonResource(Resource):
+    def get(self, benchmark_id):
+        comparison, status_code = get_financial_benchmark_comparison(
+            benchmark_id,
+            month=request.args.get('month')
+        )
+        return comparison, status_code
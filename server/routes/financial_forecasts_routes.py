@@ -1,16 +1,33 @@
 from flask import request
 from flask_restful import Resource
+from server.models import FinancialForecast
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.financial_forecast_controller import (
     get_all_financial_forecasts,
+    stream_all_financial_forecasts,
     get_financial_forecast_by_id,
     create_financial_forecast,
     update_financial_forecast,
-    delete_financial_forecast
+    delete_financial_forecast,
+    generate_financial_forecasts,
+    refresh_expired_financial_forecasts
 )
 
+def _refresh_expired(forecast_id=None):
+    # Runs ahead of the validators so a 304 never covers an expired forecast; the
+    # controller limits it to wallets the caller can read
+    refresh_expired_financial_forecasts(filters=request.args, forecast_id=forecast_id)
+
 class FinancialForecastsResource(Resource):
+    @conditional_get(FinancialForecast, before=_refresh_expired)
     def get(self):
-        forecasts, status_code = get_all_financial_forecasts()
+        if wants_stream():
+            return stream_all_financial_forecasts(fields=request.args.get('fields'), filters=request.args)
+        forecasts, status_code = get_all_financial_forecasts(
+            fields=request.args.get('fields'),
+            filters=request.args
+        )
         return forecasts, status_code
 
     def post(self):
@@ -19,8 +36,9 @@ class FinancialForecastsResource(Resource):
         return ff, status_code
 
 class FinancialForecastByIdResource(Resource):
+    @conditional_get(FinancialForecast, id_arg='forecast_id', before=_refresh_expired)
     def get(self, forecast_id):
-        ff, status_code = get_financial_forecast_by_id(forecast_id)
+        ff, status_code = get_financial_forecast_by_id(forecast_id, fields=request.args.get('fields'))
         return ff, status_code
 
     def patch(self, forecast_id):
@@ -31,3 +49,9 @@ class FinancialForecastByIdResource(Resource):
     def delete(self, forecast_id):
         response, status_code = delete_financial_forecast(forecast_id)
         return response, status_code
+
+class FinancialForecastGenerateResource(Resource):
+    def post(self):
+        data = request.get_json()
+        forecasts, status_code = generate_financial_forecasts(data)
+        return forecasts, status_code
@@ -1,16 +1,29 @@
 from flask import request
 from flask_restful import Resource
+from server.models import Notification
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.notification_controller import (
     get_all_notifications,
+    stream_all_notifications,
     get_notification_by_id,
     create_notification,
     update_notification,
-    delete_notification
+    delete_notification,
+    get_unread_notification_count,
+    mark_all_notifications_read,
+    mark_notifications_read
 )
 
 class NotificationsResource(Resource):
+    @conditional_get(Notification)
     def get(self):
-        notifications, status_code = get_all_notifications()
+        if wants_stream():
+            return stream_all_notifications(fields=request.args.get('fields'), filters=request.args)
+        notifications, status_code = get_all_notifications(
+            fields=request.args.get('fields'),
+            filters=request.args
+        )
         return notifications, status_code
 
     def post(self):
@@ -19,8 +32,9 @@ class NotificationsResource(Resource):
         return n, status_code
 
 class NotificationByIdResource(Resource):
+    @conditional_get(Notification, id_arg='notification_id')
     def get(self, notification_id):
-        n, status_code = get_notification_by_id(notification_id)
+        n, status_code = get_notification_by_id(notification_id, fields=request.args.get('fields'))
         return n, status_code
 
     def patch(self, notification_id):
@@ -31,3 +45,19 @@ class NotificationByIdResource(Resource):
     def delete(self, notification_id):
         response, status_code = delete_notification(notification_id)
         return response, status_code
+
+class UnreadNotificationCountResource(Resource):
+    def get(self, user_id):
+        count, status_code = get_unread_notification_count(user_id)
+        return count, status_code
+
+class MarkAllNotificationsReadResource(Resource):
+    def post(self, user_id):
+        result, status_code = mark_all_notifications_read(user_id)
+        return result, status_code
+
+class MarkNotificationsReadResource(Resource):
+    def post(self, user_id):
+        data = request.get_json()
+        result, status_code = mark_notifications_read(user_id, data)
+        return result, status_code
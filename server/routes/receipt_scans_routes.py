@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import ReceiptScan
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.receipt_scan_controller import (
     get_all_receipt_scans,
+    stream_all_receipt_scans,
     get_receipt_scan_by_id,
     create_receipt_scan,
     update_receipt_scan,
@@ -9,8 +13,11 @@ from server.controllers.receipt_scan_controller import (
 )
 
 class ReceiptScansResource(Resource):
+    @conditional_get(ReceiptScan)
     def get(self):
-        scans, status_code = get_all_receipt_scans()
+        if wants_stream():
+            return stream_all_receipt_scans(fields=request.args.get('fields'))
+        scans, status_code = get_all_receipt_scans(fields=request.args.get('fields'))
         return scans, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class ReceiptScansResource(Resource):
         return scan, status_code
 
 class ReceiptScanByIdResource(Resource):
+    @conditional_get(ReceiptScan, id_arg='scan_id')
     def get(self, scan_id):
-        scan, status_code = get_receipt_scan_by_id(scan_id)
+        scan, status_code = get_receipt_scan_by_id(scan_id, fields=request.args.get('fields'))
         return scan, status_code
 
     def patch(self, scan_id):
@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import SmartBudget
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.smart_budget_controller import (
     get_all_smart_budgets,
+    stream_all_smart_budgets,
     get_smart_budget_by_id,
     create_smart_budget,
     update_smart_budget,
@@ -9,8 +13,11 @@ from server.controllers.smart_budget_controller import (
 )
 
 class SmartBudgetsResource(Resource):
+    @conditional_get(SmartBudget)
     def get(self):
-        smart_budgets, status_code = get_all_smart_budgets()
+        if wants_stream():
+            return stream_all_smart_budgets(fields=request.args.get('fields'))
+        smart_budgets, status_code = get_all_smart_budgets(fields=request.args.get('fields'))
         return smart_budgets, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class SmartBudgetsResource(Resource):
         return sb, status_code
 
 class SmartBudgetByIdResource(Resource):
+    @conditional_get(SmartBudget, id_arg='sb_id')
     def get(self, sb_id):
-        sb, status_code = get_smart_budget_by_id(sb_id)
+        sb, status_code = get_smart_budget_by_id(sb_id, fields=request.args.get('fields'))
         return sb, status_code
 
     def patch(self, sb_id):
@@ -1,16 +1,24 @@
 from flask import request
 from flask_restful import Resource
+from server.models import SmartCategory
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.smart_category_controller import (
     get_all_smart_categories,
+    stream_all_smart_categories,
     get_smart_category_by_id,
     create_smart_category,
     update_smart_category,
-    delete_smart_category
+    delete_smart_category,
+    classify_descriptions
 )
 
 class SmartCategoriesResource(Resource):
+    @conditional_get(SmartCategory)
     def get(self):
-        smart_categories, status_code = get_all_smart_categories()
+        if wants_stream():
+            return stream_all_smart_categories(fields=request.args.get('fields'))
+        smart_categories, status_code = get_all_smart_categories(fields=request.args.get('fields'))
         return smart_categories, status_code
 
     def post(self):
@@ -19,8 +27,9 @@ class SmartCategoriesResource(Resource):
         return sc, status_code
 
 class SmartCategoryByIdResource(Resource):
+    @conditional_get(SmartCategory, id_arg='sc_id')
     def get(self, sc_id):
-        sc, status_code = get_smart_category_by_id(sc_id)
+        sc, status_code = get_smart_category_by_id(sc_id, fields=request.args.get('fields'))
         return sc, status_code
 
     def patch(self, sc_id):
@@ -31,3 +40,9 @@ class SmartCategoryByIdResource(Resource):
     def delete(self, sc_id):
         response, status_code = delete_smart_category(sc_id)
         return response, status_code
+
+class SmartCategoryClassifyResource(Resource):
+    def post(self):
+        data = request.get_json()
+        result, status_code = classify_descriptions(data)
+        return result, status_code
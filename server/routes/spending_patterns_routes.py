@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import SpendingPattern
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.spending_pattern_controller import (
     get_all_spending_patterns,
+    stream_all_spending_patterns,
     get_spending_pattern_by_id,
     create_spending_pattern,
     update_spending_pattern,
@@ -9,8 +13,11 @@ from server.controllers.spending_pattern_controller import (
 )
 
 class SpendingPatternsResource(Resource):
+    @conditional_get(SpendingPattern)
     def get(self):
-        patterns, status_code = get_all_spending_patterns()
+        if wants_stream():
+            return stream_all_spending_patterns(fields=request.args.get('fields'))
+        patterns, status_code = get_all_spending_patterns(fields=request.args.get('fields'))
         return patterns, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class SpendingPatternsResource(Resource):
         return sp, status_code
 
 class SpendingPatternByIdResource(Resource):
+    @conditional_get(SpendingPattern, id_arg='pattern_id')
     def get(self, pattern_id):
-        sp, status_code = get_spending_pattern_by_id(pattern_id)
+        sp, status_code = get_spending_pattern_by_id(pattern_id, fields=request.args.get('fields'))
         return sp, status_code
 
     def patch(self, pattern_id):
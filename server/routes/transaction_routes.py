@@ -1,16 +1,33 @@
 from flask import request
 from flask_restful import Resource
+from server.models import Transaction
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.transaction_controller import (
     get_all_transactions,
+    stream_all_transactions,
     get_transaction_by_id,
     create_transaction,
+    create_transactions_batch,
     update_transaction,
     delete_transaction
 )
+from server.controllers.transaction_import_controller import (
+    start_transaction_import,
+    get_transaction_import_by_id
+)
 
 class TransactionsResource(Resource):
+    @conditional_get(Transaction)
     def get(self):
-        transactions, status_code = get_all_transactions()
+        if wants_stream():
+            return stream_all_transactions(filters=request.args, fields=request.args.get('fields'))
+        transactions, status_code = get_all_transactions(
+            filters=request.args,
+            limit=request.args.get('limit'),
+            cursor=request.args.get('cursor'),
+            fields=request.args.get('fields')
+        )
         return transactions, status_code
 
     def post(self):
@@ -18,9 +35,34 @@ class TransactionsResource(Resource):
         transaction, status_code = create_transaction(data)
         return transaction, status_code
 
+class TransactionBatchResource(Resource):
+    def post(self):
+        data = request.get_json(silent=True)
+        # A bare array is the transactions themselves, with the default on_error
+        if isinstance(data, list):
+            data = {'transactions': data}
+        if not isinstance(data, dict):
+            return {"error": "Body must be a list of transactions or an object with a transactions list"}, 400
+        result, status_code = create_transactions_batch(
+            data.get('transactions'),
+            on_error=data.get('on_error', 'abort')
+        )
+        return result, status_code
+
+class TransactionImportsResource(Resource):
+    def post(self):
+        result, status_code = start_transaction_import(request.files.get('file'), request.form)
+        return result, status_code
+
+class TransactionImportByIdResource(Resource):
+    def get(self, import_id):
+        result, status_code = get_transaction_import_by_id(import_id)
+        return result, status_code
+
 class TransactionByIdResource(Resource):
+    @conditional_get(Transaction, id_arg='transaction_id')
     def get(self, transaction_id):
-        transaction, status_code = get_transaction_by_id(transaction_id)
+        transaction, status_code = get_transaction_by_id(transaction_id, fields=request.args.get('fields'))
         return transaction, status_code
 
     def patch(self, transaction_id):
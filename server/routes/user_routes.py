@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import User
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.user_controller import (
     get_all_users,
+    stream_all_users,
     get_user_by_id,
     create_user,
     update_user,
@@ -9,8 +13,11 @@ from server.controllers.user_controller import (
 )
 
 class UserResource(Resource):
+    @conditional_get(User)
     def get(self):
-        users, status_code = get_all_users()
+        if wants_stream():
+            return stream_all_users(fields=request.args.get('fields'))
+        users, status_code = get_all_users(fields=request.args.get('fields'))
         return users, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class UserResource(Resource):
         return user, status_code
 
 class UserByIdResource(Resource):
+    @conditional_get(User, id_arg='user_id')
     def get(self, user_id):
-        user, status_code = get_user_by_id(user_id)
+        user, status_code = get_user_by_id(user_id, fields=request.args.get('fields'))
         return user, status_code
 
     def patch(self, user_id):
@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import VoiceTransaction
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.voice_transaction_controller import (
     get_all_voice_transactions,
+    stream_all_voice_transactions,
     get_voice_transaction_by_id,
     create_voice_transaction,
     update_voice_transaction,
@@ -9,8 +13,11 @@ from server.controllers.voice_transaction_controller import (
 )
 
 class VoiceTransactionsResource(Resource):
+    @conditional_get(VoiceTransaction)
     def get(self):
-        transactions, status_code = get_all_voice_transactions()
+        if wants_stream():
+            return stream_all_voice_transactions(fields=request.args.get('fields'))
+        transactions, status_code = get_all_voice_transactions(fields=request.args.get('fields'))
         return transactions, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class VoiceTransactionsResource(Resource):
         return vt, status_code
 
 class VoiceTransactionByIdResource(Resource):
+    @conditional_get(VoiceTransaction, id_arg='vt_id')
     def get(self, vt_id):
-        vt, status_code = get_voice_transaction_by_id(vt_id)
+        vt, status_code = get_voice_transaction_by_id(vt_id, fields=request.args.get('fields'))
         return vt, status_code
 
     def patch(self, vt_id):
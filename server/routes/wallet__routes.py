@@ -1,16 +1,31 @@
 from flask import request
 from flask_restful import Resource
+from server.models import Wallet
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.wallet__controller import (
     get_all_wallets,
+    stream_all_wallets,
     get_wallet_by_id,
     create_wallet,
     update_wallet,
-    delete_wallet
+    delete_wallet,
+    get_wallet_summary
 )
 
+def _expanded():
+    return bool(request.args.get('expand'))
+
 class WalletsResource(Resource):
+    # Expanded owners, transactions, budgets and collaborators change without the wallet row
+    @conditional_get(Wallet, unless=_expanded)
     def get(self):
-        wallets, status_code = get_all_wallets()
+        if wants_stream():
+            return stream_all_wallets(fields=request.args.get('fields'))
+        wallets, status_code = get_all_wallets(
+            fields=request.args.get('fields'),
+            expand=request.args.get('expand')
+        )
         return wallets, status_code
 
     def post(self):
@@ -19,8 +34,13 @@ class WalletsResource(Resource):
         return wallet, status_code
 
 class WalletByIdResource(Resource):
+    @conditional_get(Wallet, id_arg='wallet_id', unless=_expanded)
     def get(self, wallet_id):
-        wallet, status_code = get_wallet_by_id(wallet_id)
+        wallet, status_code = get_wallet_by_id(
+            wallet_id,
+            fields=request.args.get('fields'),
+            expand=request.args.get('expand')
+        )
         return wallet, status_code
 
     def patch(self, wallet_id):
@@ -31,3 +51,12 @@ class WalletByIdResource(Resource):
     def delete(self, wallet_id):
         response, status_code = delete_wallet(wallet_id)
         return response, status_code
+
+class WalletSummaryResource(Resource):
+    def get(self, wallet_id):
+        summary, status_code = get_wallet_summary(
+            wallet_id,
+            month_from=request.args.get('from'),
+            month_to=request.args.get('to')
+        )
+        return summary, status_code
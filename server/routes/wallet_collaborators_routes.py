@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import WalletCollaborator
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.wallet_collaborators_controller import (
     get_collaborators_for_wallet,
+    stream_collaborators_for_wallet,
     get_wallet_collaborator_by_id,
     add_collaborator,
     update_collaborator,
@@ -9,8 +13,11 @@ from server.controllers.wallet_collaborators_controller import (
 )
 
 class WalletCollaboratorsResource(Resource):
+    @conditional_get(WalletCollaborator)
     def get(self, wallet_id):
-        collaborators, status_code = get_collaborators_for_wallet(wallet_id)
+        if wants_stream():
+            return stream_collaborators_for_wallet(wallet_id, fields=request.args.get('fields'))
+        collaborators, status_code = get_collaborators_for_wallet(wallet_id, fields=request.args.get('fields'))
         return collaborators, status_code
 
     def post(self, wallet_id):
@@ -19,8 +26,9 @@ class WalletCollaboratorsResource(Resource):
         return collaborator, status_code
 
 class WalletCollaboratorByIdResource(Resource):
+    @conditional_get(WalletCollaborator, id_arg='collaborator_id')
     def get(self, wallet_id, collaborator_id):
-        collaborator, status_code = get_wallet_collaborator_by_id(wallet_id, collaborator_id)
+        collaborator, status_code = get_wallet_collaborator_by_id(wallet_id, collaborator_id, fields=request.args.get('fields'))
         return collaborator, status_code
 
     def patch(self, wallet_id, collaborator_id):
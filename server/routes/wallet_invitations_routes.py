@@ -1,16 +1,26 @@
 from flask import request
 from flask_restful import Resource
+from server.models import WalletInvitation
+from server.services.invitations import has_unswept_expiries
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.wallet_invitation_controller import (
     get_all_wallet_invitations,
+    stream_all_wallet_invitations,
     get_wallet_invitation_by_id,
     create_wallet_invitation,
     update_wallet_invitation,
     delete_wallet_invitation
 )
 
+# Until the sweeper marks them, expired invitations change status without their
+# timestamps changing, so validators would let clients keep a stale 'pending'
 class WalletInvitationsResource(Resource):
+    @conditional_get(WalletInvitation, unless=has_unswept_expiries)
     def get(self):
-        invitations, status_code = get_all_wallet_invitations()
+        if wants_stream():
+            return stream_all_wallet_invitations(fields=request.args.get('fields'))
+        invitations, status_code = get_all_wallet_invitations(fields=request.args.get('fields'))
         return invitations, status_code
 
     def post(self):
@@ -19,8 +29,9 @@ class WalletInvitationsResource(Resource):
         return inv, status_code
 
 class WalletInvitationByIdResource(Resource):
+    @conditional_get(WalletInvitation, id_arg='invitation_id', unless=has_unswept_expiries)
     def get(self, invitation_id):
-        inv, status_code = get_wallet_invitation_by_id(invitation_id)
+        inv, status_code = get_wallet_invitation_by_id(invitation_id, fields=request.args.get('fields'))
         return inv, status_code
 
     def patch(self, invitation_id):
@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
+from server.models import XRVisualization
+from server.utils.conditional import conditional_get
+from server.utils.streaming import wants_stream
 from server.controllers.xr_visualization_controller import (
     get_all_xr_visualizations,
+    stream_all_xr_visualizations,
     get_xr_visualization_by_id,
     create_xr_visualization,
     update_xr_visualization,
@@ -9,8 +13,11 @@ from server.controllers.xr_visualization_controller import (
 )
 
 class XRVisualizationsResource(Resource):
+    @conditional_get(XRVisualization)
     def get(self):
-        visualizations, status_code = get_all_xr_visualizations()
+        if wants_stream():
+            return stream_all_xr_visualizations(fields=request.args.get('fields'))
+        visualizations, status_code = get_all_xr_visualizations(fields=request.args.get('fields'))
         return visualizations, status_code
 
     def post(self):
@@ -19,8 +26,9 @@ class XRVisualizationsResource(Resource):
         return xr, status_code
 
 class XRVisualizationByIdResource(Resource):
+    @conditional_get(XRVisualization, id_arg='xr_id')
     def get(self, xr_id):
-        xr, status_code = get_xr_visualization_by_id(xr_id)
+        xr, status_code = get_xr_visualization_by_id(xr_id, fields=request.args.get('fields'))
         return xr, status_code
 
     def patch(self, xr_id):
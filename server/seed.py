@@ -2,11 +2,14 @@ from faker import Faker
 from random import choice, uniform, randint
 from datetime import datetime, timedelta
 from server.config import app, db
+from server.services.transaction_effects import apply_transaction_effects, transaction_snapshot
 from server.models import (
     User, Wallet, Transaction, Category, WalletCollaborator, Budget,
     AIAdvisorProfile, VoiceTransaction, SpendingPattern, FinancialBenchmark,
     XRVisualization, CryptoWallet, FinancialForecast, SmartCategory,
-    WalletInvitation, SmartBudget, Notification, ReceiptScan
+    WalletInvitation, SmartBudget, Notification, ReceiptScan, TransactionImport,
+    WalletMonthlyRollup, BudgetAlert, SpendingStatistic, DetectorCheckpoint, BenchmarkSketch,
+    ActivityEvent
 )
 
 fake = Faker()
@@ -57,11 +60,12 @@ def seed_wallets(users):
             name=fake.word().capitalize() + " Wallet",
             description=fake.sentence(),
             currency=choice(["USD", "KES", "EUR"]),
-            balance=round(uniform(1000, 10000), 2),
+            balance=balance,
+            opening_balance=balance,
             type=choice(["personal", "shared"]),
             owner_id=choice(users).id
         )
-        for _ in range(15)
+        for balance in [round(uniform(1000, 10000), 2) for _ in range(15)]
     ]
     db.session.add_all(wallets)
     db.session.commit()
@@ -103,6 +107,8 @@ def seed_transactions(wallets, users, categories):
         for _ in range(50)
     ]
     db.session.add_all(transactions)
+    # Same bookkeeping as the API write paths, so balances include the seeded history
+    apply_transaction_effects(added=[transaction_snapshot(transaction) for transaction in transactions])
     db.session.commit()
     print(f"✅ Seeded {len(transactions)} transactions!\n")
 
@@ -376,13 +382,20 @@ if __name__ == '__main__':
         db.session.query(CryptoWallet).delete()
         db.session.query(XRVisualization).delete()
         db.session.query(FinancialBenchmark).delete()
+        db.session.query(BenchmarkSketch).delete()
         db.session.query(SpendingPattern).delete()
+        db.session.query(SpendingStatistic).delete()
+        db.session.query(DetectorCheckpoint).delete()
         db.session.query(VoiceTransaction).delete()
         db.session.query(AIAdvisorProfile).delete()
+        db.session.query(ActivityEvent).delete()
         db.session.query(Notification).delete()
         db.session.query(ReceiptScan).delete()
+        db.session.query(BudgetAlert).delete()
         db.session.query(Budget).delete()
         db.session.query(WalletCollaborator).delete()
+        db.session.query(TransactionImport).delete()
+        db.session.query(WalletMonthlyRollup).delete()
         db.session.query(Transaction).delete()
         db.session.query(Category).delete()
         db.session.query(Wallet).delete()
@@ -0,0 +1,174 @@
+import math
+import time
+from flask import current_app
+from sqlalchemy import func, insert, or_, tuple_
+from server.models import db, DetectorCheckpoint, SpendingPattern, SpendingStatistic, Transaction
+from server.utils.dialects import upsert_insert
+
+ANOMALY_BATCH_SIZE = 1000
+CHECKPOINT_NAME = 'anomalies'
+# How long a run keeps looking for a transaction id it skipped. Ids are handed out
+# before commit, so a slow transaction can make a lower id visible after a higher one.
+ANOMALY_GAP_SECONDS = 300
+MAX_TRACKED_GAP = 1000
+
+def ewma_update(state, value, alpha):
+    """
+    Folds one observation into a (count, mean, variance) state with exponentially
+    weighted moving mean and variance. Constant work and memory per observation.
+    """
+    count, mean, variance = state
+    if count == 0:
+        return 1, value, 0.0
+    difference = value - mean
+    increment = alpha * difference
+    return count + 1, mean + increment, (1 - alpha) * (variance + difference * increment)
+
+def z_score(state, value, min_observations):
+    """Standard deviations `value` lies above the running mean, None while warming up."""
+    count, mean, variance = state
+    if count < min_observations or variance <= 0:
+        return None
+    return (value - mean) / math.sqrt(variance)
+
+def _checkpoint():
+    """The detector's checkpoint row, locked so two runs never score the same rows."""
+    checkpoint = DetectorCheckpoint.query.with_for_update().get(CHECKPOINT_NAME)
+    if checkpoint is None:
+        checkpoint = DetectorCheckpoint(name=CHECKPOINT_NAME, last_transaction_id=0)
+        db.session.add(checkpoint)
+        db.session.flush()
+    return checkpoint
+
+def _anomaly(row, state, z, params):
+    count, mean, _ = state
+    amount = float(row.amount)
+    expected = math.expm1(mean)
+    return {
+        'user_id': row.created_by,
+        'pattern_type': 'anomaly',
+        'pattern_data': {
+            'transaction_id': row.id,
+            'wallet_id': row.wallet_id,
+            'category_id': row.category_id,
+            'amount': amount,
+            'date': row.date.isoformat(),
+            'expected_amount': round(expected, 2),
+            'z_score': round(z, 3)
+        },
+        'significance_score': round(z, 3),
+        'recognition_params': dict(params, observations=count),
+        'actions_suggested': [
+            {'action': 'review_transaction', 'transaction_id': row.id}
+        ]
+    }
+
+def detect_anomalies(batch_size=ANOMALY_BATCH_SIZE):
+    """
+    Scores expenses created since the last run against their user's running
+    statistics for the category and records unusually large ones as anomaly
+    SpendingPatterns, with the z-score as significance_score.
+
+    Transactions are read in id order after the checkpoint, in batches. Each batch
+    loads the states it needs in one query, scores and folds every transaction in
+    O(1), upserts the states, inserts the patterns and moves the checkpoint, all in
+    one commit, so an interrupted run resumes where it stopped. Ids the checkpoint
+    jumps over are kept on it for ANOMALY_GAP_SECONDS and read again by later
+    batches, so a transaction that commits after a higher id is still scored.
+    """
+    alpha = current_app.config['ANOMALY_EWMA_ALPHA']
+    threshold = current_app.config['ANOMALY_Z_THRESHOLD']
+    min_observations = current_app.config['ANOMALY_MIN_OBSERVATIONS']
+    params = {'method': 'ewma', 'alpha': alpha, 'z_threshold': threshold, 'scale': 'log1p'}
+    table = SpendingStatistic.__table__
+    save_states = upsert_insert(table)
+    save_states = save_states.on_conflict_do_update(
+        index_elements=['user_id', 'category_id'],
+        set_={
+            'count': save_states.excluded['count'],
+            'mean': save_states.excluded.mean,
+            'variance': save_states.excluded.variance,
+            'last_transaction_id': save_states.excluded.last_transaction_id,
+            'updated_at': func.now()
+        }
+    )
+
+    stats = {'transactions': 0, 'anomalies': 0}
+    while True:
+        checkpoint = _checkpoint()
+        gaps = {transaction_id: deadline for transaction_id, deadline in checkpoint.pending_gaps or []}
+        condition = Transaction.id > checkpoint.last_transaction_id
+        if gaps:
+            condition = or_(condition, Transaction.id.in_(list(gaps)))
+        # Every type is read so that only ids that are not visible yet count as gaps
+        rows = db.session.query(
+            Transaction.id,
+            Transaction.created_by,
+            Transaction.wallet_id,
+            Transaction.category_id,
+            Transaction.type,
+            Transaction.amount,
+            Transaction.date
+        ).filter(condition).order_by(Transaction.id).limit(batch_size).all()
+
+        now = time.time()
+        last_id = checkpoint.last_transaction_id
+        for row in rows:
+            gaps.pop(row.id, None)
+            if row.id > last_id + 1 and row.id - last_id <= MAX_TRACKED_GAP:
+                gaps.update((gap, now + ANOMALY_GAP_SECONDS) for gap in range(last_id + 1, row.id))
+            last_id = max(last_id, row.id)
+        # Gaps are dropped only after a last look past their deadline
+        gaps = {gap: deadline for gap, deadline in gaps.items() if deadline > now}
+        checkpoint.pending_gaps = sorted([gap, deadline] for gap, deadline in gaps.items()) or None
+        checkpoint.last_transaction_id = last_id
+
+        expenses = [
+            row for row in rows
+            if row.type == 'expense' and row.category_id is not None and row.amount >= 0
+        ]
+        if not expenses:
+            db.session.commit()
+            if len(rows) < batch_size:
+                break
+            continue
+
+        keys = {(row.created_by, row.category_id) for row in expenses}
+        states = {
+            (state.user_id, state.category_id): (state.count, state.mean, state.variance)
+            for state in SpendingStatistic.query.filter(
+                tuple_(SpendingStatistic.user_id, SpendingStatistic.category_id).in_(keys)
+            )
+        }
+
+        patterns = []
+        last_seen = {}
+        for row in expenses:
+            key = (row.created_by, row.category_id)
+            state = states.get(key, (0, 0.0, 0.0))
+            value = math.log1p(float(row.amount))
+            z = z_score(state, value, min_observations)
+            if z is not None and z >= threshold:
+                patterns.append(_anomaly(row, state, z, params))
+            states[key] = ewma_update(state, value, alpha)
+            last_seen[key] = max(row.id, last_seen.get(key, 0))
+
+        db.session.execute(save_states, [
+            {
+                'user_id': user_id,
+                'category_id': category_id,
+                'count': states[(user_id, category_id)][0],
+                'mean': states[(user_id, category_id)][1],
+                'variance': states[(user_id, category_id)][2],
+                'last_transaction_id': transaction_id
+            }
+            for (user_id, category_id), transaction_id in sorted(last_seen.items())
+        ])
+        if patterns:
+            db.session.execute(insert(SpendingPattern), patterns)
+        db.session.commit()
+        stats['transactions'] += len(expenses)
+        stats['anomalies'] += len(patterns)
+        if len(rows) < batch_size:
+            break
+    return stats
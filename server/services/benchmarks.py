@@ -0,0 +1,155 @@
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, func, update
+from server.models import db, BenchmarkSketch, FinancialBenchmark, Wallet, WalletMonthlyRollup
+from server.services.rollups import month_start, next_month
+from server.utils.cache import invalidate_on_commit
+from server.utils.dialects import upsert_insert
+from server.utils.tdigest import TDigest
+
+BENCHMARK_METRIC = 'monthly_spending'
+BENCHMARK_QUANTILES = (('p25', 0.25), ('p50', 0.5), ('p75', 0.75), ('p90', 0.9))
+
+def peer_group_key(params):
+    """Stable key of a peer group: the same params in any key order share one sketch."""
+    canonical = json.dumps(params or {}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def last_complete_month(now=None):
+    return month_start(month_start(now or datetime.utcnow()) - timedelta(days=1))
+
+def _monthly_spending(*criteria):
+    """(user_id, month, total) of expenses in the wallets each user owns, from the rollups."""
+    rollup = WalletMonthlyRollup
+    return db.session.query(
+        Wallet.owner_id, rollup.month, func.sum(rollup.total)
+    ).join(Wallet, Wallet.id == rollup.wallet_id).filter(
+        rollup.type == 'expense', *criteria
+    ).group_by(Wallet.owner_id, rollup.month)
+
+def user_monthly_spending(user_id, month):
+    total = _monthly_spending(Wallet.owner_id == user_id, WalletMonthlyRollup.month == month).first()
+    return float(total[2]) if total else 0.0
+
+def comparison_metrics(digest, value, month, member_count=None):
+    """A user's monthly spending placed in the peer distribution; constant time."""
+    percentile = digest.cdf(value)
+    metrics = {
+        'metric': BENCHMARK_METRIC,
+        'month': month.strftime('%Y-%m'),
+        'value': round(value, 2),
+        'percentile': round(percentile * 100, 1) if percentile is not None else None,
+        'peer_quantiles': {
+            name: round(digest.quantile(q), 2) if digest.count else None
+            for name, q in BENCHMARK_QUANTILES
+        },
+        'peer_values': int(digest.count)
+    }
+    if member_count is not None:
+        metrics['peer_members'] = member_count
+    return metrics
+
+def update_benchmarks(through=None):
+    """
+    Folds the monthly spending totals of every peer group's members into the group's
+    t-digest, then rewrites each benchmark's comparison_metrics from the sketches.
+
+    Each sketch remembers the last month it has absorbed, so a run only adds the
+    months completed since, read from the monthly rollups in one grouped query;
+    earlier values are never re-read or re-sorted. Sketches are upserted in one
+    statement and benchmarks updated in one executemany.
+    """
+    through = through or last_complete_month()
+    benchmarks = db.session.query(
+        FinancialBenchmark.id, FinancialBenchmark.user_id, FinancialBenchmark.peer_group_params
+    ).all()
+    if not benchmarks:
+        return {'groups': 0, 'values': 0, 'benchmarks': 0}
+
+    members = defaultdict(set)
+    params = {}
+    user_groups = defaultdict(set)
+    for _, user_id, group_params in benchmarks:
+        key = peer_group_key(group_params)
+        members[key].add(user_id)
+        params[key] = group_params
+        user_groups[user_id].add(key)
+
+    sketches = {
+        sketch.peer_group_key: sketch
+        for sketch in BenchmarkSketch.query.filter(BenchmarkSketch.peer_group_key.in_(list(members)))
+    }
+    digests = {}
+    covered = {}
+    starts = {}
+    for key in members:
+        sketch = sketches.get(key)
+        digests[key] = TDigest.from_dict(sketch.sketch if sketch else None)
+        covered[key] = sketch.months_through if sketch else None
+        starts[key] = next_month(covered[key]) if covered[key] else None
+
+    user_ids = list(user_groups)
+    criteria = [WalletMonthlyRollup.month <= through]
+    if None not in starts.values():
+        criteria.append(WalletMonthlyRollup.month >= min(starts.values()))
+    new_values = defaultdict(list)
+    for user_id, month, total in _monthly_spending(Wallet.owner_id.in_(user_ids), *criteria):
+        for key in user_groups[user_id]:
+            if starts[key] is None or month >= starts[key]:
+                new_values[key].append(float(total))
+    latest = {
+        user_id: float(total)
+        for user_id, _, total in _monthly_spending(
+            Wallet.owner_id.in_(user_ids), WalletMonthlyRollup.month == through
+        )
+    }
+
+    values_added = 0
+    sketch_rows = []
+    for key, digest in digests.items():
+        digest.update(new_values[key])
+        values_added += len(new_values[key])
+        sketch_rows.append({
+            'peer_group_key': key,
+            'peer_group_params': params[key],
+            'sketch': digest.to_dict(),
+            'value_count': int(digest.count),
+            'member_count': len(members[key]),
+            'months_through': max(through, covered[key] or through)
+        })
+    statement = upsert_insert(BenchmarkSketch.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['peer_group_key'],
+        set_=dict(
+            {
+                key: statement.excluded[key]
+                for key in ('peer_group_params', 'sketch', 'value_count', 'member_count', 'months_through')
+            },
+            updated_at=func.now()
+        )
+    )
+    db.session.execute(statement, sketch_rows)
+
+    table = FinancialBenchmark.__table__
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('benchmark_id')).values(
+            comparison_metrics=bindparam('comparison_metrics'), updated_at=func.now()
+        ),
+        [
+            {
+                'benchmark_id': benchmark_id,
+                'comparison_metrics': comparison_metrics(
+                    digests[peer_group_key(group_params)],
+                    latest.get(user_id, 0.0),
+                    through,
+                    len(members[peer_group_key(group_params)])
+                )
+            }
+            for benchmark_id, user_id, group_params in benchmarks
+        ]
+    )
+    invalidate_on_commit(FinancialBenchmark, *[benchmark_id for benchmark_id, _, _ in benchmarks])
+    db.session.commit()
+    return {'groups': len(digests), 'values': values_added, 'benchmarks': len(benchmarks)}
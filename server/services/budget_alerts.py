@@ -0,0 +1,99 @@
+from datetime import datetime, time
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import insert, or_, tuple_
+from server.models import db, Budget, BudgetAlert, Category, Notification
+from server.services.budget_status import budget_status_rows
+from server.services.events import notification_events, record_events
+from server.utils.dialects import upsert_insert
+
+def _alert_text(threshold, percent_used, spent, amount, category_name):
+    title = "Budget exceeded" if threshold >= 100 else f"Budget {threshold}% used"
+    message = (
+        f"You have spent {spent:.2f} of your {amount:.2f} {category_name} budget "
+        f"({percent_used:.0f}%)."
+    )
+    return title, message
+
+def evaluate_budget_alerts(added):
+    """
+    Checks the budgets a write can have pushed over a threshold and sends alerts.
+
+    Only budgets on the (wallet_id, category_id) pairs of the added expense rows,
+    whose window overlaps the added dates, are recomputed, using one grouped status
+    query. Crossed thresholds are recorded with INSERT ... ON CONFLICT DO NOTHING
+    RETURNING on (budget_id, period_start, threshold), so an alert that was already
+    sent for the period is never repeated. One notification per budget, for the
+    highest newly crossed threshold, is then written in a single bulk insert.
+    """
+    expenses = [row for row in added if row['type'] == 'expense']
+    thresholds = current_app.config['BUDGET_ALERT_THRESHOLDS']
+    if not expenses or not thresholds:
+        return []
+    pairs = sorted({(row['wallet_id'], row['category_id']) for row in expenses})
+    dates = [row['date'] for row in expenses]
+
+    budgets = {}
+    candidates = []
+    for budget, spent, _ in budget_status_rows(
+        tuple_(Budget.wallet_id, Budget.category_id).in_(pairs),
+        Budget.start_date <= max(dates),
+        # From the start of the earliest day, so budgets ending at midnight of that day still count
+        or_(Budget.end_date.is_(None), Budget.end_date >= datetime.combine(min(dates).date(), time.min))
+    ):
+        if not budget.amount:
+            continue
+        spent = spent if isinstance(spent, Decimal) else Decimal(str(spent))
+        percent_used = float(spent / budget.amount * 100)
+        crossed = [threshold for threshold in thresholds if percent_used >= threshold]
+        if not crossed:
+            continue
+        budgets[budget.id] = (budget, spent, percent_used)
+        candidates.extend(
+            {
+                'budget_id': budget.id,
+                'period_start': budget.start_date,
+                'threshold': threshold,
+                'percent_used': round(percent_used, 2)
+            }
+            for threshold in crossed
+        )
+    if not candidates:
+        return []
+
+    statement = (
+        upsert_insert(BudgetAlert.__table__)
+        .on_conflict_do_nothing(index_elements=['budget_id', 'period_start', 'threshold'])
+        .returning(BudgetAlert.budget_id, BudgetAlert.threshold)
+    )
+    new_alerts = db.session.execute(statement, candidates).all()
+    highest = {}
+    for budget_id, threshold in new_alerts:
+        highest[budget_id] = max(threshold, highest.get(budget_id, threshold))
+    if not highest:
+        return []
+
+    category_ids = {budgets[budget_id][0].category_id for budget_id in highest}
+    category_names = dict(
+        db.session.query(Category.id, Category.name).filter(Category.id.in_(category_ids))
+    )
+    notifications = []
+    for budget_id, threshold in sorted(highest.items()):
+        budget, spent, percent_used = budgets[budget_id]
+        title, message = _alert_text(
+            threshold, percent_used, spent, budget.amount, category_names.get(budget.category_id, '')
+        )
+        notifications.append({
+            'user_id': budget.user_id,
+            'type': 'budget_alert',
+            'title': title,
+            'message': message,
+            'is_read': False
+        })
+    ids = db.session.execute(
+        insert(Notification).returning(Notification.id, sort_by_parameter_order=True), notifications
+    ).scalars().all()
+    for notification, notification_id in zip(notifications, ids):
+        notification['id'] = notification_id
+    record_events(notification_events(notifications))
+    return notifications
@@ -0,0 +1,60 @@
+from decimal import Decimal
+from sqlalchemy import and_, func, or_
+from server.models import db, Budget, Transaction
+from server.utils.dialects import is_midnight, next_day_expression
+from server.utils.serializers import format_datetime, format_decimal
+
+def _window_join():
+    """
+    Expense transactions in the budget's wallet and category, dated inside its
+    [start_date, end_date] window. Budgets without an end_date are open-ended; an
+    end_date at midnight, as a bare date parses to, covers that whole day.
+    """
+    return and_(
+        Transaction.wallet_id == Budget.wallet_id,
+        Transaction.category_id == Budget.category_id,
+        Transaction.type == 'expense',
+        Transaction.date >= Budget.start_date,
+        or_(
+            Budget.end_date.is_(None),
+            Transaction.date <= Budget.end_date,
+            and_(is_midnight(Budget.end_date), Transaction.date < next_day_expression(Budget.end_date))
+        )
+    )
+
+def budget_status_rows(*criteria):
+    """
+    (budget, spent, transaction_count) for every budget matching `criteria`, from one
+    grouped LEFT JOIN. With the (wallet_id, category_id, date) index each budget seeks
+    straight to its window, so the cost follows the transactions inside the windows.
+    """
+    spent = func.coalesce(func.sum(Transaction.amount), 0)
+    return (
+        db.session.query(Budget, spent, func.count(Transaction.id))
+        .outerjoin(Transaction, _window_join())
+        .filter(*criteria)
+        .group_by(Budget.id)
+        .order_by(Budget.id)
+        .all()
+    )
+
+def format_status(budget, spent, transaction_count):
+    amount = budget.amount or Decimal(0)
+    spent = spent if isinstance(spent, Decimal) else Decimal(str(spent))
+    return {
+        "budget_id": budget.id,
+        "amount": format_decimal(amount),
+        "spent": format_decimal(spent),
+        "remaining": format_decimal(amount - spent),
+        "percent_used": round(float(spent / amount * 100), 2) if amount else None,
+        "transaction_count": transaction_count,
+        "window_start": format_datetime(budget.start_date),
+        "window_end": format_datetime(budget.end_date) if budget.end_date else None
+    }
+
+def budget_statuses(*criteria):
+    """Status dicts keyed by budget id."""
+    return {
+        budget.id: format_status(budget, spent, count)
+        for budget, spent, count in budget_status_rows(*criteria)
+    }
@@ -0,0 +1,392 @@
+import re
+import threading
+import time
+from collections import deque, namedtuple
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+from sqlalchemy import bindparam, func, update
+from server.models import db, Category, SmartCategory, Transaction
+from server.services.transaction_effects import EFFECT_FIELDS, apply_transaction_effects, transaction_snapshot
+from server.utils.cache import invalidate_on_commit
+
+DEFAULT_CONFIDENCE_MINIMUM = 0.5
+# How often a process checks whether another one changed the smart categories
+MATCHER_RECHECK_SECONDS = 30
+RECATEGORIZE_BATCH_SIZE = 1000
+# Client patterns run inside every transaction insert, so they are kept short and
+# free of constructs that can backtrack exponentially
+MAX_PATTERN_LENGTH = 200
+REPEAT_OPCODES = {'MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'}
+
+Classification = namedtuple('Classification', 'smart_category_id category_id confidence')
+
+def rule_terms(rules_set):
+    """
+    Keywords and regular expressions of a rules_set, as (text, weight) pairs:
+
+        {"keywords": ["netflix", {"keyword": "spotify", "weight": 0.8}],
+         "patterns": ["uber\\s*trip", {"pattern": "^kplc", "weight": 0.6}],
+         "rule": "netflix"}
+
+    "rule" is a single keyword. Keywords match whole words, case-insensitively;
+    patterns are searched anywhere, case-insensitively. Raises ValueError for a
+    rules_set of any other shape, or a pattern that is invalid, too long or prone
+    to catastrophic backtracking.
+    """
+    if rules_set in (None, {}):
+        return [], []
+    if not isinstance(rules_set, dict):
+        raise ValueError("rules_set must be an object")
+
+    def terms(values, key):
+        if not isinstance(values, list):
+            raise ValueError(f"rules_set.{key}s must be a list")
+        parsed = []
+        for value in values:
+            weight = 1.0
+            if isinstance(value, dict):
+                weight = value.get('weight', 1.0)
+                value = value.get(key)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"Every rules_set.{key} must be a non-empty string")
+            if not isinstance(weight, (int, float)) or weight <= 0:
+                raise ValueError(f"rules_set.{key} weights must be positive numbers")
+            parsed.append((value.strip(), float(weight)))
+        return parsed
+
+    keywords = terms(rules_set.get('keywords', []), 'keyword')
+    if rules_set.get('rule') is not None:
+        keywords += terms([rules_set['rule']], 'keyword')
+    patterns = terms(rules_set.get('patterns', []), 'pattern')
+    for pattern, _ in patterns:
+        _check_pattern(pattern)
+    return keywords, patterns
+
+def _children(op, av):
+    # Sub-patterns nested inside one parsed regex node
+    name = str(op)
+    if name in REPEAT_OPCODES:
+        return [av[2]]
+    if name == 'SUBPATTERN':
+        return [av[-1]]
+    if name in ('ASSERT', 'ASSERT_NOT'):
+        return [av[1]]
+    if name == 'BRANCH':
+        return list(av[1])
+    if name == 'ATOMIC_GROUP':
+        return [av]
+    return []
+
+def _unsafe_construct(nodes, repeated=False):
+    """
+    Why a parsed pattern could backtrack catastrophically, or None: a backreference,
+    or a quantifier or alternation inside a quantified group, as in (a+)+ or (a|ab)*.
+    """
+    for op, av in nodes:
+        name = str(op)
+        if name in ('GROUPREF', 'GROUPREF_EXISTS'):
+            return "backreferences are not supported"
+        unbounded = name in REPEAT_OPCODES and av[1] > 1
+        if repeated and (unbounded or name == 'BRANCH'):
+            return "quantified groups may not contain quantifiers or alternations"
+        for child in _children(op, av):
+            reason = _unsafe_construct(child, repeated or unbounded)
+            if reason:
+                return reason
+    return None
+
+def _check_pattern(pattern):
+    """Raises ValueError for a pattern that is invalid, too long or prone to catastrophic backtracking."""
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"Pattern {pattern[:20]!r}... is longer than {MAX_PATTERN_LENGTH} characters")
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+    reason = _unsafe_construct(parsed)
+    if reason:
+        raise ValueError(f"Pattern {pattern!r} rejected: {reason}")
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton: finds every occurrence of any number of keywords in one
+    pass over the text, so matching cost depends on the text, not the keyword count.
+    """
+
+    def __init__(self):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+    def add(self, keyword, value):
+        state = 0
+        for char in keyword:
+            following = self.transitions[state].get(char)
+            if following is None:
+                following = len(self.transitions)
+                self.transitions[state][char] = following
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = following
+        self.outputs[state].append((len(keyword), value))
+
+    def build(self):
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.transitions[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[following] = target if target != following else 0
+                self.outputs[following] = self.outputs[following] + self.outputs[self.fail[following]]
+        return self
+
+    def find(self, text):
+        """Yields (start, end, value) for every keyword occurrence."""
+        state = 0
+        transitions = self.transitions
+        for index, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = self.fail[state]
+            state = transitions[state].get(char, 0)
+            for length, value in self.outputs[state]:
+                yield index + 1 - length, index + 1, value
+
+# A prefilter literal must be at least this long to be worth looking for
+MIN_ANCHOR_LENGTH = 3
+
+def literal_anchor(pattern):
+    """
+    Longest run of plain characters that every match of `pattern` must contain, or
+    None when no such run can be read off the pattern. Only the top level of
+    patterns without alternation is considered, so the result is never wrong, at
+    worst missing.
+    """
+    if '|' in pattern:
+        return None
+    runs = ['']
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            escaped = pattern[index + 1:index + 2]
+            index += 2
+            if depth or not escaped or escaped.isalnum():
+                # \d, \b, ... are classes or assertions, not literals
+                runs.append('')
+                continue
+            literal = escaped
+        elif char == '[':
+            closing = pattern.find(']', index + 2)
+            index = len(pattern) if closing < 0 else closing + 1
+            runs.append('')
+            continue
+        elif char in '*?+{':
+            # The quantified character is optional or repeated; drop it from the run
+            runs[-1] = runs[-1][:-1]
+            runs.append('')
+            if char == '{':
+                closing = pattern.find('}', index)
+                index = len(pattern) if closing < 0 else closing + 1
+            else:
+                index += 1
+            continue
+        elif char in '.^$()':
+            depth += (char == '(') - (char == ')')
+            runs.append('')
+            index += 1
+            continue
+        else:
+            literal = char
+            index += 1
+        if depth:
+            continue
+        runs[-1] += literal
+    anchor = max(runs, key=len).lower()
+    return anchor if len(anchor) >= MIN_ANCHOR_LENGTH else None
+
+class CategoryMatcher:
+    """
+    Every smart category rule compiled into one Aho-Corasick automaton. Keywords are
+    entries of the automaton; each pattern is entered by a literal it requires (its
+    anchor) and only runs when that literal occurs in the description. One pass over
+    the description finds the candidate rules, however many rules there are.
+    """
+
+    def __init__(self, smart_categories, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.categories = {}
+        self.automaton = KeywordAutomaton()
+        self.patterns = []
+        # Patterns with no usable anchor are tried on every description
+        self.unanchored = []
+        for smart_category_id, category_id, category_type, rules_set, confidence_minimum in smart_categories:
+            if category_id is None:
+                continue
+            try:
+                keywords, patterns = rule_terms(rules_set)
+            except ValueError:
+                # Rules saved before validation existed; skip rather than fail every insert
+                continue
+            self.categories[smart_category_id] = (
+                category_id,
+                category_type,
+                DEFAULT_CONFIDENCE_MINIMUM if confidence_minimum is None else confidence_minimum
+            )
+            for keyword, weight in keywords:
+                self.automaton.add(keyword.lower(), ('keyword', smart_category_id, keyword.lower(), weight))
+            for pattern, weight in patterns:
+                number = len(self.patterns)
+                self.patterns.append((re.compile(pattern, re.IGNORECASE), smart_category_id, weight))
+                anchor = literal_anchor(pattern)
+                if anchor is None:
+                    self.unanchored.append(number)
+                else:
+                    self.automaton.add(anchor, ('pattern', number, None, None))
+        self.automaton.build()
+
+    def scores(self, description, kind=None):
+        """Summed weight of the distinct rules matching, per smart category."""
+        text = description.lower()
+        matched = {}
+        candidates = set(self.unanchored)
+        for start, end, (rule, key, keyword, weight) in self.automaton.find(text):
+            if rule == 'pattern':
+                candidates.add(key)
+                continue
+            before = text[start - 1] if start else ' '
+            after = text[end] if end < len(text) else ' '
+            if not before.isalnum() and not after.isalnum():
+                matched[(key, keyword)] = weight
+        for number in candidates:
+            regex, smart_category_id, weight = self.patterns[number]
+            if regex.search(description):
+                matched[(smart_category_id, number)] = weight
+
+        scores = {}
+        for (smart_category_id, _), weight in matched.items():
+            category_type = self.categories[smart_category_id][1]
+            if kind is None or category_type in (None, kind):
+                scores[smart_category_id] = scores.get(smart_category_id, 0.0) + weight
+        return scores
+
+    def classify(self, description, kind=None):
+        """
+        Best smart category for a description, or None. Confidence is the winner's
+        weight (capped at 1) times its share of all matched weight, so a single weak
+        rule or a tie between categories lowers it; below the smart category's
+        confidence_minimum nothing is assigned.
+        """
+        if not description or not isinstance(description, str):
+            return None
+        scores = self.scores(description, kind)
+        if not scores:
+            return None
+        smart_category_id, score = max(scores.items(), key=lambda item: (item[1], -item[0]))
+        confidence = min(score, 1.0) * score / sum(scores.values())
+        category_id, _, confidence_minimum = self.categories[smart_category_id]
+        if confidence < confidence_minimum:
+            return None
+        return Classification(smart_category_id, category_id, round(confidence, 3))
+
+_matcher = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+def _fingerprint():
+    return tuple(db.session.query(
+        func.count(SmartCategory.id),
+        func.max(SmartCategory.id),
+        func.max(func.coalesce(SmartCategory.updated_at, SmartCategory.created_at))
+    ).one())
+
+def _build_matcher(fingerprint):
+    rows = db.session.query(
+        SmartCategory.id,
+        SmartCategory.parent_category_id,
+        Category.type,
+        SmartCategory.rules_set,
+        SmartCategory.confidence_minimum
+    ).outerjoin(Category, Category.id == SmartCategory.parent_category_id).order_by(SmartCategory.id)
+    return CategoryMatcher(rows, fingerprint)
+
+def get_matcher():
+    """
+    The compiled matcher for the current smart categories. It is rebuilt only when
+    they change: at once after a write through this process, and within
+    MATCHER_RECHECK_SECONDS after one made by another process.
+    """
+    global _matcher, _checked_at
+    now = time.monotonic()
+    matcher = _matcher
+    if matcher is not None and now - _checked_at < MATCHER_RECHECK_SECONDS:
+        return matcher
+    with _lock:
+        fingerprint = _fingerprint()
+        if _matcher is None or _matcher.fingerprint != fingerprint:
+            _matcher = _build_matcher(fingerprint)
+        _checked_at = now
+        return _matcher
+
+def invalidate_matcher():
+    global _matcher
+    _matcher = None
+
+def classify_description(description, kind=None):
+    return get_matcher().classify(description, kind)
+
+def recategorize_transactions(wallet_id=None, batch_size=RECATEGORIZE_BATCH_SIZE, dry_run=False):
+    """
+    Re-runs classification over existing transactions and moves those whose
+    confident category differs. Transactions are read in keyset batches and each
+    batch is written with one executemany, with balances, rollups and budgets
+    adjusted through apply_transaction_effects in the same commit.
+    """
+    matcher = get_matcher()
+    table = Transaction.__table__
+    move = update(table).where(table.c.id == bindparam('transaction_id')).values(
+        category_id=bindparam('new_category_id'), updated_at=func.now()
+    )
+    stats = {'scanned': 0, 'matched': 0, 'changed': 0}
+    last_id = 0
+    while True:
+        query = db.session.query(
+            Transaction.id, Transaction.description, *[getattr(Transaction, field) for field in EFFECT_FIELDS]
+        ).filter(Transaction.id > last_id, Transaction.description.isnot(None))
+        if wallet_id is not None:
+            query = query.filter(Transaction.wallet_id == wallet_id)
+        transactions = query.order_by(Transaction.id).limit(batch_size).all()
+        if not transactions:
+            break
+        last_id = transactions[-1].id
+        stats['scanned'] += len(transactions)
+
+        changes = []
+        removed = []
+        added = []
+        for transaction in transactions:
+            match = matcher.classify(transaction.description, transaction.type)
+            if match is None:
+                continue
+            stats['matched'] += 1
+            if match.category_id == transaction.category_id:
+                continue
+            before = transaction_snapshot(transaction)
+            changes.append({'transaction_id': transaction.id, 'new_category_id': match.category_id})
+            removed.append(before)
+            added.append(dict(before, category_id=match.category_id))
+        stats['changed'] += len(changes)
+
+        if changes and not dry_run:
+            db.session.execute(move, changes)
+            apply_transaction_effects(added=added, removed=removed)
+            invalidate_on_commit(Transaction, *[change['transaction_id'] for change in changes])
+            db.session.commit()
+    return stats
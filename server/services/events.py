@@ -0,0 +1,299 @@
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, insert, or_
+from sqlalchemy.orm import Session
+from server.models import db, ActivityEvent
+from server.utils.authorization import load_wallet_permissions
+
+EVENT_POLL_BATCH_SIZE = 1000
+# How long the publisher keeps looking for an id it skipped. Ids are handed out
+# before commit, so a slow transaction can make a lower id visible after a higher one.
+EVENT_GAP_SECONDS = 10
+MAX_TRACKED_GAP = 1000
+
+def record_events(events):
+    """
+    Appends events to the activity log in the current database transaction, so they
+    become visible exactly when the write they describe commits, and are dropped
+    with it on rollback. Each event is a dict with event_type, payload and
+    optionally user_id and wallet_id.
+    """
+    if not events:
+        return
+    db.session.execute(insert(ActivityEvent), [
+        {
+            'event_type': row['event_type'],
+            'payload': row.get('payload'),
+            'user_id': row.get('user_id'),
+            'wallet_id': row.get('wallet_id')
+        }
+        for row in events
+    ])
+    db.session.info['activity_recorded'] = True
+
+def record_event(event_type, payload, user_id=None, wallet_id=None):
+    record_events([{'event_type': event_type, 'payload': payload, 'user_id': user_id, 'wallet_id': wallet_id}])
+
+def transaction_events(added=(), removed=()):
+    """
+    One 'transactions' event per wallet a write touched, with how many rows were
+    added and removed (an update counts as one of each) and the dates they span,
+    so a client refetches that range instead of the whole wallet. Bulk writes
+    produce one event per wallet, not one per row.
+    """
+    wallets = {}
+    for key, rows in (('added', added), ('removed', removed)):
+        for row in rows:
+            summary = wallets.setdefault(row['wallet_id'], {'added': 0, 'removed': 0, 'dates': []})
+            summary[key] += 1
+            summary['dates'].append(row['date'])
+    return [
+        {
+            'event_type': 'transactions',
+            'wallet_id': wallet_id,
+            'payload': {
+                'wallet_id': wallet_id,
+                'added': summary['added'],
+                'removed': summary['removed'],
+                'from_date': min(summary['dates']).isoformat(),
+                'to_date': max(summary['dates']).isoformat()
+            }
+        }
+        for wallet_id, summary in sorted(wallets.items())
+    ]
+
+def notification_events(notifications):
+    """'notification' events for inserted notification rows (dicts including their id)."""
+    return [
+        {
+            'event_type': 'notification',
+            'user_id': notification['user_id'],
+            'payload': {
+                key: notification.get(key)
+                for key in ('id', 'user_id', 'type', 'title', 'message', 'is_read')
+            }
+        }
+        for notification in notifications
+    ]
+
+def accessible_wallet_ids(user_id):
+    """Ids of the wallets a user owns or collaborates on, read fresh rather than cached."""
+    return set(load_wallet_permissions(user_id))
+
+def _audience(user_id, wallet_ids):
+    criteria = [ActivityEvent.user_id == user_id]
+    if wallet_ids:
+        criteria.append(ActivityEvent.wallet_id.in_(wallet_ids))
+    return or_(*criteria)
+
+def _event_dict(row):
+    return {
+        'id': row.id,
+        'event_type': row.event_type,
+        'user_id': row.user_id,
+        'wallet_id': row.wallet_id,
+        'payload': row.payload,
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    }
+
+def replay_events(user_id, wallet_ids, after_id, through_id, limit):
+    """A user's events after `after_id` up to `through_id`, oldest first, at most `limit` of them."""
+    rows = ActivityEvent.query.filter(
+        ActivityEvent.id > after_id, ActivityEvent.id <= through_id, _audience(user_id, wallet_ids)
+    ).order_by(ActivityEvent.id).limit(limit)
+    return [_event_dict(row) for row in rows]
+
+def latest_event_id():
+    return db.session.query(func.max(ActivityEvent.id)).scalar() or 0
+
+def event_id_range():
+    """(lowest, highest) event id still in the log; (0, 0) when it is empty."""
+    earliest, latest = db.session.query(func.min(ActivityEvent.id), func.max(ActivityEvent.id)).one()
+    return earliest or 0, latest or 0
+
+def format_event(event):
+    """One event in text/event-stream framing."""
+    data = json.dumps(
+        dict(event['payload'] or {}, created_at=event['created_at']),
+        separators=(',', ':'),
+        default=str
+    )
+    return f"id: {event['id']}\nevent: {event['event_type']}\ndata: {data}\n\n"
+
+def prune_events(days, now=None):
+    """Deletes events older than `days`; clients further behind are told to refetch."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    deleted = ActivityEvent.query.filter(ActivityEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+class Subscription:
+    """One open event stream: the user, the wallets it may see and a bounded inbox."""
+
+    def __init__(self, user_id, wallet_ids, start_id, max_queued):
+        self.user_id = user_id
+        self.wallet_ids = set(wallet_ids)
+        self.start_id = start_id
+        self.inbox = queue.Queue(maxsize=max_queued)
+        self.closed = False
+
+    def deliver(self, event):
+        try:
+            self.inbox.put_nowait(event)
+        except queue.Full:
+            # The client is not reading; drop it and let it resume from its cursor
+            self.close()
+
+    def close(self):
+        self.closed = True
+        try:
+            self.inbox.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def get(self, timeout):
+        """The next event, None once closed; raises queue.Empty after `timeout` seconds."""
+        if self.closed:
+            return None
+        return self.inbox.get(timeout=timeout)
+
+class EventBroker:
+    """
+    Fans the activity log out to every open stream of this process.
+
+    A single background thread polls the log for rows past the last id it has seen,
+    one query per EVENT_POLL_SECONDS however many streams are open, and is woken at
+    once when a commit in this process recorded events. Each event is handed to the
+    subscriptions of its user and of its wallet's members through in-memory indexes,
+    so idle streams cost no queries at all. The thread only polls while someone is
+    subscribed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._by_user = defaultdict(set)
+        self._by_wallet = defaultdict(set)
+        self._subscriptions = set()
+        self._thread = None
+        self._generation = 0
+        self.last_id = 0
+        self._gaps = {}
+
+    def subscribe(self, app, user_id, wallet_ids):
+        """
+        Registers a stream. Events after the returned subscription's start_id reach
+        its inbox; anything up to start_id has to be replayed from the log.
+        """
+        with self._lock:
+            if not self._subscriptions:
+                # The publisher was idle; start from the current end of the log
+                self._generation += 1
+                self.last_id = latest_event_id()
+                self._gaps = {}
+            subscription = Subscription(user_id, wallet_ids, self.last_id, app.config['EVENT_QUEUE_SIZE'])
+            self._subscriptions.add(subscription)
+            self._by_user[user_id].add(subscription)
+            for wallet_id in subscription.wallet_ids:
+                self._by_wallet[wallet_id].add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name='activity-event-publisher', daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self._discard(self._by_user, subscription.user_id, subscription)
+            for wallet_id in subscription.wallet_ids:
+                self._discard(self._by_wallet, wallet_id, subscription)
+
+    def update_wallets(self, subscription, wallet_ids):
+        """Moves a stream to a new wallet set after the user's access changed."""
+        with self._lock:
+            for wallet_id in subscription.wallet_ids - set(wallet_ids):
+                self._discard(self._by_wallet, wallet_id, subscription)
+            for wallet_id in set(wallet_ids) - subscription.wallet_ids:
+                self._by_wallet[wallet_id].add(subscription)
+            subscription.wallet_ids = set(wallet_ids)
+
+    def _discard(self, index, key, subscription):
+        members = index.get(key)
+        if members is not None:
+            members.discard(subscription)
+            if not members:
+                del index[key]
+
+    def notify(self):
+        """Wakes the publisher, e.g. after a commit that recorded events."""
+        self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscriptions': len(self._subscriptions),
+                'users': len(self._by_user),
+                'wallets': len(self._by_wallet),
+                'last_event_id': self.last_id
+            }
+
+    def _run(self, app):
+        while True:
+            self._wake.wait(app.config['EVENT_POLL_SECONDS'] if self._subscriptions else None)
+            self._wake.clear()
+            if not self._subscriptions:
+                continue
+            try:
+                with app.app_context():
+                    self._poll()
+                    db.session.remove()
+            except Exception:
+                app.logger.exception("Activity event publisher failed to poll")
+                time.sleep(app.config['EVENT_POLL_SECONDS'])
+
+    def _poll(self):
+        while True:
+            with self._lock:
+                generation = self._generation
+                last_id = self.last_id
+                now = time.monotonic()
+                self._gaps = {gap: deadline for gap, deadline in self._gaps.items() if deadline > now}
+                gaps = list(self._gaps)
+            condition = ActivityEvent.id > last_id
+            if gaps:
+                condition = or_(condition, ActivityEvent.id.in_(gaps))
+            rows = ActivityEvent.query.filter(condition).order_by(ActivityEvent.id).limit(EVENT_POLL_BATCH_SIZE).all()
+            events = [_event_dict(row) for row in rows]
+            db.session.rollback()
+            with self._lock:
+                if generation != self._generation:
+                    return
+                for event in events:
+                    self._gaps.pop(event['id'], None)
+                    if event['id'] > self.last_id + 1 and event['id'] - self.last_id <= MAX_TRACKED_GAP:
+                        deadline = now + EVENT_GAP_SECONDS
+                        self._gaps.update((gap, deadline) for gap in range(self.last_id + 1, event['id']))
+                    self.last_id = max(self.last_id, event['id'])
+                    audience = self._by_user.get(event['user_id'], set()) | self._by_wallet.get(event['wallet_id'], set())
+                    for subscription in audience:
+                        subscription.deliver(event)
+            if len(rows) < EVENT_POLL_BATCH_SIZE:
+                return
+
+event_broker = EventBroker()
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed(session):
+    if session.info.pop('activity_recorded', False):
+        event_broker.notify()
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_recorded(session):
+    session.info.pop('activity_recorded', None)
@@ -0,0 +1,261 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from sqlalchemy import bindparam, func, insert, update
+from server.models import db, FinancialForecast, Transaction, Wallet
+from server.utils.cache import invalidate_on_commit
+from server.utils.dialects import day_expression
+
+FORECAST_TYPES = ('spending', 'income', 'savings')
+TIME_RANGES = {'weekly': 7, 'monthly': 30, 'quarterly': 91, 'yearly': 365}
+HISTORY_DAYS = 365
+FORECAST_BATCH_SIZE = 500
+MODEL_VERSION = 'lstsq-trend-dow-1'
+Z_95 = 1.96
+
+def daily_series(wallet_ids, start, days):
+    """
+    Income and expense per wallet and day as two (wallets x days) arrays, from one
+    grouped query over the (wallet_id, date) index. Days without transactions are 0.
+    """
+    day = day_expression(Transaction.date)
+    rows = db.session.query(
+        Transaction.wallet_id, day, Transaction.type, func.sum(Transaction.amount)
+    ).filter(
+        Transaction.wallet_id.in_(wallet_ids),
+        Transaction.date >= start,
+        Transaction.date < start + timedelta(days=days)
+    ).group_by(Transaction.wallet_id, day, Transaction.type).all()
+
+    income = np.zeros((len(wallet_ids), days))
+    expense = np.zeros((len(wallet_ids), days))
+    if rows:
+        position = {wallet_id: index for index, wallet_id in enumerate(wallet_ids)}
+        wallets = np.fromiter((position[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+        offsets = np.fromiter(((row[1] - start.date()).days for row in rows), dtype=np.intp, count=len(rows))
+        amounts = np.fromiter((float(row[3]) for row in rows), dtype=float, count=len(rows))
+        is_income = np.fromiter((row[2] == 'income' for row in rows), dtype=bool, count=len(rows))
+        np.add.at(income, (wallets[is_income], offsets[is_income]), amounts[is_income])
+        np.add.at(expense, (wallets[~is_income], offsets[~is_income]), amounts[~is_income])
+    return income, expense
+
+def design_matrix(start_day, days, first_weekday):
+    """Intercept, linear trend (per year) and six day-of-week dummies, Monday as base."""
+    t = np.arange(start_day, start_day + days)
+    weekday = (first_weekday + t) % 7
+    X = np.zeros((days, 8))
+    X[:, 0] = 1.0
+    X[:, 1] = t / 365.0
+    X[np.arange(days), weekday + 1] = weekday > 0
+    return X
+
+def fit(Y, first_weekday):
+    """
+    Least squares for every wallet at once: Y is (days x wallets), so a single lstsq
+    call returns the coefficients of all columns. Returns (coefficients, residual std).
+    """
+    X = design_matrix(0, Y.shape[0], first_weekday)
+    coefficients = np.linalg.lstsq(X, Y, rcond=None)[0]
+    residuals = Y - X @ coefficients
+    dof = max(Y.shape[0] - X.shape[1], 1)
+    return coefficients, np.sqrt((residuals ** 2).sum(axis=0) / dof)
+
+def predict(coefficients, start_day, days, first_weekday, floor=None):
+    predictions = design_matrix(start_day, days, first_weekday) @ coefficients
+    return np.maximum(predictions, floor) if floor is not None else predictions
+
+def backtest(Y, horizon, first_weekday, floor=None):
+    """
+    Refits without the last `horizon` days and scores the prediction for them.
+    Returns per-wallet MAE, RMSE, WAPE and the error on the period total.
+    """
+    horizon = min(horizon, Y.shape[0] // 4)
+    coefficients, _ = fit(Y[:-horizon], first_weekday)
+    predicted = predict(coefficients, Y.shape[0] - horizon, horizon, first_weekday, floor)
+    actual = Y[-horizon:]
+    errors = predicted - actual
+    absolute_actual = np.abs(actual).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wape = np.where(absolute_actual > 0, np.abs(errors).sum(axis=0) / absolute_actual, np.nan)
+    return {
+        'backtest_days': horizon,
+        'mae': np.abs(errors).mean(axis=0),
+        'rmse': np.sqrt((errors ** 2).mean(axis=0)),
+        'wape': wape,
+        'total_error': errors.sum(axis=0)
+    }
+
+def _round(value):
+    value = float(value)
+    return None if np.isnan(value) else round(value, 2)
+
+def forecast_wallets(wallet_ids, forecast_types=FORECAST_TYPES, time_ranges=tuple(TIME_RANGES), now=None):
+    """
+    Forecasts for every wallet x forecast_type x time_range in one pass. History is one
+    query for the whole batch; each forecast type is one model fit across all wallets,
+    shared by every time range, plus one backtest fit per time range.
+    """
+    now = now or datetime.utcnow()
+    today = datetime(now.year, now.month, now.day)
+    start = today - timedelta(days=HISTORY_DAYS)
+    income, expense = daily_series(wallet_ids, start, HISTORY_DAYS)
+    series = {'spending': expense, 'income': income, 'savings': income - expense}
+    first_weekday = start.weekday()
+    longest = max(TIME_RANGES[time_range] for time_range in time_ranges)
+
+    results = []
+    for forecast_type in forecast_types:
+        Y = series[forecast_type].T
+        # Spending and income cannot go negative; savings can
+        floor = None if forecast_type == 'savings' else 0.0
+        coefficients, sigma = fit(Y, first_weekday)
+        future = predict(coefficients, HISTORY_DAYS, longest, first_weekday, floor)
+        for time_range in time_ranges:
+            horizon = TIME_RANGES[time_range]
+            daily = future[:horizon]
+            totals = daily.sum(axis=0)
+            spread = Z_95 * sigma * np.sqrt(horizon)
+            lower = totals - spread if floor is None else np.maximum(totals - spread, floor)
+            metrics = backtest(Y, horizon, first_weekday, floor)
+            for index, wallet_id in enumerate(wallet_ids):
+                results.append({
+                    'wallet_id': wallet_id,
+                    'forecast_type': forecast_type,
+                    'time_range': time_range,
+                    'prediction_data': {
+                        'start': today.date().isoformat(),
+                        'horizon_days': horizon,
+                        'total': _round(totals[index]),
+                        'daily': [round(float(value), 2) for value in daily[:, index]],
+                        'trend_per_year': _round(coefficients[1, index])
+                    },
+                    'confidence_interval': {
+                        'level': 0.95,
+                        'lower': _round(lower[index]),
+                        'upper': _round(totals[index] + spread[index]),
+                        'daily_std': _round(sigma[index])
+                    },
+                    'accuracy_metrics': {
+                        key: value if key == 'backtest_days' else _round(value[index])
+                        for key, value in metrics.items()
+                    }
+                })
+    return results
+
+def save_forecasts(results, now=None):
+    """
+    Writes forecasts over the existing rows for the same wallet, forecast_type and
+    time_range, inserting the rest. Both are a single executemany. Returns the ids
+    of the rows written.
+    """
+    if not results:
+        return []
+    now = now or datetime.utcnow()
+    valid_until = now + timedelta(hours=current_app.config['FORECAST_TTL_HOURS'])
+    wallet_ids = sorted({result['wallet_id'] for result in results})
+    owners = dict(db.session.query(Wallet.id, Wallet.owner_id).filter(Wallet.id.in_(wallet_ids)))
+    existing = defaultdict(list)
+    for forecast_id, wallet_id, forecast_type, time_range in db.session.query(
+        FinancialForecast.id,
+        FinancialForecast.wallet_id,
+        FinancialForecast.forecast_type,
+        FinancialForecast.time_range
+    ).filter(FinancialForecast.wallet_id.in_(wallet_ids)):
+        existing[(wallet_id, forecast_type, time_range)].append(forecast_id)
+
+    updates = []
+    inserts = []
+    for result in results:
+        values = dict(result, model_version=MODEL_VERSION, valid_until=valid_until, updated_at=now)
+        forecast_ids = existing.get((result['wallet_id'], result['forecast_type'], result['time_range']))
+        if not forecast_ids:
+            values['user_id'] = owners[result['wallet_id']]
+            inserts.append(values)
+        # Duplicates created through the API are all overwritten, so none stays stale
+        updates.extend(dict(values, forecast_id=forecast_id) for forecast_id in forecast_ids or ())
+
+    table = FinancialForecast.__table__
+    ids = []
+    if updates:
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('forecast_id')).values(
+                **{key: bindparam(key) for key in updates[0] if key not in ('forecast_id', 'wallet_id', 'forecast_type', 'time_range')}
+            ),
+            updates
+        )
+        ids.extend(values['forecast_id'] for values in updates)
+        invalidate_on_commit(FinancialForecast, *ids)
+    if inserts:
+        ids.extend(db.session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), inserts
+        ).scalars())
+    return ids
+
+def refresh_forecasts(wallet_ids=None, batch_size=FORECAST_BATCH_SIZE):
+    """Nightly batch: forecasts every wallet (or the given ones) in keyset batches."""
+    last_id = 0
+    refreshed = 0
+    while True:
+        query = db.session.query(Wallet.id).filter(Wallet.id > last_id)
+        if wallet_ids is not None:
+            query = query.filter(Wallet.id.in_(wallet_ids))
+        batch = [wallet_id for wallet_id, in query.order_by(Wallet.id).limit(batch_size)]
+        if not batch:
+            break
+        last_id = batch[-1]
+        save_forecasts(forecast_wallets(batch))
+        db.session.commit()
+        refreshed += len(batch)
+    return refreshed
+
+def expire_forecasts(wallet_ids, now=None):
+    """
+    Marks the engine's still-valid forecasts of the given wallets as expired, so the
+    next read recomputes them. Called from the transaction write path.
+    """
+    if not wallet_ids:
+        return
+    now = now or datetime.utcnow()
+    table = FinancialForecast.__table__
+    expired = db.session.execute(
+        update(table).where(
+            table.c.wallet_id.in_(sorted(wallet_ids)),
+            table.c.model_version == MODEL_VERSION,
+            table.c.valid_until > now
+        ).values(valid_until=now, updated_at=now).returning(table.c.id)
+    ).scalars().all()
+    invalidate_on_commit(FinancialForecast, *expired)
+
+def refresh_expired_forecasts(*criteria, batch_size=FORECAST_BATCH_SIZE, max_wallets=None):
+    """
+    Recomputes the engine's forecasts matching `criteria` whose valid_until has passed,
+    and commits them. While every matching forecast is valid this is one indexed query
+    and nothing is fitted. With max_wallets only that many wallets, lowest ids first,
+    are refitted. Returns the number of wallets refreshed.
+    """
+    now = datetime.utcnow()
+    stale = set(db.session.query(
+        FinancialForecast.wallet_id, FinancialForecast.forecast_type, FinancialForecast.time_range
+    ).filter(
+        FinancialForecast.model_version == MODEL_VERSION,
+        FinancialForecast.valid_until <= now,
+        FinancialForecast.forecast_type.in_(FORECAST_TYPES),
+        FinancialForecast.time_range.in_(tuple(TIME_RANGES)),
+        *criteria
+    ).distinct())
+    if not stale:
+        return 0
+
+    wallet_ids = sorted({wallet_id for wallet_id, _, _ in stale})[:max_wallets]
+    stale = {key for key in stale if key[0] in wallet_ids}
+    forecast_types = [value for value in FORECAST_TYPES if any(key[1] == value for key in stale)]
+    time_ranges = [value for value in TIME_RANGES if any(key[2] == value for key in stale)]
+    for start in range(0, len(wallet_ids), batch_size):
+        results = forecast_wallets(wallet_ids[start:start + batch_size], forecast_types, time_ranges, now)
+        save_forecasts([
+            result for result in results
+            if (result['wallet_id'], result['forecast_type'], result['time_range']) in stale
+        ], now)
+    db.session.commit()
+    return len(wallet_ids)
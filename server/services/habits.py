@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import func, tuple_
+from server.models import db, SpendingPattern, Transaction, User
+from server.utils.cache import invalidate_on_commit
+from server.utils.dialects import day_expression, upsert_insert
+
+HABIT_BATCH_SIZE = 2000
+HABIT_HISTORY_DAYS = 182
+HABIT_MIN_OCCURRENCES = 4
+HABIT_MIN_SCORE = 0.4
+# Candidate periods, shortest first, with the lags that count as a repeat. Shopping
+# days drift by a day and months differ in length, so each period is a lag window.
+HABIT_PERIODS = (
+    ('weekly', 7, (6, 8)),
+    ('biweekly', 14, (13, 15)),
+    ('monthly', 30, (28, 31)),
+)
+
+def habit_key(category_id):
+    return f"category:{category_id}"
+
+def spending_series(user_ids, start, days):
+    """
+    One row per (user, category) with expenses in the window: the keys, a
+    (series x days) array of how many expenses fell on each day, and per-row totals
+    and last spending day. Read with one grouped query for the whole user batch.
+    """
+    day = day_expression(Transaction.date)
+    rows = db.session.query(
+        Transaction.created_by,
+        Transaction.category_id,
+        day,
+        func.count(Transaction.id),
+        func.sum(Transaction.amount)
+    ).filter(
+        Transaction.created_by.in_(user_ids),
+        Transaction.type == 'expense',
+        Transaction.category_id.isnot(None),
+        Transaction.date >= start,
+        Transaction.date < start + timedelta(days=days)
+    ).group_by(Transaction.created_by, Transaction.category_id, day).all()
+
+    keys = sorted({(row[0], row[1]) for row in rows})
+    position = {key: index for index, key in enumerate(keys)}
+    counts = np.zeros((len(keys), days))
+    totals = np.zeros(len(keys))
+    if rows:
+        series = np.fromiter((position[(row[0], row[1])] for row in rows), dtype=np.intp, count=len(rows))
+        offsets = np.fromiter(((row[2] - start.date()).days for row in rows), dtype=np.intp, count=len(rows))
+        np.add.at(counts, (series, offsets), np.fromiter((row[3] for row in rows), dtype=float, count=len(rows)))
+        np.add.at(totals, series, np.fromiter((float(row[4]) for row in rows), dtype=float, count=len(rows)))
+    return keys, counts, totals
+
+def autocorrelation(series):
+    """
+    Normalized autocorrelation of every row at every lag, computed with one FFT over
+    the whole (series x days) array. Zero padding to twice the length keeps the
+    correlation linear instead of circular.
+    """
+    centered = series - series.mean(axis=1, keepdims=True)
+    size = 1 << int(2 * series.shape[1] - 1).bit_length()
+    spectrum = np.fft.rfft(centered, n=size, axis=1)
+    correlation = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=1)[:, :series.shape[1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(correlation / correlation[:, :1])
+
+def detect_periods(series):
+    """
+    Strongest repeating period of every row. Returns (period index into HABIT_PERIODS
+    or -1, score). The shortest period above HABIT_MIN_SCORE wins, since a weekly
+    habit also repeats at every multiple of a week.
+    """
+    occurred = (series > 0).astype(float)
+    acf = np.clip(autocorrelation(occurred), 0, None)
+    scores = np.stack([acf[:, low:high + 1].sum(axis=1) for _, _, (low, high) in HABIT_PERIODS], axis=1)
+    passing = scores >= HABIT_MIN_SCORE
+    periods = np.where(passing.any(axis=1), passing.argmax(axis=1), -1)
+    best = scores[np.arange(len(series)), np.maximum(periods, 0)]
+    return periods, np.where(periods >= 0, np.minimum(best, 1.0), 0.0)
+
+def _habit_rows(keys, counts, totals, start, periods, scores, params):
+    occurrences = counts.sum(axis=1)
+    days = counts.shape[1]
+    last_day = days - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+    habits = []
+    for index in np.flatnonzero((periods >= 0) & (occurrences >= HABIT_MIN_OCCURRENCES)):
+        user_id, category_id = keys[index]
+        name, period_days, _ = HABIT_PERIODS[periods[index]]
+        last_date = start + timedelta(days=int(last_day[index]))
+        habits.append({
+            'user_id': user_id,
+            'pattern_type': 'habit',
+            'pattern_key': habit_key(category_id),
+            'pattern_data': {
+                'category_id': category_id,
+                'period': name,
+                'period_days': period_days,
+                'occurrences': int(occurrences[index]),
+                'average_amount': round(float(totals[index] / occurrences[index]), 2),
+                'total_amount': round(float(totals[index]), 2),
+                'last_date': last_date.date().isoformat(),
+                'next_expected_date': (last_date + timedelta(days=period_days)).date().isoformat()
+            },
+            'significance_score': round(float(scores[index]), 3),
+            'recognition_params': params
+        })
+    return habits
+
+def detect_habits(days=HABIT_HISTORY_DAYS, batch_size=HABIT_BATCH_SIZE, now=None):
+    """
+    Finds recurring spending (weekly groceries, monthly subscriptions, ...) for every
+    user and category and keeps one habit SpendingPattern per pair up to date.
+
+    Users are processed in keyset batches: one grouped query builds the daily series
+    of the batch, one FFT finds the periodicity of all of them, and the habits are
+    upserted on (user_id, pattern_type, pattern_key) in one statement. Habits of the
+    batch that are no longer detected are removed.
+    """
+    now = now or datetime.utcnow()
+    start = datetime(now.year, now.month, now.day) - timedelta(days=days)
+    params = {
+        'method': 'fft_autocorrelation',
+        'history_days': days,
+        'min_occurrences': HABIT_MIN_OCCURRENCES,
+        'min_score': HABIT_MIN_SCORE
+    }
+    statement = upsert_insert(SpendingPattern.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['user_id', 'pattern_type', 'pattern_key'],
+        set_={
+            'pattern_data': statement.excluded.pattern_data,
+            'significance_score': statement.excluded.significance_score,
+            'recognition_params': statement.excluded.recognition_params,
+            'updated_at': func.now()
+        }
+    ).returning(SpendingPattern.id)
+
+    stats = {'users': 0, 'series': 0, 'habits': 0, 'removed': 0}
+    last_id = 0
+    while True:
+        user_ids = [user_id for user_id, in db.session.query(User.id).filter(
+            User.id > last_id
+        ).order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        keys, counts, totals = spending_series(user_ids, start, days)
+        habits = []
+        if keys:
+            periods, scores = detect_periods(counts)
+            habits = _habit_rows(keys, counts, totals, start, periods, scores, params)
+        if habits:
+            invalidate_on_commit(SpendingPattern, *db.session.execute(statement, habits).scalars())
+
+        detected = [(habit['user_id'], habit['pattern_key']) for habit in habits]
+        stale = db.session.query(SpendingPattern.id).filter(
+            SpendingPattern.user_id.in_(user_ids),
+            SpendingPattern.pattern_type == 'habit',
+            SpendingPattern.pattern_key.isnot(None)
+        )
+        if detected:
+            stale = stale.filter(tuple_(SpendingPattern.user_id, SpendingPattern.pattern_key).notin_(detected))
+        stale_ids = [pattern_id for pattern_id, in stale]
+        if stale_ids:
+            SpendingPattern.query.filter(SpendingPattern.id.in_(stale_ids)).delete(synchronize_session=False)
+            invalidate_on_commit(SpendingPattern, *stale_ids)
+        db.session.commit()
+
+        stats['users'] += len(user_ids)
+        stats['series'] += len(keys)
+        stats['habits'] += len(habits)
+        stats['removed'] += len(stale_ids)
+    return stats
@@ -0,0 +1,49 @@
+from datetime import datetime
+from sqlalchemy import and_, case, func, select, update
+from server.models import db, WalletInvitation
+from server.utils.cache import invalidate_on_commit
+
+INVITATION_SWEEP_BATCH_SIZE = 1000
+
+def _expired(now):
+    # status = 'pending' AND expires_at <= now: a range scan of ix_wallet_invitations_status_expires_at
+    return and_(WalletInvitation.status == 'pending', WalletInvitation.expires_at <= now)
+
+def effective_status(now=None):
+    """
+    SQL expression for an invitation's status as clients should see it: pending
+    invitations past expires_at read as expired even before the sweeper has run.
+    """
+    return case((_expired(now or datetime.utcnow()), 'expired'), else_=WalletInvitation.status)
+
+def has_unswept_expiries(now=None):
+    """True when some pending invitation is past expires_at; one index probe."""
+    return db.session.query(
+        select(WalletInvitation.id).where(_expired(now or datetime.utcnow())).exists()
+    ).scalar()
+
+def expire_invitations(batch_size=INVITATION_SWEEP_BATCH_SIZE, now=None):
+    """
+    Marks pending invitations past expires_at as expired.
+
+    Each batch is a single UPDATE whose id subquery walks the (status, expires_at)
+    index for at most `batch_size` due rows, so the table is never scanned and row
+    locks stay short; every batch commits on its own. Returns how many were expired.
+    """
+    now = now or datetime.utcnow()
+    table = WalletInvitation.__table__
+    due = select(table.c.id).where(
+        table.c.status == 'pending', table.c.expires_at <= now
+    ).order_by(table.c.expires_at).limit(batch_size).scalar_subquery()
+    statement = update(table).where(
+        table.c.id.in_(due), table.c.status == 'pending'
+    ).values(status='expired', updated_at=func.now()).returning(table.c.id)
+
+    expired = 0
+    while True:
+        ids = db.session.execute(statement).scalars().all()
+        invalidate_on_commit(WalletInvitation, *ids)
+        db.session.commit()
+        expired += len(ids)
+        if len(ids) < batch_size:
+            return expired
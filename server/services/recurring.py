@@ -0,0 +1,140 @@
+import calendar
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, func, select, update
+from server.models import db, Transaction
+from server.services.transaction_effects import EFFECT_FIELDS, apply_transaction_effects
+from server.utils.dialects import upsert_insert
+
+RECURRING_BATCH_SIZE = 1000
+# Per template and run; the high-water mark lets the next run carry on from there
+MAX_OCCURRENCES_PER_RUN = 366
+FIXED_INTERVALS = {'daily': timedelta(days=1), 'weekly': timedelta(weeks=1)}
+MONTH_INTERVALS = {'monthly': 1, 'quarterly': 3, 'yearly': 12}
+
+def add_months(value, months):
+    """Same day `months` later, clamped to the end of shorter months."""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+def occurrence_dates(start, interval, after, until, limit=MAX_OCCURRENCES_PER_RUN):
+    """
+    Occurrences of a template first dated `start` that fall in (after, until], at most
+    `limit` of them. Each one is computed from `start` rather than from the previous
+    occurrence, so the 31st of a month does not drift to the 28th after February.
+    Returns None for an interval that is not understood.
+    """
+    if interval in FIXED_INTERVALS:
+        step = FIXED_INTERVALS[interval]
+        nth = lambda k: start + step * k
+        k = max((after - start) // step, 1)
+    elif interval in MONTH_INTERVALS:
+        months = MONTH_INTERVALS[interval]
+        nth = lambda k: add_months(start, months * k)
+        k = max(((after.year - start.year) * 12 + after.month - start.month) // months, 1)
+    else:
+        return None
+    dates = []
+    while len(dates) < limit:
+        date = nth(k)
+        if date > until:
+            break
+        if date > after:
+            dates.append(date)
+        k += 1
+    return dates
+
+def _template_batch(last_id, until, batch_size):
+    # Plain column tuples rather than ORM objects: nothing accumulates between batches
+    return db.session.execute(
+        select(
+            Transaction.id,
+            Transaction.wallet_id,
+            Transaction.category_id,
+            Transaction.amount,
+            Transaction.type,
+            Transaction.description,
+            Transaction.date,
+            Transaction.recurring_interval,
+            Transaction.recurring_generated_until,
+            Transaction.created_by
+        )
+        .where(
+            Transaction.is_recurring == db.true(),
+            Transaction.id > last_id,
+            func.coalesce(Transaction.recurring_generated_until, Transaction.date) < until
+        )
+        .order_by(Transaction.id)
+        .limit(batch_size)
+    ).all()
+
+def materialize_recurring(until=None, batch_size=RECURRING_BATCH_SIZE):
+    """
+    Expands recurring templates into concrete transactions up to `until`.
+
+    Templates are read in keyset batches of `batch_size` over the partial index on
+    recurring rows, skipping any whose high-water mark (recurring_generated_until)
+    already reaches the horizon. Each batch inserts its occurrences in one statement
+    and moves the marks forward in the same commit. The insert also ignores conflicts
+    on (recurring_template_id, date), so a rerun never duplicates an occurrence.
+    """
+    if until is None:
+        until = datetime.utcnow() + timedelta(days=current_app.config['RECURRING_HORIZON_DAYS'])
+    table = Transaction.__table__
+    insert_occurrences = (
+        upsert_insert(table)
+        .on_conflict_do_nothing(index_elements=['recurring_template_id', 'date'])
+        .returning(*[table.c[field] for field in EFFECT_FIELDS])
+    )
+    move_marks = (
+        update(table)
+        .where(table.c.id == bindparam('template_id'))
+        .values(recurring_generated_until=bindparam('generated_until'))
+    )
+
+    stats = {'templates': 0, 'created': 0, 'unknown_interval': 0}
+    last_id = 0
+    while True:
+        templates = _template_batch(last_id, until, batch_size)
+        if not templates:
+            break
+        last_id = templates[-1].id
+        stats['templates'] += len(templates)
+
+        occurrences = []
+        marks = []
+        for template in templates:
+            after = template.recurring_generated_until or template.date
+            dates = occurrence_dates(template.date, template.recurring_interval, after, until)
+            if dates is None:
+                stats['unknown_interval'] += 1
+                dates = []
+            occurrences.extend(
+                {
+                    'wallet_id': template.wallet_id,
+                    'category_id': template.category_id,
+                    'amount': template.amount,
+                    'type': template.type,
+                    'description': template.description,
+                    'date': date,
+                    'is_recurring': False,
+                    'recurring_interval': None,
+                    'recurring_template_id': template.id,
+                    'created_by': template.created_by
+                }
+                for date in dates
+            )
+            # A template cut off at the per-run limit resumes from its last occurrence;
+            # otherwise everything up to the horizon has been generated
+            generated_until = dates[-1] if len(dates) == MAX_OCCURRENCES_PER_RUN else until
+            marks.append({'template_id': template.id, 'generated_until': generated_until})
+
+        if occurrences:
+            created = db.session.execute(insert_occurrences, occurrences).mappings().all()
+            apply_transaction_effects(added=[dict(row) for row in created])
+            stats['created'] += len(created)
+        db.session.execute(move_marks, marks)
+        db.session.commit()
+    return stats
@@ -0,0 +1,163 @@
+from datetime import date, datetime, time
+from sqlalchemy import Date, case, cast, delete, func, insert, select
+from server.models import db, Transaction, WalletMonthlyRollup
+from server.utils.dialects import dialect_name, upsert_insert
+
+ROLLUP_KEY = ('wallet_id', 'category_id', 'type', 'month')
+
+def month_start(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+def next_month(month):
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+def month_expression(dialect=None):
+    """Truncates Transaction.date to the first of its month in SQL."""
+    dialect = dialect or dialect_name()
+    if dialect == 'postgresql':
+        return cast(func.date_trunc('month', Transaction.date), Date)
+    # SQLite stores Date columns as ISO text
+    return func.strftime('%Y-%m-01', Transaction.date)
+
+def _bucket(row):
+    return (row['wallet_id'], row['category_id'], row['type'], month_start(row['date']))
+
+def _upsert(rows, accumulate):
+    """
+    INSERT ... ON CONFLICT DO UPDATE for a list of bucket rows. With accumulate the
+    values are added to the stored bucket; otherwise they replace it.
+    """
+    table = WalletMonthlyRollup.__table__
+    statement = upsert_insert(table)
+    excluded = statement.excluded
+    if accumulate:
+        values = {
+            'total': table.c.total + excluded.total,
+            'count': table.c.count + excluded.count,
+            'min_amount': case(
+                (excluded.min_amount < table.c.min_amount, excluded.min_amount),
+                else_=table.c.min_amount
+            ),
+            'max_amount': case(
+                (excluded.max_amount > table.c.max_amount, excluded.max_amount),
+                else_=table.c.max_amount
+            ),
+        }
+    else:
+        values = {key: excluded[key] for key in ('total', 'count', 'min_amount', 'max_amount')}
+    values['updated_at'] = func.now()
+    statement = statement.on_conflict_do_update(index_elements=list(ROLLUP_KEY), set_=values)
+    db.session.execute(statement, rows)
+
+def _recompute(buckets):
+    """Rebuilds buckets from their transactions; a bucket left without any is deleted."""
+    table = WalletMonthlyRollup.__table__
+    rows = []
+    for wallet_id, category_id, type_, month in buckets:
+        total, count, min_amount, max_amount = db.session.execute(
+            select(
+                func.coalesce(func.sum(Transaction.amount), 0),
+                func.count(Transaction.id),
+                func.min(Transaction.amount),
+                func.max(Transaction.amount)
+            ).where(
+                Transaction.wallet_id == wallet_id,
+                Transaction.category_id == category_id,
+                Transaction.type == type_,
+                Transaction.date >= datetime.combine(month, time.min),
+                Transaction.date < datetime.combine(next_month(month), time.min)
+            )
+        ).one()
+        if count:
+            rows.append({
+                'wallet_id': wallet_id, 'category_id': category_id, 'type': type_, 'month': month,
+                'total': total, 'count': count, 'min_amount': min_amount, 'max_amount': max_amount
+            })
+        else:
+            db.session.execute(delete(table).where(
+                table.c.wallet_id == wallet_id,
+                table.c.category_id == category_id,
+                table.c.type == type_,
+                table.c.month == month
+            ))
+    if rows:
+        _upsert(rows, accumulate=False)
+
+def apply_rollup_changes(added=(), removed=()):
+    """
+    Folds transaction changes into the monthly rollups.
+
+    Additions are summed per bucket in memory and upserted as deltas in one statement.
+    A removal cannot be subtracted from min/max, so every bucket that lost a row is
+    recomputed from its transactions instead; that is one indexed range query on
+    (wallet_id, date) per bucket, normally one or two per write.
+    """
+    removed_buckets = {_bucket(row) for row in removed}
+    deltas = {}
+    for row in added:
+        key = _bucket(row)
+        if key in removed_buckets:
+            continue
+        amount = row['amount']
+        bucket = deltas.get(key)
+        if bucket is None:
+            deltas[key] = {'total': amount, 'count': 1, 'min_amount': amount, 'max_amount': amount}
+        else:
+            bucket['total'] += amount
+            bucket['count'] += 1
+            bucket['min_amount'] = min(bucket['min_amount'], amount)
+            bucket['max_amount'] = max(bucket['max_amount'], amount)
+    if deltas:
+        # Sorted so concurrent writers lock rollup rows in the same order
+        _upsert([dict(zip(ROLLUP_KEY, key), **values) for key, values in sorted(deltas.items())], accumulate=True)
+    if removed_buckets:
+        _recompute(sorted(removed_buckets))
+
+def backfill_rollups(wallet_id=None):
+    """Rebuilds the rollups (for one wallet or all of them) with one INSERT ... SELECT."""
+    table = WalletMonthlyRollup.__table__
+    clear = delete(table)
+    source = select(
+        Transaction.wallet_id,
+        Transaction.category_id,
+        Transaction.type,
+        month_expression().label('month'),
+        func.sum(Transaction.amount),
+        func.count(Transaction.id),
+        func.min(Transaction.amount),
+        func.max(Transaction.amount)
+    ).group_by(Transaction.wallet_id, Transaction.category_id, Transaction.type, month_expression())
+    if wallet_id is not None:
+        clear = clear.where(table.c.wallet_id == wallet_id)
+        source = source.where(Transaction.wallet_id == wallet_id)
+    db.session.execute(clear)
+    result = db.session.execute(insert(table).from_select(
+        ['wallet_id', 'category_id', 'type', 'month', 'total', 'count', 'min_amount', 'max_amount'],
+        source
+    ))
+    db.session.commit()
+    return result.rowcount
+
+def wallet_summary(wallet_id, month_from=None, month_to=None):
+    """Monthly and per-category totals for a wallet, read from the rollups only."""
+    rollup = WalletMonthlyRollup
+    conditions = [rollup.wallet_id == wallet_id]
+    if month_from is not None:
+        conditions.append(rollup.month >= month_from)
+    if month_to is not None:
+        conditions.append(rollup.month <= month_to)
+
+    months = db.session.query(
+        rollup.month, rollup.type, func.sum(rollup.total), func.sum(rollup.count)
+    ).filter(*conditions).group_by(rollup.month, rollup.type).order_by(rollup.month).all()
+    categories = db.session.query(
+        rollup.category_id,
+        rollup.type,
+        func.sum(rollup.total),
+        func.sum(rollup.count),
+        func.min(rollup.min_amount),
+        func.max(rollup.max_amount)
+    ).filter(*conditions).group_by(rollup.category_id, rollup.type).order_by(rollup.category_id).all()
+    return months, categories
@@ -0,0 +1,81 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import bindparam, case, func, update
+from server.models import db, Transaction, Wallet
+from server.services.budget_alerts import evaluate_budget_alerts
+from server.services.events import record_events, transaction_events
+from server.services.forecasting import expire_forecasts
+from server.services.rollups import apply_rollup_changes
+from server.utils.cache import invalidate_on_commit
+
+# Columns the derived data depends on; update_transaction snapshots these before and after
+EFFECT_FIELDS = ('wallet_id', 'category_id', 'type', 'amount', 'date')
+
+def transaction_snapshot(transaction):
+    return {field: getattr(transaction, field) for field in EFFECT_FIELDS}
+
+def signed_amount(row):
+    """Income adds to a wallet's balance, anything else is money out."""
+    return row['amount'] if row['type'] == 'income' else -row['amount']
+
+def _normalized(rows):
+    return [
+        row if isinstance(row['amount'], Decimal) else dict(row, amount=Decimal(str(row['amount'])))
+        for row in rows
+    ]
+
+def signed_amount_column():
+    return case((Transaction.type == 'income', Transaction.amount), else_=-Transaction.amount)
+
+def _balance_deltas(added, removed):
+    deltas = defaultdict(Decimal)
+    for row in added:
+        deltas[row['wallet_id']] += signed_amount(row)
+    for row in removed:
+        deltas[row['wallet_id']] -= signed_amount(row)
+    return deltas
+
+def apply_balance_deltas(added=(), removed=()):
+    """
+    balance = balance + delta for every wallet the rows touch, as one executemany.
+
+    The increment is computed by the database, so concurrent writers never overwrite
+    each other's changes. Wallets are updated in id order so two transactions touching
+    the same wallets always take their row locks in the same order.
+    """
+    deltas = _balance_deltas(added, removed)
+    params = [
+        {'wallet_id': wallet_id, 'delta': delta}
+        for wallet_id, delta in sorted(deltas.items()) if delta
+    ]
+    if not params:
+        return
+    statement = (
+        update(Wallet.__table__)
+        .where(Wallet.__table__.c.id == bindparam('wallet_id'))
+        .values(balance=Wallet.__table__.c.balance + bindparam('delta'), updated_at=func.now())
+    )
+    db.session.execute(statement, params)
+    invalidate_on_commit(Wallet, *[param['wallet_id'] for param in params])
+
+def apply_transaction_effects(added=(), removed=()):
+    """
+    Keeps data derived from transactions in step with a write. Called by every path
+    that inserts, updates or deletes transactions, before it commits, so the derived
+    rows change in the same database transaction as the transactions themselves.
+
+    `added` and `removed` are dicts with the EFFECT_FIELDS keys; an update passes the
+    old row as removed and the new row as added.
+    """
+    added = _normalized(added)
+    removed = _normalized(removed)
+    # Derived data recomputed from the transactions table must see this write
+    db.session.flush()
+    apply_balance_deltas(added, removed)
+    apply_rollup_changes(added, removed)
+    # Removals only lower spending, so only added rows can cross a budget threshold
+    evaluate_budget_alerts(added)
+    # Forecasts are recomputed lazily on the next read of a changed wallet
+    expire_forecasts({row['wallet_id'] for row in added + removed})
+    # Streams of the wallets' members are told which date ranges to refetch
+    record_events(transaction_events(added, removed))
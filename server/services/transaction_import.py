@@ -0,0 +1,316 @@
+import csv
+import io
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert, or_
+from server.config import app
+from server.models import db, Category, Transaction, TransactionImport
+from server.services.categorization import get_matcher
+from server.services.transaction_effects import apply_transaction_effects
+
+IMPORT_FORMATS = ('csv', 'ofx')
+IMPORT_CHUNK_SIZE = 1000
+MAX_RECORDED_ERRORS = 20
+OFX_READ_SIZE = 64 * 1024
+UNCATEGORIZED = 'Uncategorized'
+
+# Statement column -> Transaction field. A mapping needs a date column and either an
+# amount column or credit/debit columns; type, description and category are optional.
+CSV_MAPPINGS = {
+    'default': {
+        'date': 'date',
+        'amount': 'amount',
+        'type': 'type',
+        'description': 'description',
+        'category': 'category'
+    },
+    # M-Pesa full statements split money in and out into two columns
+    'mpesa': {
+        'date': 'Completion Time',
+        'description': 'Details',
+        'credit': 'Paid In',
+        'debit': 'Withdrawn'
+    }
+}
+MAPPING_FIELDS = ('date', 'amount', 'credit', 'debit', 'type', 'description', 'category')
+OPTIONAL_FIELDS = ('type', 'description', 'category')
+
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+    '%d-%m-%Y %H:%M:%S',
+    '%d-%m-%Y',
+    '%d %b %Y',
+)
+TYPE_ALIASES = {
+    'expense': 'expense', 'debit': 'expense', 'dr': 'expense', 'withdrawal': 'expense',
+    'income': 'income', 'credit': 'income', 'cr': 'income', 'deposit': 'income',
+}
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+def resolve_mapping(value):
+    """Accepts a preset name, a JSON object or a dict; returns a validated mapping."""
+    if not value:
+        return CSV_MAPPINGS['default']
+    if isinstance(value, str):
+        if value in CSV_MAPPINGS:
+            return CSV_MAPPINGS[value]
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise ValueError(f"mapping must be one of {', '.join(CSV_MAPPINGS)} or a JSON object")
+    if not isinstance(value, dict):
+        raise ValueError("mapping must be a JSON object")
+    unknown = sorted(set(value) - set(MAPPING_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown mapping fields: {', '.join(unknown)}")
+    if 'date' not in value or not ('amount' in value or 'credit' in value or 'debit' in value):
+        raise ValueError("mapping needs a date column and an amount or credit/debit column")
+    return value
+
+def _parse_amount(value):
+    text = (value or '').strip()
+    if not text:
+        return None
+    negative = text.startswith('(') and text.endswith(')')
+    # Drop currency codes, symbols and thousands separators: "KES 1,250.00" -> "1250.00"
+    text = re.sub(r'[^0-9.\-+]', '', text)
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}")
+    return -amount if negative else amount
+
+class StatementImporter:
+    """
+    Turns statement records into Transaction rows and writes them in chunks.
+
+    Categories are resolved through a dict loaded once per import; names that are not
+    found are created on first sight and added to it. Rows without a category are
+    classified by the smart category rules first. Rows are buffered and written
+    with one executemany per IMPORT_CHUNK_SIZE rows, and each chunk commit also
+    records progress, so memory stays flat however long the statement is.
+    """
+
+    def __init__(self, transaction_import, default_category_id=None):
+        self.record = transaction_import
+        # Callable returning how far into the file the parser is, set by run_import
+        self.position = None
+        self.wallet_id = transaction_import.wallet_id
+        self.user_id = transaction_import.created_by
+        self.default_category_id = default_category_id
+        self.categories = self._load_categories()
+        self.matcher = get_matcher()
+        self.date_format = None
+        self.ofx = transaction_import.format == 'ofx'
+        self.pending = []
+        self.errors = []
+        self.processed = 0
+        self.imported = 0
+        self.skipped = 0
+
+    def _load_categories(self):
+        rows = db.session.query(Category.name, Category.id).filter(
+            or_(Category.is_default.is_(True), Category.created_by == self.user_id)
+        ).order_by(Category.is_default.desc(), Category.id)
+        # The user's own categories come last and win over defaults with the same name
+        return {name.strip().lower(): category_id for name, category_id in rows}
+
+    def _category_id(self, name, kind, description=None):
+        name = (name or '').strip()
+        if not name:
+            match = self.matcher.classify(description, kind)
+            if match is not None:
+                return match.category_id
+            if self.default_category_id:
+                return self.default_category_id
+            name = UNCATEGORIZED
+        key = name.lower()
+        category_id = self.categories.get(key)
+        if category_id is None:
+            category = Category(name=name, type=kind, created_by=self.user_id)
+            db.session.add(category)
+            db.session.flush()
+            category_id = self.categories[key] = category.id
+        return category_id
+
+    def _parse_date(self, value):
+        if self.ofx:
+            return _ofx_date(value)
+        text = (value or '').strip()
+        if not text:
+            raise ValueError("date is required")
+        # Statements use one format throughout, so the last one that worked goes first
+        formats = (self.date_format,) + DATE_FORMATS if self.date_format else DATE_FORMATS
+        for date_format in formats:
+            try:
+                parsed = datetime.strptime(text, date_format)
+            except ValueError:
+                continue
+            self.date_format = date_format
+            return parsed
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Invalid date: {value}")
+
+    def _amount_and_type(self, record):
+        credit = _parse_amount(record.get('credit'))
+        debit = _parse_amount(record.get('debit'))
+        if credit:
+            return abs(credit), 'income'
+        if debit:
+            return abs(debit), 'expense'
+        amount = _parse_amount(record.get('amount'))
+        if amount is None:
+            raise ValueError("amount is required")
+        kind = TYPE_ALIASES.get((record.get('type') or '').strip().lower())
+        if kind is None:
+            kind = 'expense' if amount < 0 else 'income'
+        return abs(amount), kind
+
+    def add(self, record):
+        """Validates one statement record and queues it for the next chunk write."""
+        self.processed += 1
+        try:
+            amount, kind = self._amount_and_type(record)
+            description = (record.get('description') or '').strip() or None
+            values = {
+                'wallet_id': self.wallet_id,
+                'category_id': self._category_id(record.get('category'), kind, description),
+                'amount': amount,
+                'type': kind,
+                'description': description,
+                'date': self._parse_date(record.get('date')),
+                'is_recurring': False,
+                'recurring_interval': None,
+                'created_by': self.user_id
+            }
+        except ValueError as e:
+            self.skipped += 1
+            if len(self.errors) < MAX_RECORDED_ERRORS:
+                self.errors.append({"row": self.processed, "error": str(e)})
+            return
+        self.pending.append(values)
+        if len(self.pending) >= IMPORT_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            db.session.execute(insert(Transaction), self.pending)
+            apply_transaction_effects(added=self.pending)
+            self.imported += len(self.pending)
+            self.pending = []
+        self.record.rows_processed = self.processed
+        self.record.rows_imported = self.imported
+        self.record.rows_skipped = self.skipped
+        self.record.errors = list(self.errors)
+        if self.position is not None:
+            self.record.bytes_processed = self.position()
+        db.session.commit()
+
+def iter_csv_records(stream, mapping):
+    """Yields one mapped record per CSV line; the file is never read whole."""
+    reader = csv.DictReader(stream)
+    header = set(reader.fieldnames or ())
+    missing = [
+        column for field, column in mapping.items()
+        if field not in OPTIONAL_FIELDS and column not in header
+    ]
+    if missing:
+        raise ValueError(f"Columns not found in statement: {', '.join(missing)}")
+    # Optional columns the statement does not have are simply left out
+    mapping = {field: column for field, column in mapping.items() if column in header}
+    for row in reader:
+        yield {field: row.get(column) for field, column in mapping.items()}
+
+def _ofx_date(value):
+    # OFX dates are YYYYMMDD[HHMMSS[.XXX]][[offset:TZ]]
+    digits = re.match(r'\d+', (value or '').strip())
+    if not digits:
+        raise ValueError("date is required")
+    digits = digits.group(0)
+    try:
+        if len(digits) >= 14:
+            return datetime.strptime(digits[:14], '%Y%m%d%H%M%S')
+        return datetime.strptime(digits[:8], '%Y%m%d')
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+def iter_ofx_records(stream):
+    """
+    Yields one record per <STMTTRN> block. The file is tokenized in fixed-size reads;
+    only the text after the last '<' is carried over, since that tag may be cut off.
+    Works for both SGML (unclosed tags) and XML OFX.
+    """
+    buffer = ''
+    current = None
+    while True:
+        chunk = stream.read(OFX_READ_SIZE)
+        buffer += chunk
+        cut = max(buffer.rfind('<'), 0) if chunk else len(buffer)
+        for closing, tag, text in OFX_TAG.findall(buffer[:cut]):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    yield {
+                        # Parsed by the importer, so a bad date skips only this record
+                        'date': current.get('DTPOSTED'),
+                        'amount': current.get('TRNAMT'),
+                        'description': ' - '.join(
+                            part for part in (current.get('NAME'), current.get('MEMO')) if part
+                        )
+                    }
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = text.strip()
+        buffer = buffer[cut:]
+        if not chunk:
+            break
+
+def run_import(import_id, path, mapping=None, default_category_id=None):
+    """Parses the uploaded file at `path` into transactions, then deletes the file."""
+    transaction_import = TransactionImport.query.get(import_id)
+    transaction_import.status = 'running'
+    db.session.commit()
+    importer = StatementImporter(transaction_import, default_category_id)
+    try:
+        with open(path, 'rb') as raw:
+            importer.position = raw.tell
+            stream = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+            if transaction_import.format == 'ofx':
+                records = iter_ofx_records(stream)
+            else:
+                records = iter_csv_records(stream, mapping or CSV_MAPPINGS['default'])
+            for record in records:
+                importer.add(record)
+            importer.flush()
+        transaction_import.status = 'completed'
+    except Exception as e:
+        db.session.rollback()
+        importer.errors.append({"row": importer.processed, "error": str(e)})
+        transaction_import.errors = importer.errors
+        transaction_import.status = 'failed'
+    finally:
+        transaction_import.completed_at = datetime.utcnow()
+        db.session.commit()
+        os.remove(path)
+
+def start_import(import_id, path, mapping=None, default_category_id=None):
+    """Runs the import on a background thread so progress can be polled meanwhile."""
+    def target():
+        with app.app_context():
+            run_import(import_id, path, mapping, default_category_id)
+
+    thread = threading.Thread(target=target, name=f"transaction-import-{import_id}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,50 @@
+from sqlalchemy import func, select, update
+from server.models import db, Transaction, Wallet
+from server.services.transaction_effects import signed_amount_column
+from server.utils.cache import invalidate_on_commit
+
+RECONCILE_BATCH_SIZE = 1000
+
+def _transactions_total(wallet_id_column):
+    return select(func.coalesce(func.sum(signed_amount_column()), 0)).where(
+        Transaction.wallet_id == wallet_id_column
+    ).scalar_subquery()
+
+def find_balance_drift():
+    """
+    Recomputes every balance as opening_balance + sum of its transactions in one grouped
+    query and returns (wallet_id, stored, expected) for wallets that disagree.
+    """
+    totals = (
+        db.session.query(Transaction.wallet_id, func.sum(signed_amount_column()).label('total'))
+        .group_by(Transaction.wallet_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(Wallet.id, Wallet.balance, Wallet.opening_balance, totals.c.total)
+        .outerjoin(totals, totals.c.wallet_id == Wallet.id)
+        .order_by(Wallet.id)
+        .yield_per(RECONCILE_BATCH_SIZE)
+    )
+    drift = []
+    for wallet_id, balance, opening_balance, total in rows:
+        # Balances are stored with two decimals; compare at that precision
+        expected = round((opening_balance or 0) + (total or 0), 2)
+        if round(balance or 0, 2) != expected:
+            drift.append((wallet_id, balance, expected))
+    return drift
+
+def fix_balance_drift(wallet_ids):
+    """Rewrites the given balances from their transactions, in batches."""
+    wallets = Wallet.__table__
+    for start in range(0, len(wallet_ids), RECONCILE_BATCH_SIZE):
+        batch = wallet_ids[start:start + RECONCILE_BATCH_SIZE]
+        # Recomputed inside the UPDATE rather than written from the values read above,
+        # so deltas committed since then are not lost
+        db.session.execute(
+            update(wallets)
+            .where(wallets.c.id.in_(batch))
+            .values(balance=wallets.c.opening_balance + _transactions_total(wallets.c.id))
+        )
+        invalidate_on_commit(Wallet, *batch)
+        db.session.commit()
@@ -0,0 +1,131 @@
+import hashlib
+from flask import g, has_request_context, request
+from sqlalchemy import literal, select, union_all
+from server.config import app, db
+from server.models import Wallet, WalletCollaborator
+from server.utils.cache import create_cache
+
+# Higher levels include everything the lower ones allow
+PERMISSION_LEVELS = {'viewer': 1, 'editor': 2, 'owner': 3}
+USER_ID_HEADER = 'X-User-Id'
+
+permission_cache = create_cache(
+    app.config['ENTITY_CACHE_BACKEND'],
+    app.config['ENTITY_CACHE_MAX_ENTRIES'],
+    app.config['WALLET_ACCESS_TTL']
+)
+
+def _rank(level):
+    # Collaborators saved with an unknown level get the least access
+    return PERMISSION_LEVELS.get(level, PERMISSION_LEVELS['viewer'])
+
+def _cache_key(user_id):
+    return f"wallet_permissions:{user_id}"
+
+def load_wallet_permissions(user_id):
+    """
+    {wallet_id: level} for every wallet a user owns or collaborates on, from one
+    UNION ALL query. Ownership wins over any collaborator row for the same wallet.
+    """
+    owned = select(Wallet.id, literal('owner')).where(Wallet.owner_id == user_id)
+    shared = select(WalletCollaborator.wallet_id, WalletCollaborator.permission_level).where(
+        WalletCollaborator.user_id == user_id
+    )
+    permissions = {}
+    for wallet_id, level in db.session.execute(union_all(owned, shared)):
+        if wallet_id not in permissions or _rank(level) > _rank(permissions[wallet_id]):
+            permissions[wallet_id] = level
+    return permissions
+
+def wallet_permissions(user_id):
+    """
+    A user's permission map, resolved at most once per request and shared across
+    requests for WALLET_ACCESS_TTL seconds. Stored as pairs, since a shared cache
+    would turn integer dict keys into strings.
+    """
+    memo = g.setdefault('wallet_permissions', {}) if has_request_context() else {}
+    permissions = memo.get(user_id)
+    if permissions is None:
+        pairs = permission_cache.get(_cache_key(user_id))
+        if pairs is None:
+            permissions = load_wallet_permissions(user_id)
+            permission_cache.set(_cache_key(user_id), [[wallet_id, level] for wallet_id, level in permissions.items()])
+        else:
+            permissions = {wallet_id: level for wallet_id, level in pairs}
+        memo[user_id] = permissions
+    return permissions
+
+def invalidate_wallet_access(*user_ids):
+    """Drops cached permission maps; call after committing an ownership or collaborator change."""
+    for user_id in user_ids:
+        permission_cache.delete(_cache_key(user_id))
+        if has_request_context():
+            g.setdefault('wallet_permissions', {}).pop(user_id, None)
+
+def permissions_version(user_id):
+    """Short digest of a user's permission map; it changes whenever the user's access does."""
+    pairs = sorted(wallet_permissions(user_id).items())
+    return hashlib.md5(repr(pairs).encode('utf-8')).hexdigest()[:12]
+
+def enforcing():
+    return app.config['ENFORCE_WALLET_ACCESS']
+
+def current_user_id():
+    """The acting user from the X-User-Id header, or None when absent or malformed."""
+    value = request.headers.get(USER_ID_HEADER, '')
+    return int(value) if value.isdigit() else None
+
+def require_self(user_id):
+    """
+    None when the acting user is `user_id`, otherwise an (error, status) pair, for
+    endpoints that act on one user's own data. Always None unless ENFORCE_WALLET_ACCESS.
+    """
+    if not enforcing():
+        return None
+    acting_user_id = current_user_id()
+    if acting_user_id is None:
+        return {"error": f"{USER_ID_HEADER} header is required"}, 401
+    if acting_user_id != user_id:
+        return {"error": "Only the user themselves can access this"}, 403
+    return None
+
+def require_wallet_access(wallet_id, level='viewer'):
+    """
+    None when the acting user holds at least `level` on the wallet, otherwise an
+    (error, status) pair a controller returns as is. A dict lookup once the
+    request's permission map is loaded. Always None unless ENFORCE_WALLET_ACCESS.
+    """
+    if not enforcing():
+        return None
+    user_id = current_user_id()
+    if user_id is None:
+        return {"error": f"{USER_ID_HEADER} header is required"}, 401
+    try:
+        wallet_id = int(wallet_id)
+    except (TypeError, ValueError):
+        return {"error": "wallet_id must be an integer"}, 400
+    granted = wallet_permissions(user_id).get(wallet_id)
+    if granted is None or _rank(granted) < PERMISSION_LEVELS[level]:
+        return {"error": f"{level.capitalize()} access to wallet {wallet_id} is required"}, 403
+    return None
+
+def require_wallets_access(wallet_ids, level='viewer'):
+    """require_wallet_access for several wallets; the first refusal is returned."""
+    for wallet_id in sorted(set(wallet_ids), key=str):
+        denied = require_wallet_access(wallet_id, level)
+        if denied:
+            return denied
+    return None
+
+def accessible_wallets_filter(column):
+    """
+    Criteria limiting a list query to wallets the acting user can see, through
+    `column` (e.g. Transaction.wallet_id). Empty unless ENFORCE_WALLET_ACCESS.
+    Raises PermissionError when no user is given.
+    """
+    if not enforcing():
+        return []
+    user_id = current_user_id()
+    if user_id is None:
+        raise PermissionError(f"{USER_ID_HEADER} header is required")
+    return [column.in_(list(wallet_permissions(user_id)))]
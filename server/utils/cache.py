@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from server.config import app, db
+from server.utils.serializers import serialize, serializer_for
+
+class MemoryCache:
+    """
+    In-process LRU cache with per-entry TTLs.
+
+    Values are stored as-is, so callers must treat them as read-only. When the cache
+    is full the least recently used entry is evicted; expired entries are dropped
+    lazily when they are next read.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries=10000, default_ttl=60):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _encode(self, value):
+        return value
+
+    def _decode(self, value):
+        return value
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            stored = entry[1]
+        return self._decode(stored)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        stored = self._encode(value)
+        with self._lock:
+            self._entries[key] = (expires_at, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None
+            }
+
+class LocalSharedCache(MemoryCache):
+    """
+    Local stand-in for a shared cache such as Redis.
+
+    Keys are namespaced and values are stored as JSON strings, so every read returns
+    a fresh copy and anything that would not survive a network round trip fails here
+    too. Swapping this for a real shared client only has to keep get/set/delete/
+    clear/stats.
+    """
+
+    name = 'shared'
+
+    def __init__(self, max_entries=10000, default_ttl=60, namespace='spendwise'):
+        super().__init__(max_entries=max_entries, default_ttl=default_ttl)
+        self.namespace = namespace
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _encode(self, value):
+        return json.dumps(value, separators=(',', ':'))
+
+    def _decode(self, value):
+        return json.loads(value)
+
+    def get(self, key):
+        return super().get(self._key(key))
+
+    def set(self, key, value, ttl=None):
+        super().set(self._key(key), value, ttl)
+
+    def delete(self, key):
+        super().delete(self._key(key))
+
+CACHE_BACKENDS = {
+    MemoryCache.name: MemoryCache,
+    LocalSharedCache.name: LocalSharedCache,
+}
+
+def create_cache(backend, max_entries, default_ttl):
+    try:
+        return CACHE_BACKENDS[backend](max_entries=max_entries, default_ttl=default_ttl)
+    except KeyError:
+        raise ValueError(f"Unknown cache backend: {backend}")
+
+class EntityCache:
+    """Serialized rows keyed by table and primary key, with per-table TTLs."""
+
+    def __init__(self, backend, ttls=None):
+        self.backend = backend
+        self.ttls = ttls or {}
+
+    def _key(self, model, entity_id):
+        return f"{model.__tablename__}:{entity_id}"
+
+    def get(self, model, entity_id):
+        return self.backend.get(self._key(model, entity_id))
+
+    def set(self, model, entity_id, data):
+        self.backend.set(self._key(model, entity_id), data, self.ttls.get(model.__tablename__))
+
+    def invalidate(self, model, *entity_ids):
+        for entity_id in entity_ids:
+            self.backend.delete(self._key(model, entity_id))
+
+    def stats(self):
+        return self.backend.stats()
+
+entity_cache = EntityCache(
+    create_cache(
+        app.config['ENTITY_CACHE_BACKEND'],
+        app.config['ENTITY_CACHE_MAX_ENTRIES'],
+        app.config['ENTITY_CACHE_TTL']
+    ),
+    ttls=app.config['ENTITY_CACHE_TTLS']
+)
+
+def cached_row(model, entity_id, fields=None):
+    """
+    Read-through lookup of one serialized row, or None when it does not exist.
+
+    The full row is cached once and ?fields subsets are sliced from it, so every
+    fieldset shares one entry. Unknown fields raise ValueError before anything is read.
+    """
+    serializer = serializer_for(model).only(fields)
+    data = entity_cache.get(model, entity_id)
+    if data is None:
+        obj = model.query.get(entity_id)
+        if obj is None:
+            return None
+        data = serialize(obj)
+        entity_cache.set(model, entity_id, data)
+    if serializer.is_subset:
+        return {key: data[key] for key in serializer.fields}
+    # The in-process backend hands out the cached dict itself
+    return dict(data)
+
+def invalidate_on_commit(model, *entity_ids):
+    """
+    Invalidates rows once the current database transaction commits. Invalidating
+    before the commit would let a concurrent read cache the old row again.
+    """
+    db.session.info.setdefault('invalidate_on_commit', set()).update(
+        (model, entity_id) for entity_id in entity_ids
+    )
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    for model, entity_id in session.info.pop('invalidate_on_commit', ()):
+        entity_cache.invalidate(model, entity_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop('invalidate_on_commit', None)
@@ -0,0 +1,144 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, request
+from sqlalchemy import func
+from werkzeug.http import http_date, quote_etag
+from server.models import db
+from server.utils.authorization import current_user_id, enforcing, permissions_version
+from server.utils.cache import entity_cache
+from server.utils.serializers import format_datetime
+from server.utils.streaming import wants_stream
+
+def _last_changed(model):
+    """coalesce(updated_at, created_at): rows that were never updated only have created_at."""
+    return func.coalesce(model.updated_at, model.created_at)
+
+def _access_variant():
+    # Under enforcement a list holds only the wallets the user can see, so a grant or
+    # revocation has to change the validator even when no row did
+    if not enforcing():
+        return ''
+    user_id = current_user_id()
+    return '' if user_id is None else f"{user_id}:{permissions_version(user_id)}"
+
+def _variant():
+    # The same URL can render as JSON or NDJSON, with different ?fields and, when
+    # wallet access is enforced, for different users, so the representation is part
+    # of the validator
+    return f"{request.query_string.decode('utf-8', 'replace')}|{int(wants_stream())}|{_access_variant()}"
+
+def _make_etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+def _parse_stamp(value):
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S') if value else None
+
+def collection_validators(model):
+    """ETag and Last-Modified for a whole table from one aggregate query."""
+    count, max_id, max_changed = db.session.query(
+        func.count(model.id), func.max(model.id), func.max(_last_changed(model))
+    ).one()
+    stamp = format_datetime(max_changed) if max_changed else ''
+    etag = _make_etag(model.__tablename__, count, max_id, stamp, _variant())
+    return etag, _parse_stamp(stamp)
+
+def item_validators(model, item_id):
+    """ETag and Last-Modified for one row, or None when the row does not exist."""
+    row = db.session.query(_last_changed(model)).filter(model.id == item_id).first()
+    if row is None:
+        return None
+    stamp = format_datetime(row[0]) if row[0] else ''
+    return _make_etag(model.__tablename__, item_id, stamp, _variant()), _parse_stamp(stamp)
+
+def _item_validators_from_body(model, body):
+    """Same validators as item_validators, read from an already serialized row."""
+    if not isinstance(body, dict) or 'id' not in body:
+        return None
+    if 'updated_at' not in body or 'created_at' not in body:
+        # A sparse fieldset left the timestamps out
+        return None
+    stamp = body['updated_at'] or body['created_at'] or ''
+    return _make_etag(model.__tablename__, body['id'], stamp, _variant()), _parse_stamp(stamp)
+
+def _is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(tzinfo=timezone.utc) <= request.if_modified_since
+    return False
+
+def _validator_headers(etag, last_modified):
+    headers = {'ETag': quote_etag(etag, weak=True)}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    return headers
+
+def _with_headers(response, headers):
+    if isinstance(response, Response):
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
+    data, status_code = response[0], response[1]
+    extra = dict(response[2]) if len(response) > 2 else {}
+    if status_code == 200:
+        extra.update(headers)
+    return data, status_code, extra
+
+def conditional_get(model, id_arg=None, unless=None, before=None):
+    """
+    Adds weak ETag/Last-Modified validators to a Resource.get and answers matching
+    If-None-Match/If-Modified-Since requests with 304 before the view runs.
+
+    Collections are validated with count, max(id) and max(updated_at) in one aggregate
+    query. Single rows (id_arg names the URL argument) are validated on their own
+    timestamp; plain GETs without validators take it from the response body instead
+    of querying for it. `unless` is a callable; when it returns True the response
+    depends on more than `model` and is served without validators. `before` is called
+    with the view arguments ahead of the validators, for views that bring expired rows
+    up to date on read.
+
+    While ENFORCE_WALLET_ACCESS is on, single rows are never answered with 304 ahead
+    of the view: the view runs its wallet check first and a refusal goes out as is.
+    Collection validators include a version of the user's permission map.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if before is not None:
+                before(**kwargs)
+            if unless is not None and unless():
+                return method(*args, **kwargs)
+            conditional = bool(request.if_none_match or request.if_modified_since)
+            if id_arg is None or (conditional and not enforcing()):
+                if id_arg is None:
+                    validators = collection_validators(model)
+                else:
+                    # A cached row already carries its timestamps, so a hot row
+                    # revalidates without a query
+                    validators = _item_validators_from_body(model, entity_cache.get(model, kwargs[id_arg]))
+                    if validators is None:
+                        validators = item_validators(model, kwargs[id_arg])
+                if validators is None:
+                    return method(*args, **kwargs)
+                etag, last_modified = validators
+                headers = _validator_headers(etag, last_modified)
+                if _is_not_modified(etag, last_modified):
+                    return Response(status=304, headers=headers)
+                return _with_headers(method(*args, **kwargs), headers)
+
+            response = method(*args, **kwargs)
+            if isinstance(response, Response) or response[1] != 200:
+                return response
+            validators = _item_validators_from_body(model, response[0])
+            if validators is None:
+                validators = item_validators(model, kwargs[id_arg])
+            if validators is None:
+                return response
+            headers = _validator_headers(*validators)
+            if conditional and _is_not_modified(*validators):
+                return Response(status=304, headers=headers)
+            return _with_headers(response, headers)
+        return wrapper
+    return decorator
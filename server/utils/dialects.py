@@ -0,0 +1,39 @@
+from datetime import time, timedelta
+from sqlalchemy import Date, Time, cast, func, literal, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from server.models import db
+
+def dialect_name():
+    return db.session.get_bind().dialect.name
+
+def upsert_insert(table):
+    """
+    INSERT construct with on_conflict_do_update/on_conflict_do_nothing for the bound
+    database. PostgreSQL and SQLite share the same ON CONFLICT API.
+    """
+    dialect = dialect_name()
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT inserts are not implemented for {dialect}")
+
+def day_expression(column):
+    """Truncates a DateTime column to its calendar day in SQL, returned as a date."""
+    if dialect_name() == 'postgresql':
+        return cast(column, Date)
+    # SQLite's date() returns ISO text; the Date type parses it back into a date
+    return type_coerce(func.date(column), Date)
+
+def is_midnight(column):
+    """True where a DateTime column falls exactly on the start of a day."""
+    if dialect_name() == 'postgresql':
+        return cast(column, Time) == time(0)
+    return func.time(column) == '00:00:00'
+
+def next_day_expression(column):
+    """A DateTime column moved forward by one day, in SQL."""
+    if dialect_name() == 'postgresql':
+        return column + literal(timedelta(days=1))
+    # SQLite's datetime() drops the fraction; '...00:00:00' still sorts before any later instant
+    return func.datetime(column, '+1 day')
@@ -0,0 +1,130 @@
+from sqlalchemy import inspect as sa_inspect
+from server.models import db
+
+# Leading index columns each query filters, joins or sorts on, keyed by the
+# function that issues it. Only predicates the code actually sends belong here;
+# unfiltered list endpoints have no entry. A query is covered when some index,
+# unique constraint or primary key on the table starts with these columns in
+# this order.
+REQUIRED_INDEXES = {
+    'user_controller.create_user': [
+        ('users', ('username',)),
+        ('users', ('email',)),
+    ],
+    'transaction_controller.get_all_transactions': [
+        ('transactions', ('date', 'id')),
+        ('transactions', ('wallet_id', 'date')),
+        ('transactions', ('category_id', 'date')),
+        ('transactions', ('created_by',)),
+    ],
+    'wallet_balances.fix_balance_drift': [
+        ('transactions', ('wallet_id',)),
+    ],
+    'rollups.wallet_summary': [
+        ('wallet_monthly_rollups', ('wallet_id',)),
+    ],
+    'rollups.apply_rollup_changes': [
+        ('wallet_monthly_rollups', ('wallet_id', 'category_id', 'type', 'month')),
+        ('transactions', ('wallet_id', 'date')),
+    ],
+    'budget_status.budget_status_rows': [
+        ('transactions', ('wallet_id', 'category_id', 'date')),
+    ],
+    'budget_alerts.evaluate_budget_alerts': [
+        ('budgets', ('wallet_id',)),
+        ('budget_alerts', ('budget_id', 'period_start', 'threshold')),
+    ],
+    'recurring.materialize_recurring': [
+        ('transactions', ('recurring_template_id', 'date')),
+    ],
+    'forecasting.forecast_wallets': [
+        ('transactions', ('wallet_id', 'date')),
+        ('financial_forecasts', ('wallet_id',)),
+    ],
+    'forecasting.refresh_expired_forecasts': [
+        ('financial_forecasts', ('valid_until',)),
+        ('financial_forecasts', ('wallet_id',)),
+    ],
+    'habits.detect_habits': [
+        ('transactions', ('created_by',)),
+        ('spending_patterns', ('user_id', 'pattern_type', 'pattern_key')),
+    ],
+    'benchmarks.update_benchmarks': [
+        ('wallets', ('owner_id',)),
+        ('wallet_monthly_rollups', ('wallet_id',)),
+    ],
+    'wallet__controller.delete_wallet': [
+        ('wallet_collaborators', ('wallet_id',)),
+    ],
+    'wallet_collaborators_controller.get_collaborators_for_wallet': [
+        ('wallet_collaborators', ('wallet_id',)),
+    ],
+    'budget_controller.get_all_budgets': [
+        # Only filtered when ENFORCE_WALLET_ACCESS limits it to the user's wallets
+        ('budgets', ('wallet_id',)),
+    ],
+    'budget_controller.get_budget_statuses': [
+        ('budgets', ('user_id',)),
+        ('budgets', ('wallet_id',)),
+        ('budgets', ('category_id',)),
+    ],
+    'financial_forecast_controller.get_all_financial_forecasts': [
+        ('financial_forecasts', ('user_id',)),
+        ('financial_forecasts', ('wallet_id',)),
+    ],
+    'notification_controller.get_all_notifications': [
+        ('notifications', ('user_id',)),
+    ],
+    'notification_controller.get_unread_notification_count': [
+        # Partial index ix_notifications_user_id_unread (WHERE NOT is_read)
+        ('notifications', ('user_id',)),
+    ],
+    'invitations.expire_invitations': [
+        ('wallet_invitations', ('status', 'expires_at')),
+    ],
+    'authorization.load_wallet_permissions': [
+        ('wallets', ('owner_id',)),
+        ('wallet_collaborators', ('user_id',)),
+    ],
+    'events.replay_events': [
+        ('activity_events', ('user_id', 'id')),
+        ('activity_events', ('wallet_id', 'id')),
+    ],
+}
+
+def model_index_columns(metadata=None):
+    """Column tuples of every index, unique constraint and primary key declared on the models."""
+    metadata = metadata or db.metadata
+    result = {}
+    for table in metadata.tables.values():
+        columns = result.setdefault(table.name, [])
+        columns.append(tuple(column.name for column in table.primary_key.columns))
+        for index in table.indexes:
+            columns.append(tuple(column.name for column in index.columns))
+        for constraint in table.constraints:
+            if isinstance(constraint, db.UniqueConstraint):
+                columns.append(tuple(column.name for column in constraint.columns))
+    return result
+
+def database_index_columns(engine=None):
+    """Same as model_index_columns, but read from the live database."""
+    inspector = sa_inspect(engine or db.engine)
+    result = {}
+    for table_name in inspector.get_table_names():
+        columns = result.setdefault(table_name, [])
+        columns.append(tuple(inspector.get_pk_constraint(table_name)['constrained_columns']))
+        for index in inspector.get_indexes(table_name):
+            columns.append(tuple(index['column_names']))
+        for constraint in inspector.get_unique_constraints(table_name):
+            columns.append(tuple(constraint['column_names']))
+    return result
+
+def missing_indexes(index_columns):
+    """(query, table, columns) for every REQUIRED_INDEXES entry no index covers."""
+    missing = []
+    for query, requirements in REQUIRED_INDEXES.items():
+        for table, required in requirements:
+            available = index_columns.get(table, [])
+            if not any(columns[:len(required)] == required for columns in available):
+                missing.append((query, table, required))
+    return missing
@@ -0,0 +1,45 @@
+import json
+from flask import Response, request, stream_with_context
+from server.utils.serializers import serialize as serialize_row
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 500
+
+def wants_stream():
+    """True when the client asked for NDJSON via ?stream=1 or the Accept header."""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+def ndjson_response(query, serialize=serialize_row, batch_size=STREAM_BATCH_SIZE):
+    """
+    Streams every row of `query` as one compact JSON document per line.
+
+    Rows are fetched in primary key order, `batch_size` at a time, with each batch
+    seeking past the last id of the previous one. Only one batch is ever held in
+    memory and the first line is written as soon as the first batch is read. The
+    model has to be the first entity of `query`; extra columns after it reach
+    `serialize` in the same row.
+    """
+    model = query.column_descriptions[0]['entity']
+
+    def generate():
+        last_id = None
+        while True:
+            batch_query = query.order_by(None).order_by(model.id)
+            if last_id is not None:
+                batch_query = batch_query.filter(model.id > last_id)
+            rows = batch_query.limit(batch_size).all()
+            if not rows:
+                break
+            yield ''.join(
+                json.dumps(serialize(row), separators=(',', ':'), default=str) + '\n'
+                for row in rows
+            )
+            if len(rows) < batch_size:
+                break
+            last = rows[-1]
+            last_id = last.id if isinstance(last, model) else last[0].id
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,120 @@
+import math
+import numpy as np
+
+DEFAULT_COMPRESSION = 100
+
+class TDigest:
+    """
+    Merging t-digest: a mergeable sketch of a distribution for quantile and rank
+    queries. It keeps at most ~compression centroids however many values were added,
+    small near the tails and large near the median, so extreme percentiles stay
+    accurate. quantile and cdf walk the centroids, so their cost does not grow with
+    the number of values. Serializes to a plain dict for storage in a JSON column.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, means=(), weights=(), min_value=None, max_value=None):
+        self.compression = compression
+        self.means = np.asarray(means, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.min_value = min_value
+        self.max_value = max_value
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k):
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means = means[order]
+        weights = weights[order]
+        total = weights.sum()
+        merged_means = []
+        merged_weights = []
+        current_mean, current_weight = means[0], weights[0]
+        so_far = 0.0
+        limit = total * self._k_inverse(self._k(0.0) + 1)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if so_far + current_weight + weight <= limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                so_far += current_weight
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                limit = total * self._k_inverse(self._k(min(so_far / total, 1.0)) + 1)
+                current_mean, current_weight = mean, weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def update(self, values):
+        """Adds a batch of values."""
+        values = np.asarray(values, dtype=float)
+        if not values.size:
+            return self
+        self._add_centroids(values, np.ones_like(values), values.min(), values.max())
+        return self
+
+    def merge(self, other):
+        """Adds every value summarized by another digest."""
+        if other.weights.size:
+            self._add_centroids(other.means, other.weights, other.min_value, other.max_value)
+        return self
+
+    def _add_centroids(self, means, weights, min_value, max_value):
+        self.min_value = min_value if self.min_value is None else min(self.min_value, min_value)
+        self.max_value = max_value if self.max_value is None else max(self.max_value, max_value)
+        self._compress(np.concatenate([self.means, means]), np.concatenate([self.weights, weights]))
+
+    def cdf(self, value):
+        """Fraction of the values at or below `value`, interpolated between centroids."""
+        if not self.weights.size:
+            return None
+        if value < self.min_value:
+            return 0.0
+        if value >= self.max_value:
+            return 1.0
+        total = self.count
+        # Each centroid's mass is centred on its mean; interpolate between those points
+        centres = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[self.min_value], self.means, [self.max_value]])
+        ranks = np.concatenate([[0.0], centres, [total]])
+        return float(np.interp(value, xs, ranks) / total)
+
+    def quantile(self, q):
+        """Value below which a fraction `q` of the values fall."""
+        if not self.weights.size:
+            return None
+        total = self.count
+        centres = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[self.min_value], self.means, [self.max_value]])
+        ranks = np.concatenate([[0.0], centres, [total]])
+        return float(np.interp(min(max(q, 0.0), 1.0) * total, ranks, xs))
+
+    def to_dict(self):
+        return {
+            'compression': self.compression,
+            'centroids': [[round(float(mean), 6), float(weight)] for mean, weight in zip(self.means, self.weights)],
+            'min': self.min_value,
+            'max': self.max_value
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        centroids = data.get('centroids') or []
+        return cls(
+            compression=data.get('compression', DEFAULT_COMPRESSION),
+            means=[mean for mean, _ in centroids],
+            weights=[weight for _, weight in centroids],
+            min_value=data.get('min'),
+            max_value=data.get('max')
+        )